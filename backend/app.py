@@ -1,11 +1,57 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import asyncio
+import json
+import os
 import uvicorn
-from pipeline import extract_resume, projects_main, advantages_main, generate_interview_code_question, evaluation, client
+from pipeline import (
+    extract_resume_async,
+    projects_main_async,
+    iter_projects_async,
+    advantages_main_async,
+    generate_interview_code_question_async,
+    evaluation_async,
+    async_client,
+)
+from llm.client import warmup_enabled, warm_up_async, aclose_clients
+from llm import metrics
+from qa_engine.dedup import interview_index
+from parser.ingest import UploadedResume, UploadTooLarge, read_upload, save_upload_in_background
+from evaluate.question_registry import (
+    question_registry_from_env,
+    project_question_id,
+    project_entries,
+    advantage_entries,
+    code_entries,
+    evaluation_inputs,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 启动时在后台预热模型服务连接，第一个请求不必再等待建连和 TLS 握手
+    if warmup_enabled():
+        asyncio.create_task(warm_up_async())
+    yield
+    await aclose_clients()
+
+
+app = FastAPI(lifespan=lifespan)
 
-app = FastAPI()
+# 上传时登记问题和参考答案，评估时复用（见 evaluate.question_registry），QUESTION_REGISTRY_ENABLED=0 时为 None
+question_registry = question_registry_from_env()
+
+# 每个问题生成分支的超时时间（秒），可分别通过 PROJECTS_TIMEOUT / ADVANTAGES_TIMEOUT / CODE_TIMEOUT 覆盖
+GENERATOR_TIMEOUT = float(os.getenv("GENERATOR_TIMEOUT", 120))
+BRANCH_TIMEOUTS = {
+    "projects": float(os.getenv("PROJECTS_TIMEOUT", GENERATOR_TIMEOUT)),
+    "advantages": float(os.getenv("ADVANTAGES_TIMEOUT", GENERATOR_TIMEOUT)),
+    "code": float(os.getenv("CODE_TIMEOUT", GENERATOR_TIMEOUT)),
+}
 
 # 配置 CORS
 app.add_middleware(
@@ -22,98 +68,240 @@ class AnswerData(BaseModel):
     isFollowUp: bool = False
     parentQuestionId: str = None
 
+async def run_generator(name: str, coro):
+    """
+    运行一个问题生成分支，超时（会取消该分支）或异常时只记录错误，不影响其他分支。
+
+    Returns:
+        (结果, 错误信息)，成功时错误信息为 None，失败时结果为 None
+    """
+    timeout = BRANCH_TIMEOUTS.get(name, GENERATOR_TIMEOUT)
+    try:
+        result = await asyncio.wait_for(coro, timeout=timeout)
+        return result, None
+    except asyncio.TimeoutError:
+        print(f"{name} 生成超时（{timeout}秒）")
+        return None, f"{name} 生成超时"
+    except Exception as e:
+        print(f"{name} 生成失败: {str(e)}")
+        return None, f"{name} 生成失败: {str(e)}"
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.txt')
+
+async def receive_upload(file: UploadFile) -> UploadedResume:
+    """把上传的简历读入内存（同时计算摘要），配置了 UPLOAD_SAVE_DIR 时在后台保存一份"""
+    upload = await read_upload(file)
+    print(f"文件内容读取完成，大小: {upload.size} 字节")
+    save_upload_in_background(upload)
+    return upload
+
+def project_questions(project_name: str, qa_list: List[Dict[str, Any]], start: int = 0) -> List[Dict[str, Any]]:
+    """将单个项目的问答列表转换为前端使用的格式，id 为问题 ID（project_<下标>），下标从 start 开始"""
+    return [
+        {
+            "id": project_question_id(start + i),
+            "projectName": project_name,
+            "question": qa.get("question"),
+            "answer": qa.get("answer")
+        }
+        for i, qa in enumerate(qa_list)
+    ]
+
+async def register_questions(interview_id: str, entries: Dict[str, Dict[str, Any]]) -> None:
+    """登记问题（SQLite 读写在线程池中执行）；登记失败只影响评估时能否复用参考答案，不影响上传结果"""
+    if question_registry is None:
+        return
+    try:
+        await asyncio.to_thread(question_registry.register, interview_id, entries)
+    except Exception as e:
+        print(f"问题登记失败: {str(e)}")
+
 @app.post("/api/resume/upload")
 async def upload_resume(file: UploadFile = File(...)):
     try:
         print(f"接收到文件上传请求: {file.filename}, 大小: {file.size}")
         
         # 检查文件类型
-        if not file.filename.lower().endswith(('.pdf', '.doc', '.docx', '.txt')):
+        if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
             return {"error": "不支持的文件类型，请上传 PDF、DOC、DOCX 或 TXT 文件"}
         
-        # 读取文件内容
-        content = await file.read()
-        print(f"文件内容读取完成，大小: {len(content)} 字节")
-        
-        # 保存上传的文件
-        import os
-        os.makedirs("test/data", exist_ok=True)
-        file_path = f"test/data/{file.filename}"
-        
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-        print(f"文件保存成功: {file_path}")
+        upload = await receive_upload(file)
         
         # 解析简历
         print("开始解析简历...")
-        resume = extract_resume(file_path)
+        resume = await extract_resume_async(upload, async_client)
         if not resume:
             return {"error": "简历解析失败"}
         print("简历解析完成")
         
-        # 生成面试问题
+        # 生成面试问题：三个分支只依赖解析后的简历，并发执行；共享去重索引，避免各部分选出近似重复的问题
         print("开始生成面试问题...")
-        projects_dict = projects_main(resume, client)
+        dedup = interview_index(resume)
+        (projects_dict, projects_error), (advantages, advantages_error), (code, code_error) = await asyncio.gather(
+            run_generator("projects", projects_main_async(resume, async_client, dedup=dedup)),
+            run_generator("advantages", advantages_main_async(resume, async_client, dedup=dedup)),
+            run_generator("code", generate_interview_code_question_async(resume, async_client, dedup=dedup)),
+        )
+
         # 转成数组
         projects = []
-        for project_name, qa_list in projects_dict.items():
-            for qa in qa_list:
-                projects.append({
-                    "projectName": project_name,
-                    "question": qa.get("question"),
-                    "answer": qa.get("answer")
-                })
-        
-        advantages = advantages_main(resume, client)
-        code = generate_interview_code_question(resume, client)
+        for project_name, qa_list in (projects_dict or {}).items():
+            projects.extend(project_questions(project_name, qa_list, start=len(projects)))
         print("面试问题生成完成")
-        
-        return {
+
+        interview_id = question_registry.new_interview_id() if question_registry else None
+        if interview_id:
+            await register_questions(interview_id, {**project_entries(projects), **advantage_entries(advantages), **code_entries(code)})
+
+        response = {
+            "interviewId": interview_id,
             "resume": resume,
             "questions": {
                 "projects": projects,
-                "advantages": advantages,
+                "advantages": advantages or {},
                 "code": code
             }
         }
+        # 部分分支失败时仍返回其余结果，并附带失败原因
+        errors = {
+            name: error
+            for name, error in (("projects", projects_error), ("advantages", advantages_error), ("code", code_error))
+            if error
+        }
+        if errors:
+            response["errors"] = errors
+        return response
     except Exception as e:
         print(f"处理文件上传时发生错误: {str(e)}")
         import traceback
         traceback.print_exc()
         return {"error": str(e)}
 
+def sse_event(event: str, data: Any) -> str:
+    """格式化一条 Server-Sent Events 消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+async def stream_upload_events(upload: UploadedResume):
+    """
+    依次产出流式上传的 SSE 事件：
+
+    - resume: 解析后的简历
+    - interview: 启用问题登记时发送，data 为 {"interviewId": ...}，评估时回传
+    - project: 每个项目的问答生成完成后立即发送，data 为该项目的问题列表，问题 ID 按发送顺序编号
+    - advantages / code: 对应分支完成后发送
+    - error: 解析失败或某个分支失败/超时，data 含 stage 和 error
+    - done: 全部分支结束
+    """
+    print("开始解析简历...")
+    resume = await extract_resume_async(upload, async_client)
+    if not resume:
+        yield sse_event("error", {"stage": "resume", "error": "简历解析失败"})
+        yield sse_event("done", {})
+        return
+    yield sse_event("resume", resume)
+
+    interview_id = question_registry.new_interview_id() if question_registry else None
+    if interview_id:
+        yield sse_event("interview", {"interviewId": interview_id})
+
+    queue: asyncio.Queue = asyncio.Queue()
+    sent_project_questions = 0
+    dedup = interview_index(resume)
+
+    async def stream_projects():
+        nonlocal sent_project_questions
+        project_stream = iter_projects_async(resume, async_client, dedup=dedup)
+        try:
+            async for project_name, qa_list in project_stream:
+                questions = project_questions(project_name, qa_list, start=sent_project_questions)
+                sent_project_questions += len(questions)
+                if interview_id:
+                    await register_questions(interview_id, project_entries(questions))
+                await queue.put(("project", {"projectName": project_name, "questions": questions}))
+        finally:
+            # 超时被 wait_for 取消时显式关闭生成器，立即取消其中仍在运行的项目任务，而不是留给垃圾回收
+            await project_stream.aclose()
+
+    async def produce(name, coro):
+        # 复用上传接口的超时与错误隔离：某个分支失败时只发送 error 事件
+        result, error = await run_generator(name, coro)
+        if error:
+            await queue.put(("error", {"stage": name, "error": error}))
+        elif name != "projects":
+            if interview_id:
+                await register_questions(interview_id, advantage_entries(result) if name == "advantages" else code_entries(result))
+            await queue.put((name, result or {}))
+
+    producers = [
+        asyncio.ensure_future(produce("projects", stream_projects())),
+        asyncio.ensure_future(produce("advantages", advantages_main_async(resume, async_client, dedup=dedup))),
+        asyncio.ensure_future(produce("code", generate_interview_code_question_async(resume, async_client, dedup=dedup))),
+    ]
+    all_done = asyncio.ensure_future(asyncio.gather(*producers))
+    try:
+        while not (all_done.done() and queue.empty()):
+            get_event = asyncio.ensure_future(queue.get())
+            await asyncio.wait({get_event, all_done}, return_when=asyncio.FIRST_COMPLETED)
+            if get_event.done():
+                event, data = get_event.result()
+                yield sse_event(event, data)
+            else:
+                get_event.cancel()
+        yield sse_event("done", {})
+    finally:
+        # 客户端断开时取消仍在运行的分支
+        for producer in producers:
+            producer.cancel()
+        all_done.cancel()
+
+@app.post("/api/resume/upload/stream")
+async def upload_resume_stream(file: UploadFile = File(...)):
+    """
+    /api/resume/upload 的流式版本，以 text/event-stream 逐步返回解析结果和各部分问题，
+    前端无需等待全部问题生成完毕即可开始渲染。
+    """
+    print(f"接收到流式上传请求: {file.filename}, 大小: {file.size}")
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        return {"error": "不支持的文件类型，请上传 PDF、DOC、DOCX 或 TXT 文件"}
+
+    try:
+        upload = await receive_upload(file)
+    except UploadTooLarge as e:
+        return {"error": str(e)}
+    return StreamingResponse(
+        stream_upload_events(upload),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.post("/api/interview/evaluate")
-async def evaluate_interview(answers: List[AnswerData]):
+async def evaluate_interview(answers: List[AnswerData], interviewId: Optional[str] = None):
+    """
+    评估面试回答。interviewId 为上传接口返回的面试 ID（查询参数），
+    登记过的问题直接使用上传时生成的问题文本和参考答案，只调用一次评分。
+    """
     try:
         # 将答案转换为后端需要的格式
-        project_qa = {}
-        advantages = {}
-        code = None
-        
-        for answer in answers:
-            if answer.questionId.startswith("project_"):
-                # 提取项目名称（假设格式为 project_0, project_1 等）
-                project_index = answer.questionId.split("_")[1]
-                project_name = f"项目{project_index}"
-                if project_name not in project_qa:
-                    project_qa[project_name] = []
-                project_qa[project_name].append({
-                    "question": answer.questionId,
-                    "answer": answer.answer
-                })
-            elif answer.questionId.startswith("advantage_"):
-                advantages = {
-                    "question": answer.questionId,
-                    "answer": answer.answer
-                }
-            elif answer.questionId.startswith("code_"):
-                code = (answer.questionId, answer.answer)
-        
+        questions = {}
+        if interviewId and question_registry is not None:
+            questions = await asyncio.to_thread(question_registry.get, interviewId)
+            if not questions:
+                print(f"未找到面试 {interviewId} 的登记问题，将重新生成参考答案")
+        project_qa, advantages, code = evaluation_inputs(
+            [(answer.questionId, answer.answer) for answer in answers],
+            questions
+        )
+
         # 生成评估报告
-        report = evaluation(client, project_qa, advantages, code, {})
+        report = await evaluation_async(async_client, project_qa, advantages, code, {})
         return report
     except Exception as e:
         return {"error": str(e)}
 
+@app.get("/metrics")
+async def llm_metrics():
+    """以 Prometheus 文本格式输出本进程的 LLM 调用指标"""
+    return PlainTextResponse(metrics.render(), headers={"Content-Type": metrics.CONTENT_TYPE})
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000) 
@@ -0,0 +1 @@
+# 初始化backend.benchmarks包
\ No newline at end of file
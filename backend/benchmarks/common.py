@@ -0,0 +1,209 @@
+"""
+基准测试的公共工具：合成简历语料（纯文本 / PDF / DOCX）、延迟分位数、峰值内存和结果输出。
+
+基准测试使用 llm.fake 中的离线模拟模型，需要在导入 pipeline / parser 之前调用
+use_fake_backend()，以关闭响应缓存和简历缓存，避免重复运行直接命中缓存。
+"""
+
+import json
+import math
+import os
+import random
+import sys
+from typing import Any, Dict, List, Optional
+
+_TECHNOLOGIES = ["Python", "Go", "Java", "Redis", "MySQL", "Kafka", "Docker", "Kubernetes", "React", "PyTorch"]
+_DOMAINS = ["订单", "推荐", "日志", "支付", "搜索", "风控", "消息", "监控", "调度", "画像"]
+
+
+def use_fake_backend() -> None:
+    """让本进程使用离线模拟模型，并关闭响应缓存、简历缓存和连接预热"""
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["LLM_CACHE_ENABLED"] = "0"
+    os.environ["RESUME_CACHE_ENABLED"] = "0"
+    os.environ["LLM_WARMUP"] = "0"
+
+
+def synthetic_resume_text(num_projects: int, seed: int = 0, boilerplate: bool = False) -> str:
+    """
+    生成包含 num_projects 个项目的纯文本简历。
+    项目以 "项目：名称" 行开头，模拟模型据此返回相同数量的项目。
+
+    Args:
+        boilerplate: 加入分节标题、个人优势，以及提取 schema 用不到的内容（基本信息、求职意向、兴趣爱好、推荐人），
+                     结构与常见简历模板导出的文本一致
+    """
+    rng = random.Random(seed)
+    skills = rng.sample(_TECHNOLOGIES, 5)
+    lines = [
+        f"候选人{seed}",
+        "教育背景：示例大学 计算机科学与技术 本科 2022",
+        f"技能：{', '.join(skills)}",
+        "工作经历：示例科技有限公司 后端开发工程师 2022-2024",
+        ""
+    ]
+    if boilerplate:
+        lines[1:1] = [
+            f"电话：138-0000-{seed % 10000:04d}  |  邮箱：candidate{seed}@example.com",
+            "",
+            "基本信息",
+            "性别：男",
+            "出生年月：1998.06",
+            "籍贯：浙江杭州",
+            "政治面貌：群众",
+            "",
+            "求职意向",
+            "后端开发工程师  |  杭州  |  薪资面议  |  随时到岗",
+            "",
+            "教育背景",
+        ]
+        lines.append("项目经历")
+    for i in range(num_projects):
+        domain = _DOMAINS[i % len(_DOMAINS)]
+        technologies = rng.sample(_TECHNOLOGIES, 3)
+        lines += [
+            f"项目：{domain}系统{i + 1}",
+            f"描述：基于 {'、'.join(technologies)} 构建的{domain}服务，支撑日均百万级请求。",
+            f"职责：负责{domain}模块的架构设计、核心接口开发和性能优化。",
+            f"成就：接口 P99 延迟降低 {rng.randint(20, 60)}%，资源成本降低 {rng.randint(10, 40)}%。",
+            ""
+        ]
+    if boilerplate:
+        lines += ["个人优势", "熟悉高并发服务的设计与调优，有线上问题排查经验。", "沟通顺畅，能推动跨团队协作。", ""]
+        lines += ["兴趣爱好", "篮球、摄影、长跑，参与开源社区活动。", "", "推荐人", "如有需要可提供推荐人联系方式。"]
+    return "\n".join(lines)
+
+
+def _pdf_text_op(line: str) -> str:
+    return f"<{line.encode('utf-16-be').hex()}> Tj T*"
+
+
+def synthetic_resume_pdf(num_pages: int, seed: int = 0, shapes_per_page: int = 0, blank_pages: int = 0,
+                         boilerplate: bool = False) -> bytes:
+    """
+    生成 num_pages 页的 PDF 简历，正文为 synthetic_resume_text 的内容，使用 PDF 阅读器内置的
+    STSong-Light 中文字体（不嵌入字体文件）。
+
+    Args:
+        shapes_per_page: 每页额外绘制的矩形数量，模拟分栏线、图标等图形元素较多的简历
+        blank_pages: 末尾没有文本层的页数，模拟扫描页
+        boilerplate: 见 synthetic_resume_text，并在每页加上页眉和“第 n 页 / 共 N 页”页脚
+    """
+    rng = random.Random(seed)
+    lines = synthetic_resume_text(max(1, num_pages * 3), seed=seed, boilerplate=boilerplate).splitlines()
+    per_page = max(1, -(-len(lines) // num_pages))
+
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    descriptor = add(b"<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880] "
+                     b"/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>")
+    descendant = add(f"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+                     f"/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 4 >> "
+                     f"/FontDescriptor {descriptor} 0 R /DW 1000 >>".encode())
+    font = add(f"<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H "
+               f"/DescendantFonts [{descendant} 0 R] >>".encode())
+    pages_id = add(b"")
+    kids = []
+    for page in range(num_pages + blank_pages):
+        ops = []
+        if page < num_pages:
+            ops += ["BT", "/F1 10 Tf", "14 TL", "50 800 Td"]
+            page_lines = lines[page * per_page:(page + 1) * per_page]
+            if boilerplate:
+                page_lines = [f"候选人{seed} 个人简历  candidate{seed}@example.com", ""] + page_lines + [
+                    "", f"第 {page + 1} 页 / 共 {num_pages} 页"
+                ]
+            ops += [_pdf_text_op(line) for line in page_lines]
+            ops.append("ET")
+        for _ in range(shapes_per_page if page < num_pages else 0):
+            ops.append(f"{rng.randint(0, 560)} {rng.randint(0, 820)} {rng.randint(2, 30)} {rng.randint(2, 30)} re S")
+        stream = "\n".join(ops).encode()
+        content = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        kids.append(add(f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 595 842] "
+                        f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {content} 0 R >>".encode()))
+    objects[pages_id - 1] = (f"<< /Type /Pages /Kids [{' '.join(f'{kid} 0 R' for kid in kids)}] "
+                             f"/Count {len(kids)} >>").encode()
+    catalog = add(f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode())
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref)
+    return bytes(out)
+
+
+def synthetic_resume_docx(num_projects: int, seed: int = 0, table_layout: bool = False) -> bytes:
+    """
+    生成 DOCX 简历，内容与 synthetic_resume_text 相同。
+
+    Args:
+        table_layout: 按常见中文模板用表格排版（每行“字段 | 内容”两列），否则每行一个段落
+    """
+    import io
+    from docx import Document
+
+    document = Document()
+    lines = [line for line in synthetic_resume_text(num_projects, seed=seed).splitlines() if line]
+    if table_layout:
+        table = document.add_table(rows=0, cols=2)
+        for line in lines:
+            label, _, value = line.partition("：")
+            cells = table.add_row().cells
+            cells[0].text = label if value else ""
+            cells[1].text = value or line
+    else:
+        for line in lines:
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """返回样本的 p50/p95/p99/均值/最大值（与样本同单位，最近秩法）"""
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {
+        "p50": round(rank(50), 3),
+        "p95": round(rank(95), 3),
+        "p99": round(rank(99), 3),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "max": round(ordered[-1], 3)
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """返回本进程的峰值常驻内存（MB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]) -> None:
+    """输出 JSON 结果，output 为空时打印到标准输出"""
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if not output:
+        print(text)
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"基准结果已保存到: {output}")
@@ -0,0 +1,88 @@
+"""
+DOCX 文本提取的基准：python-docx 对象模型（改动前的实现）与 parser.docx_text 的流式读取对比。
+
+语料包括 test/data 中的真实简历，以及 benchmarks.common.synthetic_resume_docx 生成的
+段落排版 / 表格排版简历（不同项目数）。输出：
+    每种读取方式在每份文档上的延迟分位数（毫秒）
+    解析过程中 Python 堆的峰值（MB，tracemalloc）：lxml 在 C 层分配的内存不计入，
+        python-docx 的数值是下限
+    提取的字符数（表格排版时 python-docx 只读正文段落，几乎取不到内容）
+
+用法（在 backend 目录下）：
+    python -m benchmarks.docx_bench --runs 20
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+from typing import Any, Dict
+
+from benchmarks.common import percentiles, synthetic_resume_docx, write_report
+from parser.docx_text import extract_docx_text
+
+READERS = {"python_docx": False, "streaming": True}
+FIXTURES = ["test/data/test.docx", "test/data/test_problematic_resume.docx"]
+
+
+def corpus() -> Dict[str, bytes]:
+    documents = {}
+    for path in FIXTURES:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                documents[os.path.basename(path)] = f.read()
+    for projects in (3, 30, 300):
+        documents[f"paragraphs_{projects}_projects"] = synthetic_resume_docx(projects, seed=projects)
+    for projects in (3, 30):
+        documents[f"table_{projects}_projects"] = synthetic_resume_docx(projects, seed=projects, table_layout=True)
+    return documents
+
+
+def peak_heap_mb(raw: bytes, streaming: bool) -> float:
+    tracemalloc.start()
+    try:
+        extract_docx_text(raw, streaming=streaming)
+        return round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(runs: int) -> Dict[str, Any]:
+    documents = corpus()
+    results = {}
+    for reader, streaming in READERS.items():
+        result = {}
+        for name, raw in documents.items():
+            text = extract_docx_text(raw, streaming=streaming)
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                extract_docx_text(raw, streaming=streaming)
+                samples.append((time.perf_counter() - start) * 1000)
+            result[name] = {
+                "latency_ms": percentiles(samples),
+                "peak_heap_mb": peak_heap_mb(raw, streaming),
+                "chars": len(text)
+            }
+        results[reader] = result
+
+    for name in documents:
+        baseline = results["python_docx"][name]["latency_ms"]["p50"]
+        results["streaming"][name]["speedup_p50"] = round(baseline / results["streaming"][name]["latency_ms"]["p50"], 2)
+
+    return {
+        "config": {"runs": runs, "documents": {name: {"bytes": len(raw)} for name, raw in documents.items()}},
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DOCX 文本提取基准")
+    parser.add_argument("--runs", type=int, default=10, help="每份文档的重复次数")
+    parser.add_argument("--output", help="结果 JSON 路径，不指定时打印到标准输出")
+    args = parser.parse_args()
+    write_report(run_benchmark(max(1, args.runs)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+简历提取的规则快速路径（parser.rule_extract）基准：规则 + 模型补全与全部交给模型的对比。
+
+语料：
+    template_*: 常见模板结构的简历（分节标题、字段标签齐全），纯文本和 PDF
+    plain_*: 没有个人优势分节的简历，规则提取后只需模型补全 advantages
+    prose: 无分节的自述式简历，规则提取置信度不足，整份交给模型
+
+对每份简历分别在 RESUME_RULE_EXTRACTION=0（每次都调用模型提取全部字段）和 =1 下运行
+extract_resume_async（离线模拟模型），输出：
+    提取路径（rules / hybrid / llm）和由模型提取的字段
+    端到端延迟分位数（毫秒，含文件解析、规范化和规则提取）
+    模型调用次数、prompt / completion token 数
+    两种方式得到的项目数是否一致
+
+用法（在 backend 目录下）：
+    python -m benchmarks.extract_bench --runs 5 --latency-ms 300 --tokens-per-sec 50
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+from typing import Any, Dict, Tuple
+
+from benchmarks.common import percentiles, synthetic_resume_pdf, synthetic_resume_text, use_fake_backend, write_report
+
+use_fake_backend()
+
+from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM  # noqa: E402
+from parser.extractor import extract_resume_async  # noqa: E402
+from parser.ingest import UploadedResume  # noqa: E402
+
+PROSE_RESUME = (
+    "我叫张三，2022 年毕业于示例大学计算机专业，之后一直在一家互联网公司做后端开发。"
+    "工作中主要负责订单系统1的设计和开发，用 Go 和 Redis 重写了下单链路，把高峰期的接口延迟降低了一半。"
+    "平时喜欢研究分布式系统，也参与过一些开源项目。"
+)
+
+
+def corpus() -> Dict[str, Tuple[str, bytes]]:
+    documents = {}
+    for projects in (3, 10):
+        text = synthetic_resume_text(projects, seed=projects, boilerplate=True)
+        documents[f"template_txt_{projects}_projects"] = ("resume.txt", text.encode("utf-8"))
+    documents["template_pdf_2_pages"] = ("resume.pdf", synthetic_resume_pdf(2, seed=2, boilerplate=True))
+    documents["plain_txt_3_projects"] = ("resume.txt", synthetic_resume_text(3, seed=3).encode("utf-8"))
+    documents["prose"] = ("resume.txt", PROSE_RESUME.encode("utf-8"))
+    return documents
+
+
+async def _run_mode(filename: str, content: bytes, rules: bool, runs: int, config: FakeConfig) -> Dict[str, Any]:
+    os.environ["RESUME_RULE_EXTRACTION"] = "1" if rules else "0"
+    llm = FakeLLM(config)
+    client = AsyncFakeOpenAI(llm)
+    latencies = []
+    resume = {}
+    for run in range(runs):
+        # 每次使用不同的摘要，避免命中简历缓存
+        upload = UploadedResume(filename, content, f"bench-{rules}-{run}")
+        start = time.perf_counter()
+        resume = await extract_resume_async(upload, client)
+        latencies.append((time.perf_counter() - start) * 1000)
+    stats = llm.stats()["by_family"].get("extract", {})
+    extraction = resume.get("extraction", {})
+    return {
+        "path": extraction.get("path"),
+        "llm_fields": extraction.get("llm_fields"),
+        "rule_confidence": extraction.get("confidence"),
+        "latency_ms": percentiles(latencies),
+        "llm_calls_per_resume": stats.get("calls", 0) / runs,
+        "prompt_tokens_per_resume": stats.get("prompt_tokens", 0) // runs,
+        "completion_tokens_per_resume": stats.get("completion_tokens", 0) // runs,
+        "projects": len(resume.get("projects") or [])
+    }
+
+
+async def run_benchmark(runs: int, config: FakeConfig) -> Dict[str, Any]:
+    results = {}
+    for name, (filename, content) in corpus().items():
+        llm_only = await _run_mode(filename, content, False, runs, config)
+        hybrid = await _run_mode(filename, content, True, runs, config)
+        results[name] = {
+            "llm_only": llm_only,
+            "rules_first": hybrid,
+            "p50_speedup": round(llm_only["latency_ms"]["p50"] / hybrid["latency_ms"]["p50"], 1),
+            "projects_match": llm_only["projects"] == hybrid["projects"]
+        }
+    return {
+        "config": {
+            "runs": runs,
+            "latency_ms": config.latency_ms,
+            "latency_sigma": config.latency_sigma,
+            "tokens_per_sec": config.tokens_per_sec,
+            "prompt_tokens_per_sec": config.prompt_tokens_per_sec,
+            "seed": config.seed
+        },
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历提取的规则快速路径与全部交给模型的对比（离线模拟模型）")
+    parser.add_argument("--runs", type=int, default=5, help="每份简历、每种方式的提取次数")
+    parser.add_argument("--latency-ms", type=float, default=300, help="模型首 token 延迟中位数（毫秒）")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="延迟对数正态分布的 sigma")
+    parser.add_argument("--tokens-per-sec", type=float, default=50, help="模型输出速度，0 表示瞬间输出")
+    parser.add_argument("--prompt-tokens-per-sec", type=float, default=0, help="prompt 处理速度（token/秒），0 表示不计")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果 JSON 路径，不指定时打印到标准输出")
+    parser.add_argument("--verbose", action="store_true", help="保留提取过程的调试输出")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        seed=args.seed,
+        prompt_tokens_per_sec=args.prompt_tokens_per_sec
+    )
+    with open(os.devnull, "w") as devnull, contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        report = asyncio.run(run_benchmark(max(1, args.runs), config))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+简历文本规范化（parser.normalize）的基准：提取调用的 prompt token 数和延迟。
+
+语料为 benchmarks.common 生成的 PDF 简历（带页眉页脚、基本信息、求职意向、兴趣爱好等内容）
+和对应的纯文本简历。对每份简历分别以原始文本和规范化后的文本调用提取（离线模拟模型，
+首 token 延迟按 --prompt-tokens-per-sec 计入 prompt 处理时间），输出：
+    每份简历的 prompt token 数、节省的 token 数和比例
+    规范化本身的耗时（毫秒）
+    提取调用的延迟分位数（毫秒）
+    模拟模型识别出的项目数是否不变（规范化不应删掉正文）
+
+用法（在 backend 目录下）：
+    python -m benchmarks.normalize_bench --runs 20 --prompt-tokens-per-sec 2000
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict
+
+from benchmarks.common import percentiles, synthetic_resume_pdf, synthetic_resume_text, use_fake_backend, write_report
+
+use_fake_backend()
+
+from llm.fake import FakeConfig, FakeLLM, FakeOpenAI  # noqa: E402
+from llm.tokens import estimate_messages_tokens  # noqa: E402
+from parser.extractor import _extraction_messages, parse_file_bytes  # noqa: E402
+from parser.normalize import normalize_resume_text  # noqa: E402
+
+
+def corpus() -> Dict[str, str]:
+    documents = {}
+    for pages in (1, 2, 4):
+        raw = synthetic_resume_pdf(pages, seed=pages, boilerplate=True)
+        documents[f"pdf_{pages}_pages"] = parse_file_bytes(raw, ".pdf")
+    for projects in (3, 10):
+        documents[f"txt_{projects}_projects"] = synthetic_resume_text(projects, seed=projects, boilerplate=True)
+    return documents
+
+
+def _extract(client, text: str):
+    start = time.perf_counter()
+    response = client.chat.completions.create(model="fake-chat", messages=_extraction_messages(text))
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, len(json.loads(response.choices[0].message.content)["projects"])
+
+
+def run_benchmark(runs: int, config: FakeConfig) -> Dict[str, Any]:
+    client = FakeOpenAI(FakeLLM(config))
+    results = {}
+    for name, text in corpus().items():
+        start = time.perf_counter()
+        normalized = normalize_resume_text(text)
+        normalize_ms = (time.perf_counter() - start) * 1000
+
+        latency = {"raw": [], "normalized": []}
+        projects = {}
+        for _ in range(runs):
+            for variant, prompt in (("raw", text), ("normalized", normalized.text)):
+                elapsed, projects[variant] = _extract(client, prompt)
+                latency[variant].append(elapsed)
+
+        raw_tokens = estimate_messages_tokens(_extraction_messages(text))
+        tokens = estimate_messages_tokens(_extraction_messages(normalized.text))
+        results[name] = {
+            "prompt_tokens": {"raw": raw_tokens, "normalized": tokens},
+            "tokens_saved": raw_tokens - tokens,
+            "tokens_saved_ratio": round((raw_tokens - tokens) / raw_tokens, 3),
+            "dropped_sections": normalized.dropped_sections,
+            "removed_lines": normalized.removed_lines,
+            "normalize_ms": round(normalize_ms, 3),
+            "extract_latency_ms": {variant: percentiles(samples) for variant, samples in latency.items()},
+            "projects_preserved": projects["raw"] == projects["normalized"]
+        }
+    return {
+        "config": {
+            "runs": runs,
+            "latency_ms": config.latency_ms,
+            "latency_sigma": config.latency_sigma,
+            "tokens_per_sec": config.tokens_per_sec,
+            "prompt_tokens_per_sec": config.prompt_tokens_per_sec,
+            "seed": config.seed
+        },
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="简历文本规范化对提取调用的影响（离线模拟模型）")
+    parser.add_argument("--runs", type=int, default=10, help="每份简历的提取次数")
+    parser.add_argument("--latency-ms", type=float, default=50, help="模型首 token 延迟中位数（毫秒，不含 prompt 处理）")
+    parser.add_argument("--latency-sigma", type=float, default=0.0, help="延迟对数正态分布的 sigma")
+    parser.add_argument("--tokens-per-sec", type=float, default=0, help="模型输出速度，0 表示瞬间输出")
+    parser.add_argument("--prompt-tokens-per-sec", type=float, default=2000, help="prompt 处理速度（token/秒）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果 JSON 路径，不指定时打印到标准输出")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        seed=args.seed,
+        prompt_tokens_per_sec=args.prompt_tokens_per_sec
+    )
+    write_report(run_benchmark(max(1, args.runs), config), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+PDF 文本提取的基准：旧实现（逐页 pdfplumber + 字符串累加）与 parser.pdf_text 的几种配置对比。
+
+语料由 benchmarks.common.synthetic_resume_pdf 生成，覆盖不同页数、图形数量和扫描页（无文本层），输出：
+    每种配置在每类文档上的延迟分位数（毫秒）
+    相对旧实现的加速比（p50）
+    各配置的文本是否与旧实现一致（快速路径的空白和换行可能略有差异，这里比较去掉空白后的文本）
+
+进程池在首次使用时启动，启动开销不计入结果（先预热一次）。单核机器上进程池配置没有加速效果。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.pdf_bench --runs 20 --workers 4
+"""
+
+import argparse
+import io
+import os
+import time
+from typing import Any, Callable, Dict
+
+import pdfplumber
+
+from benchmarks.common import peak_rss_mb, percentiles, synthetic_resume_pdf, write_report
+from parser.pdf_text import extract_pdf_text
+
+# (名称, 页数, 每页图形数, 扫描页数)
+CORPUS = [
+    ("1_page", 1, 0, 0),
+    ("2_pages_graphics", 2, 300, 0),
+    ("5_pages", 5, 20, 0),
+    ("5_pages_scanned_tail", 5, 20, 2),
+    ("20_pages_graphics", 20, 300, 0),
+]
+
+
+def legacy_pdf_text(raw: bytes) -> str:
+    """改动前 parse_file_bytes 中的实现"""
+    text = ""
+    with pdfplumber.open(io.BytesIO(raw)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text + "\n"
+    return text
+
+
+def _squash(text: str) -> str:
+    return "".join(text.split())
+
+
+def run_config(extract: Callable[[bytes], str], documents: Dict[str, bytes], expected: Dict[str, str],
+               runs: int) -> Dict[str, Any]:
+    result = {}
+    for name, raw in documents.items():
+        text = extract(raw)
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            extract(raw)
+            samples.append((time.perf_counter() - start) * 1000)
+        result[name] = {
+            "latency_ms": percentiles(samples),
+            "matches_legacy_text": _squash(text) == _squash(expected[name])
+        }
+    return result
+
+
+def run_benchmark(runs: int, workers: int) -> Dict[str, Any]:
+    documents = {
+        name: synthetic_resume_pdf(pages, seed=i, shapes_per_page=shapes, blank_pages=blank)
+        for i, (name, pages, shapes, blank) in enumerate(CORPUS)
+    }
+    expected = {name: legacy_pdf_text(raw) for name, raw in documents.items()}
+    configs = {
+        "legacy": legacy_pdf_text,
+        "pdfplumber_only": lambda raw: extract_pdf_text(raw, workers=1, page_limit=None, fast=False),
+        "fast_path": lambda raw: extract_pdf_text(raw, workers=1, page_limit=None, fast=True),
+        f"fast_path_{workers}_workers": lambda raw: extract_pdf_text(raw, workers=workers, page_limit=None, fast=True),
+    }
+
+    results = {name: run_config(extract, documents, expected, runs) for name, extract in configs.items()}
+    for name, result in results.items():
+        for doc, stats in result.items():
+            baseline = results["legacy"][doc]["latency_ms"]["p50"]
+            stats["speedup_p50"] = round(baseline / stats["latency_ms"]["p50"], 2)
+
+    return {
+        "config": {
+            "runs": runs,
+            "workers": workers,
+            "cpu_count": os.cpu_count(),
+            "documents": {name: {"pages": pages + blank, "shapes_per_page": shapes, "scanned_pages": blank,
+                                 "bytes": len(documents[name])}
+                          for name, pages, shapes, blank in CORPUS}
+        },
+        "results": results,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 文本提取基准")
+    parser.add_argument("--runs", type=int, default=10, help="每类文档的重复次数")
+    parser.add_argument("--workers", type=int, default=4, help="多进程配置的进程数")
+    parser.add_argument("--output", help="结果 JSON 路径，不指定时打印到标准输出")
+    args = parser.parse_args()
+    write_report(run_benchmark(max(1, args.runs), max(2, args.workers)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+端到端流水线基准测试。
+
+使用离线模拟模型（llm.fake）驱动与 /api/resume/upload、/api/interview/evaluate 相同的入口：
+extract_resume_async → projects_main_async / advantages_main_async /
+generate_interview_code_question_async（并发）→ evaluation_async，
+语料为包含 1~10 个项目的合成简历。
+
+对每个阶段和整体输出 p50/p95/p99 延迟（毫秒）、模型调用次数、prompt/completion token 总数，
+以及进程峰值内存，结果为 JSON，便于在不同版本之间对比。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.pipeline_bench --runs 5 --output ../result/bench/pipeline.json
+    python -m benchmarks.pipeline_bench --projects 1 5 10 --latency-ms 800 --concurrency 8
+    EVALUATION_SINGLE_PASS=1 python -m benchmarks.pipeline_bench --runs 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from benchmarks.common import peak_rss_mb, percentiles, synthetic_resume_text, use_fake_backend, write_report
+
+use_fake_backend()
+
+from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM  # noqa: E402
+from qa_engine.dedup import interview_index  # noqa: E402
+from pipeline import (  # noqa: E402
+    extract_resume_async,
+    projects_main_async,
+    advantages_main_async,
+    generate_interview_code_question_async,
+    evaluation_async,
+)
+
+STAGES = ["extract", "projects", "advantages", "code", "generate", "evaluation", "overall"]
+
+# 模拟模型的请求类别（llm_stage 标签的前缀）对应的流水线阶段
+_FAMILY_STAGES = {
+    "extract": "extract",
+    "project": "projects",
+    "advantage": "advantages",
+    "code": "code",
+    "eval": "evaluation",
+}
+
+
+def _stage_of(family: str) -> str:
+    return _FAMILY_STAGES.get(family.split(".")[0], "other")
+
+
+def _usage_by_stage(stats: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    """把 FakeLLM.stats() 的按类别统计汇总为按阶段统计，并计算整体合计"""
+    usage = defaultdict(lambda: {"llm_calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0})
+    for family, counts in stats["by_family"].items():
+        for stage in (_stage_of(family), "overall"):
+            usage[stage]["llm_calls"] += counts["calls"]
+            usage[stage]["errors"] += counts["errors"]
+            usage[stage]["prompt_tokens"] += counts["prompt_tokens"]
+            usage[stage]["completion_tokens"] += counts["completion_tokens"]
+    generate = usage["generate"]
+    for stage in ("projects", "advantages", "code"):
+        for name, value in usage[stage].items():
+            generate[name] += value
+    return dict(usage)
+
+
+async def _timed(timings: Dict[str, List[float]], stage: str, coro):
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        timings[stage].append((time.perf_counter() - start) * 1000)
+
+
+async def run_resume(client, path: str, timings: Dict[str, List[float]]) -> None:
+    """按接口的调用方式处理一份简历：提取 → 三个生成分支并发 → 评估"""
+    start = time.perf_counter()
+    resume = await _timed(timings, "extract", extract_resume_async(path, client))
+
+    dedup = interview_index(resume)
+    projects, advantages, code = await _timed(timings, "generate", asyncio.gather(
+        _timed(timings, "projects", projects_main_async(resume, client, dedup=dedup)),
+        _timed(timings, "advantages", advantages_main_async(resume, client, dedup=dedup)),
+        _timed(timings, "code", generate_interview_code_question_async(resume, client, dedup=dedup)),
+    ))
+
+    # 以生成的参考答案作为用户回答
+    await _timed(timings, "evaluation", evaluation_async(client, projects, advantages, code, {}))
+    timings["overall"].append((time.perf_counter() - start) * 1000)
+
+
+async def run_bucket(client, paths: List[str], concurrency: int, timings: Dict[str, List[float]]) -> float:
+    """以给定并发数处理一组简历，返回总耗时（秒）"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(path):
+        async with semaphore:
+            await run_resume(client, path, timings)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(path) for path in paths))
+    return time.perf_counter() - start
+
+
+def _stage_report(timings: Dict[str, List[float]], usage: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    empty = {"llm_calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+    return {
+        stage: {"latency_ms": percentiles(timings.get(stage, [])), **usage.get(stage, empty)}
+        for stage in STAGES
+    }
+
+
+async def run_benchmark(project_counts: List[int], runs: int, concurrency: int, config: FakeConfig) -> Dict[str, Any]:
+    llm = FakeLLM(config)
+    client = AsyncFakeOpenAI(llm)
+    all_timings = defaultdict(list)
+    all_usage = defaultdict(lambda: defaultdict(int))
+    by_projects = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for num_projects in project_counts:
+            paths = []
+            for run in range(runs):
+                path = os.path.join(workdir, f"resume_{num_projects}_{run}.txt")
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(synthetic_resume_text(num_projects, seed=num_projects * 1000 + run))
+                paths.append(path)
+
+            llm.reset()
+            timings = defaultdict(list)
+            elapsed = await run_bucket(client, paths, concurrency, timings)
+            usage = _usage_by_stage(llm.stats())
+            for stage, samples in timings.items():
+                all_timings[stage].extend(samples)
+            for stage, counts in usage.items():
+                for name, value in counts.items():
+                    all_usage[stage][name] += value
+
+            by_projects[str(num_projects)] = {
+                "resumes_per_sec": round(len(paths) / elapsed, 3),
+                "stages": _stage_report(timings, usage)
+            }
+
+    return {
+        "config": {
+            "project_counts": project_counts,
+            "runs": runs,
+            "concurrency": concurrency,
+            "latency_ms": config.latency_ms,
+            "latency_sigma": config.latency_sigma,
+            "tokens_per_sec": config.tokens_per_sec,
+            "error_rate": config.error_rate,
+            "rate_limit_rate": config.rate_limit_rate,
+            "seed": config.seed,
+            "project_qa_concurrency": int(os.getenv("PROJECT_QA_CONCURRENCY", 4)),
+            "question_selector": os.getenv("QUESTION_SELECTOR", "local"),
+            "question_bank": os.getenv("QUESTION_BANK_ENABLED", "0").lower() in ("1", "true", "yes"),
+            "question_dedup": os.getenv("QUESTION_DEDUP_ENABLED", "1").lower() not in ("0", "false", "no"),
+            "resume_normalize": os.getenv("RESUME_NORMALIZE", "1").lower() not in ("0", "false", "no"),
+            "resume_rule_extraction": os.getenv("RESUME_RULE_EXTRACTION", "1").lower() not in ("0", "false", "no"),
+            "evaluation_concurrency": int(os.getenv("EVALUATION_CONCURRENCY", 4)),
+            "evaluation_single_pass": os.getenv("EVALUATION_SINGLE_PASS", "0").lower() in ("1", "true", "yes")
+        },
+        "stages": _stage_report(all_timings, {stage: dict(counts) for stage, counts in all_usage.items()}),
+        "by_projects": by_projects,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="端到端流水线基准测试（离线模拟模型）")
+    parser.add_argument("--projects", type=int, nargs="+", default=list(range(1, 11)), help="简历中的项目数，默认 1~10")
+    parser.add_argument("--runs", type=int, default=3, help="每种项目数运行的简历份数")
+    parser.add_argument("--concurrency", type=int, default=1, help="同时处理的简历数")
+    parser.add_argument("--latency-ms", type=float, default=300, help="模型首 token 延迟中位数（毫秒）")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="延迟对数正态分布的 sigma")
+    parser.add_argument("--tokens-per-sec", type=float, default=50, help="模型输出速度，0 表示瞬间输出")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="注入 500 错误的概率")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="注入 429 错误的概率")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果 JSON 路径，不指定时打印到标准输出")
+    parser.add_argument("--verbose", action="store_true", help="保留流水线自身的调试输出")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+    # 流水线各模块用 print 输出调试信息，默认屏蔽，避免与 JSON 结果混在一起
+    with open(os.devnull, "w") as devnull, contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        report = asyncio.run(run_benchmark(args.projects, args.runs, max(1, args.concurrency), config))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
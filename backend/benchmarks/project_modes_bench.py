@@ -0,0 +1,129 @@
+"""
+项目问答生成各模式的对比基准。
+
+逐步生成：每个项目 生成问题池 → 选择问题 → 生成参考答案，共 3 次模型调用；
+快速模式：每个项目 1 次调用同时返回排序后的问题池、选中问题和参考答案；
+批量模式：整份简历 1 次调用（超出 token 预算时回退到逐项目调用）。
+
+在离线模拟模型上分别运行 projects_main_async，输出各模式的延迟分位数（毫秒）、
+每份简历的模型调用次数和 token 数，结果为 JSON。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.project_modes_bench --projects 1 3 5 10 --runs 5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import peak_rss_mb, percentiles, use_fake_backend, write_report
+
+use_fake_backend()
+
+from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM  # noqa: E402
+from qa_engine.projects import projects_main_async  # noqa: E402
+
+MODES = {
+    "classic": {"fast_mode": False, "batch_mode": False},
+    "fast": {"fast_mode": True, "batch_mode": False},
+    "batch": {"fast_mode": True, "batch_mode": True},
+}
+
+
+def _resume(num_projects: int) -> Dict[str, Any]:
+    return {
+        "skills": ["Python", "Redis", "Kafka"],
+        "education": [{"school": "示例大学", "degree": "本科"}],
+        "projects": [
+            {
+                "name": f"项目{i + 1}",
+                "description": "支撑日均百万级请求的后端服务",
+                "technologies": ["Python", "Redis", "Kafka"],
+                "responsibilities": ["负责架构设计和核心接口开发"],
+                "achievements": ["P99 延迟降低 40%"]
+            }
+            for i in range(num_projects)
+        ]
+    }
+
+
+async def run_mode(mode: Dict[str, bool], project_counts: List[int], runs: int, config: FakeConfig) -> Dict[str, Any]:
+    llm = FakeLLM(config)
+    client = AsyncFakeOpenAI(llm)
+    result = {}
+    for num_projects in project_counts:
+        resume = _resume(num_projects)
+        llm.reset()
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            await projects_main_async(resume, client, **mode)
+            samples.append((time.perf_counter() - start) * 1000)
+        stats = llm.stats()
+        result[str(num_projects)] = {
+            "latency_ms": percentiles(samples),
+            "llm_calls_per_resume": round(stats["calls"] / runs, 2),
+            "prompt_tokens_per_resume": round(stats["prompt_tokens"] / runs, 1),
+            "completion_tokens_per_resume": round(stats["completion_tokens"] / runs, 1)
+        }
+    return result
+
+
+async def run_benchmark(project_counts: List[int], runs: int, config: FakeConfig) -> Dict[str, Any]:
+    modes = {name: await run_mode(mode, project_counts, runs, config) for name, mode in MODES.items()}
+    # 相对逐步生成的 p50 加速比
+    speedup = {
+        name: {
+            count: round(modes["classic"][count]["latency_ms"]["p50"] / modes[name][count]["latency_ms"]["p50"], 2)
+            for count in modes["classic"]
+        }
+        for name in MODES if name != "classic"
+    }
+    return {
+        "config": {
+            "project_counts": project_counts,
+            "runs": runs,
+            "latency_ms": config.latency_ms,
+            "latency_sigma": config.latency_sigma,
+            "tokens_per_sec": config.tokens_per_sec,
+            "seed": config.seed,
+            "project_qa_concurrency": int(os.getenv("PROJECT_QA_CONCURRENCY", 4)),
+            "question_selector": os.getenv("QUESTION_SELECTOR", "local"),
+            "batch_token_budget": int(os.getenv("PROJECT_QA_BATCH_TOKEN_BUDGET", 6000))
+        },
+        "modes": modes,
+        "p50_speedup": speedup,
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="项目问答逐步生成、快速模式与批量模式的对比基准（离线模拟模型）")
+    parser.add_argument("--projects", type=int, nargs="+", default=[1, 3, 5, 10], help="简历中的项目数")
+    parser.add_argument("--runs", type=int, default=5, help="每种项目数运行的次数")
+    parser.add_argument("--latency-ms", type=float, default=300, help="模型首 token 延迟中位数（毫秒）")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="延迟对数正态分布的 sigma")
+    parser.add_argument("--tokens-per-sec", type=float, default=50, help="模型输出速度，0 表示瞬间输出")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果 JSON 路径，不指定时打印到标准输出")
+    parser.add_argument("--verbose", action="store_true", help="保留生成器自身的调试输出")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        seed=args.seed
+    )
+    with open(os.devnull, "w") as devnull, contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        report = asyncio.run(run_benchmark(args.projects, args.runs, config))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+问题选择策略的对比基准：本地打分（LocalSelector）与模型选择。
+
+对项目问答、个人优势题和编程题三处“从约 3 个候选中选 1 个”的步骤，
+在合成的候选问题池上分别运行 local 和 llm 两种策略（llm 使用离线模拟模型），输出：
+    每次选择的延迟分位数（毫秒）
+    每次选择的模型调用次数和 token 数
+    选中问题覆盖的候选人技能比例（模拟模型总是选第一个，可作为不做选择的基线）
+
+用法（在 backend 目录下）：
+    python -m benchmarks.selector_bench --runs 200 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import percentiles, use_fake_backend, write_report
+
+use_fake_backend()
+
+from code.code_question_generotor import CodeQuestionGenerator  # noqa: E402
+from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM  # noqa: E402
+from qa_engine.advantages import AdvantageQAGenerator  # noqa: E402
+from qa_engine.projects import ProjectQAGenerator  # noqa: E402
+from qa_engine.selector import candidate_text  # noqa: E402
+
+STRATEGIES = ("local", "llm")
+SKILLS = ["Python", "Go", "Java", "Redis", "Kafka", "MySQL", "Docker", "Kubernetes", "React", "TensorFlow",
+          "分布式系统", "机器学习", "微服务", "消息队列", "缓存", "高并发"]
+
+
+def synthetic_case(rng: random.Random) -> Dict[str, Any]:
+    """一份简历和对应的三个候选问题池，各候选问题提到的技能数量不同"""
+    skills = rng.sample(SKILLS, 5)
+    technologies = rng.sample(skills, 2) + rng.sample(SKILLS, 1)
+
+    def pool():
+        return [
+            {
+                "question": f"请结合{'、'.join(rng.sample(SKILLS, rng.randint(0, 3)))}谈谈你的设计思路。",
+                "purpose": "考察技术深度",
+                "answer": "参考答案"
+            }
+            for _ in range(3)
+        ]
+
+    return {
+        "resume": {
+            "skills": skills,
+            "advantages": [],
+            "projects": [{"name": "示例项目", "technologies": technologies}]
+        },
+        "project_pool": {"project_name": "示例项目", "questions": pool()},
+        "advantage_pool": pool(),
+        "code_pool": pool()
+    }
+
+
+def _coverage(question: str, skills: List[str]) -> float:
+    text = question.lower()
+    return sum(skill.lower() in text for skill in skills) / len(skills)
+
+
+async def run_strategy(strategy: str, cases: List[Dict[str, Any]], config: FakeConfig) -> Dict[str, Any]:
+    llm = FakeLLM(config)
+    client = AsyncFakeOpenAI(llm)
+    projects = ProjectQAGenerator(client, selector=strategy)
+    advantages = AdvantageQAGenerator(client, selector=strategy)
+    code = CodeQuestionGenerator(client, selector=strategy)
+
+    result = {}
+    for name in ("project", "advantage", "code"):
+        llm.reset()
+        samples, coverage = [], []
+        for case in cases:
+            resume = case["resume"]
+            start = time.perf_counter()
+            if name == "project":
+                selected = await projects.select_questions_async(case["project_pool"], resume)
+                question = selected["selected_questions"][0]["question"]
+            elif name == "advantage":
+                question = (await advantages.select_question_async(resume, case["advantage_pool"]))["question"]
+            else:
+                question = candidate_text(await code._select_best_question_async(case["code_pool"], resume["skills"]))
+            samples.append((time.perf_counter() - start) * 1000)
+            coverage.append(_coverage(question, resume["skills"]))
+        stats = llm.stats()
+        result[name] = {
+            "latency_ms": {key: round(value, 4) if value is not None else None for key, value in percentiles(samples).items()},
+            "llm_calls_per_selection": round(stats["calls"] / len(cases), 2),
+            "tokens_per_selection": round((stats["prompt_tokens"] + stats["completion_tokens"]) / len(cases), 1),
+            "mean_skill_coverage": round(sum(coverage) / len(coverage), 3)
+        }
+    return result
+
+
+async def run_benchmark(runs: int, config: FakeConfig) -> Dict[str, Any]:
+    rng = random.Random(config.seed)
+    cases = [synthetic_case(rng) for _ in range(runs)]
+    return {
+        "config": {
+            "runs": runs,
+            "latency_ms": config.latency_ms,
+            "latency_sigma": config.latency_sigma,
+            "tokens_per_sec": config.tokens_per_sec,
+            "seed": config.seed
+        },
+        "strategies": {strategy: await run_strategy(strategy, cases, config) for strategy in STRATEGIES}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地问题选择与模型选择的对比基准（离线模拟模型）")
+    parser.add_argument("--runs", type=int, default=100, help="合成简历的份数")
+    parser.add_argument("--latency-ms", type=float, default=300, help="模型首 token 延迟中位数（毫秒）")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="延迟对数正态分布的 sigma")
+    parser.add_argument("--tokens-per-sec", type=float, default=50, help="模型输出速度，0 表示瞬间输出")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="结果 JSON 路径，不指定时打印到标准输出")
+    parser.add_argument("--verbose", action="store_true", help="保留生成器自身的调试输出")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        tokens_per_sec=args.tokens_per_sec,
+        seed=args.seed
+    )
+    with open(os.devnull, "w") as devnull, contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        report = asyncio.run(run_benchmark(max(1, args.runs), config))
+    write_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
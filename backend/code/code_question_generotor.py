@@ -7,16 +7,35 @@ generate_interview_question(resume_file_path: str) -> Tuple[str, str]:
 '''
 
 import json
+import asyncio
 from typing import Dict, List, Tuple
 from openai import OpenAI  # 修改导入方式
-import random
 from dotenv import load_dotenv
 import os
 from pathlib import Path
 
+from llm.metrics import note_failure
+from llm.stage import llm_stage
+from qa_engine.dedup import choose_question, replace_duplicate
+from qa_engine.question_bank import CODE, default_question_bank, ingest_pool, serve_pool
+from qa_engine.selector import LLM, default_selector, question_list, resolve_selector
+
+# 生成失败时使用的默认编程问题
+DEFAULT_CODE_QUESTION = ("请实现一个简单的REST API服务器",
+                         "可以使用Flask或FastAPI实现一个基本的CRUD API服务")
+
 class CodeQuestionGenerator:
-    def __init__(self, client):
-        """初始化代码问题生成器，从.env文件加载配置"""
+    def __init__(self, client, selector: str = None, question_bank=None, dedup=None):
+        """初始化代码问题生成器，从.env文件加载配置
+
+        Args:
+            client: OpenAI 兼容客户端
+            selector: 从问题池选择问题的策略，local 为本地打分（见 qa_engine.selector），
+                llm 为调用模型选择。默认为环境变量 QUESTION_SELECTOR（默认 local）
+            question_bank: 可选的 QuestionBank，按技能复用已生成的问题池（见 qa_engine.question_bank），
+                默认按环境变量 QUESTION_BANK_ENABLED 使用进程共享的题库
+            dedup: 可选的 NearDuplicateIndex，与同一场面试的其他部分共享，选题时跳过近似重复的问题
+        """
         # 加载.env文件
         env_path = '../.env'
         load_dotenv(env_path)
@@ -33,6 +52,10 @@ class CodeQuestionGenerator:
         self.temperature = float(os.getenv('API_TEMPERATURE', 0.7))
         self.timeout = int(os.getenv('API_TIMEOUT', 30))
         self.max_retries = int(os.getenv('API_MAX_RETRIES', 3))
+        self.selector = resolve_selector(selector)
+        self.local_selector = default_selector
+        self.question_bank = question_bank if question_bank is not None else default_question_bank()
+        self.dedup = dedup
 
     def _extract_skills(self, resume_data: Dict) -> List[str]:
         """从简历数据中提取技术技能
@@ -45,15 +68,8 @@ class CodeQuestionGenerator:
         """
         return resume_data.get("skills", [])
 
-    def _generate_questions(self, skills: List[str]) -> List[Dict]:
-        """使用LLM生成基于技能的编程问题
-        
-        Args:
-            skills (List[str]): 技术技能列表
-            
-        Returns:
-            List[Dict]: 问题和答案的列表
-        """
+    def _generate_messages(self, skills: List[str]) -> List[Dict[str, str]]:
+        """构建生成编程问题池的消息"""
         prompt = f"""基于以下技术技能生成3个具有挑战性的编程问题和答案：
         技能: {', '.join(skills)}
         
@@ -68,49 +84,73 @@ class CodeQuestionGenerator:
             {{"question": "问题描述", "answer": "详细答案"}}
         ]
         """
+        return [
+            {"role": "system", "content": "你是一个专业的编程面试官。"},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _parse_questions(self, content) -> List[Dict]:
+        """解析问题池响应内容，失败时返回空列表"""
+        if not content:
+            print("API返回空响应")
+            return []
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的编程面试官。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.temperature
-            )
-            # 修改响应处理方式
-            content = response.choices[0].message.content
-            if not content:
-                print("API返回空响应")
-                return []
-                
-            try:
-                # 移除可能存在的Markdown代码块标记
-                content = content.strip()
-                if content.startswith("```json"):
-                    content = content[7:]  # 移除开头的```json
-                if content.endswith("```"):
-                    content = content[:-3]  # 移除结尾的```
-                    
-                return json.loads(content)
-            except json.JSONDecodeError as e:
-                print(f"JSON解析错误: {str(e)}\n响应内容: {content}")
-                return []
-                
-        except Exception as e:
-            print(f"生成问题时发生错误: {str(e)}")
+            # 移除可能存在的Markdown代码块标记
+            content = content.strip()
+            if content.startswith("```json"):
+                content = content[7:]  # 移除开头的```json
+            if content.endswith("```"):
+                content = content[:-3]  # 移除结尾的```
+
+            return json.loads(content)
+        except json.JSONDecodeError as e:
+            print(f"JSON解析错误: {str(e)}\n响应内容: {content}")
+            note_failure("code.generate", e)
             return []
 
-    def _select_best_question(self, question_pool: List[Dict], skills: List[str]) -> Dict:
-        """使用LLM从问题池中选择最合适的问题
+    def _generate_questions(self, skills: List[str]) -> List[Dict]:
+        """使用LLM生成基于技能的编程问题
         
         Args:
-            question_pool (List[Dict]): 候选问题池
-            skills (List[str]): 技能列表
+            skills (List[str]): 技术技能列表
             
         Returns:
-            Dict: 选中的问题和答案
+            List[Dict]: 问题和答案的列表
         """
+        try:
+            with llm_stage("code.generate"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._generate_messages(skills),
+                    temperature=self.temperature
+                )
+            # 修改响应处理方式
+            return self._parse_questions(response.choices[0].message.content)
+                
+        except Exception as e:
+            print(f"生成问题时发生错误: {str(e)}")
+            note_failure("code.generate", e)
+            return []
+
+    async def _generate_questions_async(self, skills: List[str]) -> List[Dict]:
+        """_generate_questions 的异步版本，client 需为 AsyncOpenAI 兼容客户端"""
+        try:
+            with llm_stage("code.generate"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._generate_messages(skills),
+                    temperature=self.temperature
+                )
+            return self._parse_questions(response.choices[0].message.content)
+
+        except Exception as e:
+            print(f"生成问题时发生错误: {str(e)}")
+            note_failure("code.generate", e)
+            return []
+
+    def _select_messages(self, question_pool: List[Dict], skills: List[str]) -> List[Dict[str, str]]:
+        """构建从问题池中选择问题的消息"""
         questions_text = "\n".join([
             f"问题{i+1}: {q['question']}\n答案{i+1}: {q['answer']}" 
             for i, q in enumerate(question_pool)
@@ -127,23 +167,65 @@ class CodeQuestionGenerator:
         
         请只返回选中的问题编号(1,2或3)
         """
+        return [
+            {"role": "system", "content": "你是一个专业的技术面试专家。"},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _select_local(self, question_pool: List[Dict], skills: List[str]) -> Dict:
+        """在本地按技能覆盖度选择问题，问题池中没有有效问题时返回第一个"""
+        chosen = choose_question(
+            self.dedup,
+            question_list(question_pool),
+            lambda candidates: self.local_selector.select(candidates, skills)
+        )
+        return chosen or question_pool[0]
+
+    def _select_best_question(self, question_pool: List[Dict], skills: List[str]) -> Dict:
+        """从问题池中选择最合适的问题，selector 为 llm 时使用LLM选择
         
+        Args:
+            question_pool (List[Dict]): 候选问题池
+            skills (List[str]): 技能列表
+            
+        Returns:
+            Dict: 选中的问题和答案
+        """
+        if self.selector != LLM:
+            return self._select_local(question_pool, skills)
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的技术面试专家。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3  # 使用较低的temperature以获得更确定的选择
-            )
+            with llm_stage("code.select"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._select_messages(question_pool, skills),
+                    temperature=0.3  # 使用较低的temperature以获得更确定的选择
+                )
             
             # 解析返回的问题编号
             selected_num = int(response.choices[0].message.content.strip()) - 1
-            return question_pool[selected_num]
+            return replace_duplicate(self.dedup, question_pool[selected_num], question_list(question_pool))
+        except Exception as e:
+            print(f"选择问题时发生错误: {str(e)}")
+            note_failure("code.select", e)
+            return self._select_local(question_pool, skills)  # 发生错误时改为本地选择
+
+    async def _select_best_question_async(self, question_pool: List[Dict], skills: List[str]) -> Dict:
+        """_select_best_question 的异步版本"""
+        if self.selector != LLM:
+            return self._select_local(question_pool, skills)
+        try:
+            with llm_stage("code.select"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._select_messages(question_pool, skills),
+                    temperature=0.3
+                )
+            selected_num = int(response.choices[0].message.content.strip()) - 1
+            return replace_duplicate(self.dedup, question_pool[selected_num], question_list(question_pool))
         except Exception as e:
             print(f"选择问题时发生错误: {str(e)}")
-            return random.choice(question_pool)  # 发生错误时随机选择
+            note_failure("code.select", e)
+            return self._select_local(question_pool, skills)
 
     def get_question(self, resume_json: Dict) -> Tuple[str, str]:
         """从简历生成一个编程问题
@@ -157,19 +239,33 @@ class CodeQuestionGenerator:
         # 提取技能
         skills = self._extract_skills(resume_json)
         
-        # 生成问题池
-        question_pool = self._generate_questions(skills)
+        # 题库中有强匹配的问题时直接复用，否则生成问题池并写入题库
+        question_pool = serve_pool(self.question_bank, CODE, skills)
+        if question_pool is None:
+            question_pool = self._generate_questions(skills)
+            ingest_pool(self.question_bank, CODE, question_pool, skills)
         
         # 如果生成失败或问题池为空，返回默认问题
         if not question_pool:
-            return ("请实现一个简单的REST API服务器", 
-                   "可以使用Flask或FastAPI实现一个基本的CRUD API服务")
+            return DEFAULT_CODE_QUESTION
         
-        # 使用LLM选择最合适的问题
+        # 选择最合适的问题
         selected = self._select_best_question(question_pool, skills)
         return selected["question"], selected["answer"]
 
-def generate_interview_code_question(resume_data, client) -> Tuple[str, str]:
+    async def get_question_async(self, resume_json: Dict) -> Tuple[str, str]:
+        """get_question 的异步版本，题库的 SQLite 读写在线程池中执行"""
+        skills = self._extract_skills(resume_json)
+        question_pool = await asyncio.to_thread(serve_pool, self.question_bank, CODE, skills)
+        if question_pool is None:
+            question_pool = await self._generate_questions_async(skills)
+            await asyncio.to_thread(ingest_pool, self.question_bank, CODE, question_pool, skills)
+        if not question_pool:
+            return DEFAULT_CODE_QUESTION
+        selected = await self._select_best_question_async(question_pool, skills)
+        return selected["question"], selected["answer"]
+
+def generate_interview_code_question(resume_data, client, selector: str = None, dedup=None) -> Tuple[str, str]:
     """从JSON格式的简历生成编程面试问题的API接口
 
     Args:
@@ -190,7 +286,7 @@ def generate_interview_code_question(resume_data, client) -> Tuple[str, str]:
             raise ValueError("简历数据中必须包含'skills'字段")
             
         # 使用现有的生成器获取问题
-        generator = CodeQuestionGenerator(client)
+        generator = CodeQuestionGenerator(client, selector=selector, dedup=dedup)
         return generator.get_question(resume_data)
 
     except json.JSONDecodeError:
@@ -198,8 +294,25 @@ def generate_interview_code_question(resume_data, client) -> Tuple[str, str]:
         raise
     except Exception as e:
         print(f"生成问题时发生错误: {str(e)}")
-        return ("请实现一个简单的REST API服务器", 
-                "可以使用Flask或FastAPI实现一个基本的CRUD API服务")
+        return DEFAULT_CODE_QUESTION
+
+
+async def generate_interview_code_question_async(resume_data, client, selector: str = None, dedup=None) -> Tuple[str, str]:
+    """generate_interview_code_question 的异步版本，client 需为 AsyncOpenAI 兼容客户端
+
+    Returns:
+        Tuple[str, str]: (问题, 参考答案)的元组
+    """
+    try:
+        if "skills" not in resume_data:
+            raise ValueError("简历数据中必须包含'skills'字段")
+
+        generator = CodeQuestionGenerator(client, selector=selector, dedup=dedup)
+        return await generator.get_question_async(resume_data)
+
+    except Exception as e:
+        print(f"生成问题时发生错误: {str(e)}")
+        return DEFAULT_CODE_QUESTION
 
 # 修改使用示例
 if __name__ == "__main__":
@@ -0,0 +1,169 @@
+"""
+面试问题登记表。
+
+/api/resume/upload 生成问题时已经得到参考答案，这里按面试 ID（interviewId）保存每道题的
+问题文本和参考答案，/api/interview/evaluate 按 questionId 取回后只需调用一次评分，
+不再重新生成参考答案，也不会把 questionId 当作问题文本。
+
+问题 ID 与前端约定一致：
+    project_<i>   项目问答，i 为问题在上传结果 projects 数组中的下标
+    advantage_1   个人优势题
+    code_1        编程题
+
+环境变量：
+    QUESTION_REGISTRY_ENABLED: 是否启用，默认 1
+    QUESTION_REGISTRY_PATH: SQLite 文件路径，默认 .cache/question_registry.sqlite3
+    QUESTION_REGISTRY_TTL: 有效期（秒），默认 1 天，0 表示永不过期
+    QUESTION_REGISTRY_MAX_ENTRIES: 最多保留的面试数，默认 10000
+"""
+
+import json
+import os
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+from llm.cache import SQLiteStore
+
+
+def project_question_id(index: int) -> str:
+    return f"project_{index}"
+
+
+ADVANTAGE_QUESTION_ID = "advantage_1"
+CODE_QUESTION_ID = "code_1"
+
+
+def project_entries(projects: List[Dict[str, Any]], start: int = 0) -> Dict[str, Dict[str, Any]]:
+    """
+    把前端格式的项目问题列表（见 app.project_questions）转换为登记表条目。
+    问题带 id 时沿用，否则从 start 开始按顺序编号。参考答案生成失败（answer 为空）的问题登记为
+    reference_answer=None，评估时重新生成参考答案。
+    """
+    return {
+        qa.get("id") or project_question_id(start + i): {
+            "section": "project_qa",
+            "project_name": qa.get("projectName"),
+            "question": qa.get("question"),
+            "reference_answer": qa.get("answer") or None
+        }
+        for i, qa in enumerate(projects)
+    }
+
+
+def advantage_entries(advantages: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    if not advantages or not advantages.get("question"):
+        return {}
+    return {
+        ADVANTAGE_QUESTION_ID: {
+            "section": "advantages",
+            "question": advantages["question"],
+            "reference_answer": advantages.get("answer")
+        }
+    }
+
+
+def code_entries(code) -> Dict[str, Dict[str, Any]]:
+    """code 为 generate_interview_code_question 返回的 (问题, 参考答案)"""
+    if not code or not code[0]:
+        return {}
+    return {
+        CODE_QUESTION_ID: {
+            "section": "code",
+            "question": code[0],
+            "reference_answer": code[1] if len(code) > 1 else None
+        }
+    }
+
+
+class QuestionRegistry:
+    """
+    按面试 ID 保存问题和参考答案。
+
+    Args:
+        path: SQLite 文件路径
+        ttl: 有效期（秒），None 表示永不过期
+        max_entries: 最多保留的面试数，None 表示不限制
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.store = SQLiteStore(path, table="interview_questions", ttl=ttl, max_entries=max_entries)
+        # register 是读-合并-写，异步接口在线程池中并发登记同一面试的各分支时需要串行
+        self._register_lock = threading.Lock()
+
+    @staticmethod
+    def new_interview_id() -> str:
+        return uuid.uuid4().hex
+
+    def register(self, interview_id: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        """登记问题，与该面试已登记的问题合并（流式上传时按分支逐步登记）"""
+        if not entries:
+            return
+        with self._register_lock:
+            questions = self.get(interview_id)
+            questions.update(entries)
+            self.store.set(interview_id, json.dumps(questions, ensure_ascii=False))
+
+    def get(self, interview_id: str) -> Dict[str, Dict[str, Any]]:
+        """返回该面试已登记的全部问题，未知或已过期时返回空字典"""
+        if not interview_id:
+            return {}
+        value = self.store.get(interview_id)
+        if value is None:
+            return {}
+        return json.loads(value)
+
+    def lookup(self, interview_id: str, question_id: str) -> Optional[Dict[str, Any]]:
+        return self.get(interview_id).get(question_id)
+
+
+def question_registry_from_env() -> Optional[QuestionRegistry]:
+    """按环境变量创建 QuestionRegistry，QUESTION_REGISTRY_ENABLED=0 时返回 None"""
+    if os.getenv("QUESTION_REGISTRY_ENABLED", "1").lower() in ("0", "false", "no"):
+        return None
+    return QuestionRegistry(
+        os.getenv("QUESTION_REGISTRY_PATH", os.path.join(".cache", "question_registry.sqlite3")),
+        ttl=float(os.getenv("QUESTION_REGISTRY_TTL", 24 * 3600)),
+        max_entries=int(os.getenv("QUESTION_REGISTRY_MAX_ENTRIES", 10000))
+    )
+
+
+def evaluation_inputs(answers, questions: Dict[str, Dict[str, Any]]):
+    """
+    把前端提交的 (questionId, 回答) 列表转换为 evaluation 的 projects / advantages / code 参数。
+
+    登记过的问题带上原问题文本和参考答案，评估时跳过参考答案生成；
+    未登记的问题（旧客户端、登记已过期或追问）按 questionId 前缀归类，由评估重新生成参考答案。
+    """
+    project_qa = {}
+    advantages = {}
+    code = None
+
+    for question_id, answer in answers:
+        entry = questions.get(question_id)
+        if entry:
+            section = entry["section"]
+            question = entry["question"]
+            reference_answer = entry.get("reference_answer")
+            project_name = entry.get("project_name")
+        elif question_id.startswith("project_"):
+            # 旧格式：project_0, project_1 等，没有项目名称
+            section, question, reference_answer = "project_qa", question_id, None
+            project_name = f"项目{question_id.split('_')[1]}"
+        elif question_id.startswith("advantage_"):
+            section, question, reference_answer = "advantages", question_id, None
+        elif question_id.startswith("code_"):
+            section, question, reference_answer = "code", question_id, None
+        else:
+            continue
+
+        if section == "project_qa":
+            project_qa.setdefault(project_name, []).append(
+                {"question": question, "answer": answer, "reference_answer": reference_answer}
+            )
+        elif section == "advantages":
+            advantages = {"question": question, "answer": answer, "reference_answer": reference_answer}
+        else:
+            code = (question, answer, reference_answer)
+
+    return project_qa, advantages, code
@@ -1,9 +1,24 @@
+import os
 import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from llm.metrics import note_failure
+from llm.stage import llm_stage
 
 class InterviewManager:
-    def __init__(self, client):
+    def __init__(self, client, single_pass: bool = None):
+        """
+        Args:
+            client: OpenAI 兼容客户端
+            single_pass: 是否用一次调用同时生成参考答案和评分，默认读取环境变量
+                EVALUATION_SINGLE_PASS（默认 0，即先生成参考答案再评分的两次调用）
+        """
         self.client = client
         self.model = "deepseek-chat"
+        if single_pass is None:
+            single_pass = os.getenv("EVALUATION_SINGLE_PASS", "0").lower() in ("1", "true", "yes")
+        self.single_pass = single_pass
 
         self.reference_prompt = """
         作为面试官，请基于以下问题生成一个完整、专业且符合标准的参考答案。确保答案既真实又符合行业标准。
@@ -46,18 +61,47 @@ class InterviewManager:
         }
         """
 
-    def generate_reference_answer(self, question):
-        messages = [
+        # 单次评估：参考答案和评分在一次响应中返回，评分格式只在这里说明一次
+        self.combined_prompt = """
+        作为面试官，请针对面试问题先生成参考答案，再以参考答案为基准对求职者的回答评分，两者在同一个JSON中返回。
+
+        参考答案要求：
+        1. 完整、专业、符合行业标准，提供详细的技术实现细节
+        2. 展示对项目难点和解决方案的深入理解，用自然口语表达，保持逻辑清晰
+        3. 使用纯文本，不要使用 markdown 格式或特殊符号（如 **, ---, # 等），段落之间用换行分隔
+
+        评分标准：
+        1. 技术深度：是否展现了对技术细节的掌握和理解
+        2. 表达能力：回答是否逻辑清晰、语言流畅、表达准确
+        3. 项目理解：是否准确描述项目目标、架构和关键技术点
+        4. 问题解决能力：是否展示出分析问题、解决问题的思路和执行力
+
+        评分等级（A/B/C/D）：
+        A：非常优秀 - 回答全面、深入，技术细节丰富，条理清晰
+        B：良好 - 回答清晰，有一定深度，但仍可补充更详细的内容
+        C：一般 - 回答基本完整，但缺乏技术细节或逻辑性不强
+        D：不合格 - 回答模糊、内容错误或完全缺乏相关信息
+
+        你必须返回如下格式的JSON，不要添加任何其他内容：
+        {
+            "参考答案": "参考答案内容",
+            "评估": {
+                "技术深度": {"评分": "A", "理由": "回答详细，深入解释了XXX的实现"},
+                "表达能力": {"评分": "B", "理由": "整体表达顺畅，但略显抽象"},
+                "项目理解": {"评分": "A", "理由": "清晰描述了架构与核心目标"},
+                "问题解决能力": {"评分": "B", "理由": "能提出方案，但缺乏具体实现说明"},
+                "总评": {"评分": "A", "理由": "整体回答专业、表达自然，体现了较强能力"}
+            }
+        }
+        """
+
+    def _reference_messages(self, question):
+        return [
             {"role": "system", "content": self.reference_prompt},
             {"role": "user", "content": f"问题：{question}\n请生成一个高质量的参考答案。"}
         ]
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages
-        )
-        return response.choices[0].message.content.strip()
 
-    def grade_and_evaluate(self, user_answer, reference_answer):
+    def _grading_messages(self, user_answer, reference_answer):
         prompt = f"""
         用户回答：
         {user_answer}
@@ -74,132 +118,310 @@ class InterviewManager:
             "总评": {{"评分": "A", "理由": "整体回答专业、表达自然，体现了较强能力"}}
         }}
         """
-        messages = [
+        return [
             {"role": "system", "content": self.evaluation_prompt},
             {"role": "user", "content": prompt}
         ]
+
+    def _combined_messages(self, question, user_answer):
+        prompt = f"""
+        面试问题：
+        {question}
+
+        用户回答：
+        {user_answer}
+        """
+        return [
+            {"role": "system", "content": self.combined_prompt},
+            {"role": "user", "content": prompt}
+        ]
+
+    @staticmethod
+    def _strip_code_fence(text):
+        """清理 Markdown 代码块标记"""
+        if text.startswith("```json"):
+            text = text[7:]  # 移除 ```json
+        if text.endswith("```"):
+            text = text[:-3]  # 移除结尾的 ```
+        return text.strip()
+
+    def _parse_evaluation(self, evaluation_text):
+        """清理并校验评分结果，返回 JSON 字符串；校验失败时抛出异常"""
+        print(f"Debug - Raw response from AI: {evaluation_text}")  # 添加调试信息
+
+        evaluation_text = self._strip_code_fence(evaluation_text)
+
+        # 尝试解析 JSON
+        evaluation_json = json.loads(evaluation_text)
+
+        # 验证 JSON 结构
+        required_keys = ["技术深度", "表达能力", "项目理解", "问题解决能力", "总评"]
+        for key in required_keys:
+            if key not in evaluation_json:
+                raise ValueError(f"Missing required key: {key}")
+            if "评分" not in evaluation_json[key] or "理由" not in evaluation_json[key]:
+                raise ValueError(f"Invalid structure for key: {key}")
+            if evaluation_json[key]["评分"] not in ["A", "B", "C", "D"]:
+                raise ValueError(f"Invalid score for key: {key}")
+
+        return evaluation_text
+
+    def _split_combined(self, content):
+        """
+        拆分单次评估的响应，返回 (参考答案, 评分 JSON 字符串)。
+        参考答案缺失或整体无法解析时抛出 ValueError；评分部分按 _parse_evaluation 校验，
+        校验失败时与两次调用时一样返回默认评分。
+        """
+        data = json.loads(self._strip_code_fence(content))
+        reference_answer = data.get("参考答案") if isinstance(data, dict) else None
+        if not isinstance(reference_answer, str) or not reference_answer.strip():
+            raise ValueError("Missing reference answer")
         try:
+            evaluation = self._parse_evaluation(json.dumps(data.get("评估"), ensure_ascii=False))
+        except Exception as e:
+            evaluation = self._default_evaluation(e, stage="eval.combined")
+        return reference_answer.strip(), evaluation
+
+    @staticmethod
+    def _default_evaluation(e, stage="eval.grade"):
+        note_failure(stage, e)
+        print(f"Debug - Error type: {type(e)}")  # 添加错误类型信息
+        print(f"Debug - Error message: {str(e)}")  # 添加错误信息
+        # 返回一个默认的评估结果
+        default_evaluation = {
+            "技术深度": {"评分": "B", "理由": "评估解析失败，返回默认评分"},
+            "表达能力": {"评分": "B", "理由": "评估解析失败，返回默认评分"},
+            "项目理解": {"评分": "B", "理由": "评估解析失败，返回默认评分"},
+            "问题解决能力": {"评分": "B", "理由": "评估解析失败，返回默认评分"},
+            "总评": {"评分": "B", "理由": "评估解析失败，返回默认评分"}
+        }
+        return json.dumps(default_evaluation, ensure_ascii=False)
+
+    def generate_reference_answer(self, question):
+        with llm_stage("eval.reference"):
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=messages
+                messages=self._reference_messages(question)
+            )
+        return response.choices[0].message.content.strip()
+
+    async def generate_reference_answer_async(self, question):
+        with llm_stage("eval.reference"):
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=self._reference_messages(question)
             )
-            evaluation_text = response.choices[0].message.content.strip()
-            print(f"Debug - Raw response from AI: {evaluation_text}")  # 添加调试信息
-            
-            # 清理 Markdown 代码块标记
-            if evaluation_text.startswith("```json"):
-                evaluation_text = evaluation_text[7:]  # 移除 ```json
-            if evaluation_text.endswith("```"):
-                evaluation_text = evaluation_text[:-3]  # 移除结尾的 ```
-            evaluation_text = evaluation_text.strip()
-            
-            # 尝试解析 JSON
-            evaluation_json = json.loads(evaluation_text)
-            
-            # 验证 JSON 结构
-            required_keys = ["技术深度", "表达能力", "项目理解", "问题解决能力", "总评"]
-            for key in required_keys:
-                if key not in evaluation_json:
-                    raise ValueError(f"Missing required key: {key}")
-                if "评分" not in evaluation_json[key] or "理由" not in evaluation_json[key]:
-                    raise ValueError(f"Invalid structure for key: {key}")
-                if evaluation_json[key]["评分"] not in ["A", "B", "C", "D"]:
-                    raise ValueError(f"Invalid score for key: {key}")
-            
-            return evaluation_text
+        return response.choices[0].message.content.strip()
+
+    def grade_and_evaluate(self, user_answer, reference_answer):
+        try:
+            with llm_stage("eval.grade"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._grading_messages(user_answer, reference_answer)
+                )
+            return self._parse_evaluation(response.choices[0].message.content.strip())
         except Exception as e:
-            print(f"Debug - Error type: {type(e)}")  # 添加错误类型信息
-            print(f"Debug - Error message: {str(e)}")  # 添加错误信息
-            # 返回一个默认的评估结果
-            default_evaluation = {
-                "技术深度": {"评分": "B", "理由": "评估解析失败，返回默认评分"},
-                "表达能力": {"评分": "B", "理由": "评估解析失败，返回默认评分"},
-                "项目理解": {"评分": "B", "理由": "评估解析失败，返回默认评分"},
-                "问题解决能力": {"评分": "B", "理由": "评估解析失败，返回默认评分"},
-                "总评": {"评分": "B", "理由": "评估解析失败，返回默认评分"}
-            }
-            return json.dumps(default_evaluation, ensure_ascii=False)
+            return self._default_evaluation(e)
 
+    async def grade_and_evaluate_async(self, user_answer, reference_answer):
+        try:
+            with llm_stage("eval.grade"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._grading_messages(user_answer, reference_answer)
+                )
+            return self._parse_evaluation(response.choices[0].message.content.strip())
+        except Exception as e:
+            return self._default_evaluation(e)
 
-def evaluation(client, projects, advantages, code, user_answers: dict):
-    manager = InterviewManager(client)
+    def evaluate_answer(self, question, user_answer, reference_answer=None):
+        """
+        生成参考答案并评分，返回 (参考答案, 评分 JSON 字符串)。
+
+        已有参考答案（例如上传时生成并登记的，见 evaluate.question_registry）时只评分；
+        single_pass 时只调用一次模型；响应无法拆分出参考答案时回退到两次调用。
+        """
+        if reference_answer:
+            return reference_answer, self.grade_and_evaluate(user_answer, reference_answer)
+        if not self.single_pass:
+            reference_answer = self.generate_reference_answer(question)
+            return reference_answer, self.grade_and_evaluate(user_answer, reference_answer)
+
+        with llm_stage("eval.combined"):
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._combined_messages(question, user_answer)
+            )
+        try:
+            return self._split_combined(response.choices[0].message.content.strip())
+        except Exception as e:
+            print(f"单次评估响应解析失败，改为分两次调用: {e}")
+            note_failure("eval.combined", e)
+            reference_answer = self.generate_reference_answer(question)
+            return reference_answer, self.grade_and_evaluate(user_answer, reference_answer)
+
+    async def evaluate_answer_async(self, question, user_answer, reference_answer=None):
+        """evaluate_answer 的异步版本"""
+        if reference_answer:
+            return reference_answer, await self.grade_and_evaluate_async(user_answer, reference_answer)
+        if not self.single_pass:
+            reference_answer = await self.generate_reference_answer_async(question)
+            return reference_answer, await self.grade_and_evaluate_async(user_answer, reference_answer)
+
+        with llm_stage("eval.combined"):
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=self._combined_messages(question, user_answer)
+            )
+        try:
+            return self._split_combined(response.choices[0].message.content.strip())
+        except Exception as e:
+            print(f"单次评估响应解析失败，改为分两次调用: {e}")
+            note_failure("eval.combined", e)
+            reference_answer = await self.generate_reference_answer_async(question)
+            return reference_answer, await self.grade_and_evaluate_async(user_answer, reference_answer)
+
+
+def _dedupe_improvements(eval_dict, seen_improvements):
+    """去重改进建议：同一类别下相同的 C/D 评分理由只保留第一次出现的"""
+    for category in eval_dict:
+        if eval_dict[category]["评分"] in ["C", "D"]:
+            improvement_key = f"{category}: {eval_dict[category]['理由']}"
+            if improvement_key not in seen_improvements:
+                seen_improvements.add(improvement_key)
+            else:
+                # 如果已经存在相同类型的建议，移除当前的
+                eval_dict[category]["理由"] = ""
+
+
+def _evaluation_items(projects, advantages, code):
+    """按报告顺序展开待评估的题目：先项目问答，再优势题，最后编程题"""
+    items = []
+    for project_name, qa_list in projects.items():
+        for qa in qa_list:
+            items.append(("project_qa", project_name, qa))
+    if advantages:
+        items.append(("advantages", None, advantages))
+    if code:
+        items.append(("code", None, code))
+    return items
+
+
+def _item_fields(section, payload):
+    """
+    返回 (问题, 用户回答, 已有参考答案)。
+    编程题为 (问题, 回答) 或 (问题, 回答, 参考答案)，其余题目为含 question / answer 的字典，
+    可选的 reference_answer 为上传时登记的参考答案。
+    """
+    if section == "code":
+        question, user_answer, *rest = payload
+        return question, user_answer, rest[0] if rest else None
+    return payload["question"], payload["answer"], payload.get("reference_answer")
+
+
+def _evaluate_item(manager, section, payload):
+    """为单个题目生成参考答案（已登记时复用）并评分，返回 (问题, 用户回答, 参考答案, 评分字典)"""
+    question, user_answer, reference_answer = _item_fields(section, payload)
+    reference_answer, evaluation = manager.evaluate_answer(question, user_answer, reference_answer)
+    return question, user_answer, reference_answer, json.loads(evaluation)
+
+
+async def _evaluate_item_async(manager, section, payload):
+    """_evaluate_item 的异步版本"""
+    question, user_answer, reference_answer = _item_fields(section, payload)
+    reference_answer, evaluation = await manager.evaluate_answer_async(question, user_answer, reference_answer)
+    return question, user_answer, reference_answer, json.loads(evaluation)
+
+
+def _build_report(items, outcomes):
+    """
+    按题目顺序组装评估报告。
+
+    改进建议的去重在所有评分返回后按报告顺序统一进行，保证并发评估时结果仍然确定。
+    outcomes 中的元素为 _evaluate_item 的返回值，或评估过程中抛出的异常。
+    """
     report = {"project_qa": [], "advantages": {}, "code": {}}
 
     # 用于存储已经出现过的改进建议
     seen_improvements = set()
 
-    # 1. 项目评估
-    for project_name, qa_list in projects.items():
-        for qa in qa_list:
-            try:
-                question = qa["question"]
-                user_answer = qa["answer"]
-                reference_answer = manager.generate_reference_answer(question)
-                evaluation = manager.grade_and_evaluate(user_answer, reference_answer)
-                eval_dict = json.loads(evaluation)
-                
-                # 去重改进建议
-                for category in eval_dict:
-                    if eval_dict[category]["评分"] in ["C", "D"]:
-                        improvement_key = f"{category}: {eval_dict[category]['理由']}"
-                        if improvement_key not in seen_improvements:
-                            seen_improvements.add(improvement_key)
-                        else:
-                            # 如果已经存在相同类型的建议，移除当前的
-                            eval_dict[category]["理由"] = ""
-                
-                report["project_qa"].append({
-                    "project_name": project_name,
-                    "question": question,
-                    "reference_answer": reference_answer,
-                    "user_answer": user_answer,
-                    "evaluation": eval_dict
-                })
-            except Exception as e:
-                print(f"Warning: Error processing project QA: {e}")
-                continue
+    for (section, project_name, _), outcome in zip(items, outcomes):
+        if isinstance(outcome, Exception):
+            if section == "project_qa":
+                print(f"Warning: Error processing project QA: {outcome}")
+            else:
+                print(f"Warning: Error processing {section}: {outcome}")
+            continue
 
-    # 2. 优势评估
-    if advantages:
-        try:
-            question = advantages["question"]
-            user_answer = advantages["answer"]
-            reference_answer = manager.generate_reference_answer(question)
-            evaluation = manager.grade_and_evaluate(user_answer, reference_answer)
-            eval_dict = json.loads(evaluation)
-            
+        question, user_answer, reference_answer, eval_dict = outcome
+        entry = {
+            "question": question,
+            "reference_answer": reference_answer,
+            "user_answer": user_answer,
+            "evaluation": eval_dict
+        }
+        if section == "project_qa":
             # 去重改进建议
-            for category in eval_dict:
-                if eval_dict[category]["评分"] in ["C", "D"]:
-                    improvement_key = f"{category}: {eval_dict[category]['理由']}"
-                    if improvement_key not in seen_improvements:
-                        seen_improvements.add(improvement_key)
-                    else:
-                        # 如果已经存在相同类型的建议，移除当前的
-                        eval_dict[category]["理由"] = ""
-            
-            report["advantages"] = {
-                "question": question,
-                "reference_answer": reference_answer,
-                "user_answer": user_answer,
-                "evaluation": eval_dict
-            }
-        except Exception as e:
-            print(f"Warning: Error processing advantages: {e}")
+            _dedupe_improvements(eval_dict, seen_improvements)
+            report["project_qa"].append({"project_name": project_name, **entry})
+        elif section == "advantages":
+            _dedupe_improvements(eval_dict, seen_improvements)
+            report["advantages"] = entry
+        else:
+            # 编程题不参与改进建议去重
+            report["code"] = entry
 
-    # 3. 编程题评估
-    if code:
+    return report
+
+
+def _resolve_workers(max_workers):
+    if max_workers is None:
+        max_workers = int(os.getenv("EVALUATION_CONCURRENCY", 4))
+    return max(1, max_workers)
+
+
+def evaluation(client, projects, advantages, code, user_answers: dict, max_workers: int = None, single_pass: bool = None):
+    """
+    生成面试评估报告。
+
+    每道题的 参考答案-评分 调用链互不依赖，max_workers 大于 1 时并发评估
+    （默认读取环境变量 EVALUATION_CONCURRENCY，默认 4；设置为 1 时按顺序评估），
+    报告顺序与去重结果与顺序评估一致。single_pass 见 InterviewManager。
+    """
+    manager = InterviewManager(client, single_pass=single_pass)
+    items = _evaluation_items(projects, advantages, code)
+    max_workers = _resolve_workers(max_workers)
+
+    def run(item):
+        section, _, payload = item
         try:
-            question, user_answer = code
-            reference_answer = manager.generate_reference_answer(question)
-            evaluation = manager.grade_and_evaluate(user_answer, reference_answer)
-            report["code"] = {
-                "question": question,
-                "reference_answer": reference_answer,
-                "user_answer": user_answer,
-                "evaluation": json.loads(evaluation)
-            }
+            return _evaluate_item(manager, section, payload)
         except Exception as e:
-            print(f"Warning: Error processing code: {e}")
+            return e
 
-    return report
+    if max_workers > 1 and len(items) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            outcomes = list(executor.map(run, items))
+    else:
+        outcomes = [run(item) for item in items]
+
+    return _build_report(items, outcomes)
+
+
+async def evaluation_async(client, projects, advantages, code, user_answers: dict, max_workers: int = None, single_pass: bool = None):
+    """evaluation 的异步版本，client 需为 AsyncOpenAI 兼容客户端，返回结构与 evaluation 相同"""
+    manager = InterviewManager(client, single_pass=single_pass)
+    items = _evaluation_items(projects, advantages, code)
+    semaphore = asyncio.Semaphore(_resolve_workers(max_workers))
+
+    async def run(item):
+        section, _, payload = item
+        async with semaphore:
+            try:
+                return await _evaluate_item_async(manager, section, payload)
+            except Exception as e:
+                return e
+
+    outcomes = await asyncio.gather(*(run(item) for item in items))
+    return _build_report(items, outcomes)
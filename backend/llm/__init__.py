@@ -0,0 +1 @@
+# 初始化backend.llm包
\ No newline at end of file
@@ -0,0 +1,328 @@
+"""
+LLM 响应缓存。
+
+对 chat.completions.create 的请求按 model、messages、temperature、response_format
+计算 SHA-256 作为键，把响应保存在本地 SQLite 中。重复上传、前端重试和回放测试
+产生的相同请求直接命中缓存，不再消耗延迟和 token。
+
+只缓存正常结束（finish_reason 为 stop）且内容非空的响应；调用方解析响应失败时
+（llm.metrics.note_failure 记录的 ValueError）删除该请求刚写入或命中的条目，
+前端重试时重新请求模型，而不是在整个有效期内重放同一个无法解析的响应。
+
+环境变量：
+    LLM_CACHE_ENABLED: 是否启用缓存，默认 1
+    LLM_CACHE_PATH: SQLite 文件路径，默认 .cache/llm_cache.sqlite3
+    LLM_CACHE_TTL: 缓存有效期（秒），默认 7 天，0 表示永不过期
+    LLM_CACHE_MAX_ENTRIES: 最多保留的条目数，超出后按最近访问时间淘汰
+    LLM_CACHE_SKIP_STAGES: 不使用缓存的阶段，逗号分隔，"session.*" 匹配以 "session." 开头的阶段；
+                           默认跳过有意随机生成的阶段（DEFAULT_SKIP_STAGES），设为空字符串时全部缓存
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from openai.types.chat import ChatCompletion
+
+from .stage import current_stage
+
+# 默认不缓存的阶段：编程题按较高 temperature 随机出题，面试会话的每轮追问依赖对话进展，
+# 缓存后相同输入会一直得到同一个结果
+DEFAULT_SKIP_STAGES = "code.generate,session.*"
+
+# 当前上下文最近一次请求的 (阶段, 缓存, 键)，未使用缓存时为 None，供 invalidate_last 删除
+_last_entry: ContextVar[Optional[Tuple[Optional[str], "LLMCache", str]]] = ContextVar("llm_cache_last_entry", default=None)
+
+
+class SQLiteStore:
+    """
+    基于 SQLite 的键值存储，支持 TTL 过期和按最近访问时间的 LRU 淘汰。
+
+    多线程共享同一个连接，所有操作由一把锁串行化。
+    """
+
+    def __init__(self, path: str, table: str = "entries", ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.path = path
+        self.table = table
+        self.ttl = ttl or None
+        self.max_entries = max_entries or None
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed_at ON {table} (accessed_at)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """返回键对应的值，不存在或已过期时返回 None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """写入键值，超出 max_entries 时淘汰最久未访问的条目"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if self.max_entries:
+                overflow = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_entries
+                if overflow > 0:
+                    self._conn.execute(
+                        f"DELETE FROM {self.table} WHERE key IN "
+                        f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                        (overflow,)
+                    )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class LLMCache:
+    """
+    LLM 响应缓存，负责计算请求键、判断是否可缓存并统计命中情况。
+
+    Args:
+        store: 用于保存响应的 SQLiteStore
+        skip_stages: 不使用缓存的阶段（见 llm.stage），例如有意使用较高 temperature 的随机生成；
+                     以 ".*" 结尾的项按前缀匹配
+    """
+
+    def __init__(self, store: SQLiteStore, skip_stages: Iterable[str] = ()):
+        self.store = store
+        self.skip_stages = set(skip_stages)
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {"hits": 0, "misses": 0, "skipped": 0})
+
+    def skips(self, stage: Optional[str]) -> bool:
+        if not stage:
+            return False
+        return any(
+            stage == pattern or (pattern.endswith(".*") and stage.startswith(pattern[:-1]))
+            for pattern in self.skip_stages
+        )
+
+    @staticmethod
+    def make_key(model: str, messages: Any, temperature: Optional[float] = None, response_format: Any = None) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "response_format": response_format},
+            ensure_ascii=False,
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def key_for(self, request: Dict[str, Any]) -> Optional[str]:
+        """返回请求的缓存键；流式请求或被跳过的阶段返回 None"""
+        stage = current_stage()
+        if request.get("stream") or self.skips(stage):
+            self._count(stage, "skipped")
+            return None
+        return self.make_key(
+            request.get("model"),
+            request.get("messages"),
+            request.get("temperature"),
+            request.get("response_format")
+        )
+
+    def lookup(self, key: str) -> Optional[ChatCompletion]:
+        value = self.store.get(key)
+        stage = current_stage()
+        if value is None:
+            self._count(stage, "misses")
+            return None
+        try:
+            response = ChatCompletion.model_validate_json(value)
+        except Exception as e:
+            print(f"缓存条目解析失败，已删除: {e}")
+            self.store.delete(key)
+            self._count(stage, "misses")
+            return None
+        self._count(stage, "hits")
+        return response
+
+    @staticmethod
+    def cacheable(response: Any) -> bool:
+        """只缓存可序列化、正常结束且内容非空的响应；被截断（finish_reason 为 length）的响应不缓存"""
+        if not hasattr(response, "model_dump_json"):
+            return False
+        choices = getattr(response, "choices", None) or []
+        if not choices or choices[0].finish_reason != "stop":
+            return False
+        return bool((choices[0].message.content or "").strip())
+
+    def save(self, key: str, response: Any) -> None:
+        if self.cacheable(response):
+            self.store.set(key, response.model_dump_json())
+
+    def invalidate(self, key: str) -> None:
+        self.store.delete(key)
+
+    def remember(self, key: Optional[str]) -> None:
+        """记录当前上下文最近一次请求的缓存键，见 invalidate_last"""
+        _last_entry.set((current_stage(), self, key) if key is not None else None)
+
+    def _count(self, stage: Optional[str], name: str) -> None:
+        with self._lock:
+            self._counters[stage or "unlabeled"][name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """返回命中统计：总计、按阶段明细和当前条目数"""
+        with self._lock:
+            by_stage = {stage: dict(counts) for stage, counts in self._counters.items()}
+        totals = {"hits": 0, "misses": 0, "skipped": 0}
+        for counts in by_stage.values():
+            for name in totals:
+                totals[name] += counts[name]
+        return {**totals, "size": len(self.store), "by_stage": by_stage}
+
+
+class _Completions:
+    def __init__(self, completions, cache: LLMCache):
+        self._completions = completions
+        self._cache = cache
+
+    def create(self, **kwargs):
+        key = self._cache.key_for(kwargs)
+        self._cache.remember(key)
+        if key is not None:
+            cached = self._cache.lookup(key)
+            if cached is not None:
+                return cached
+        response = self._completions.create(**kwargs)
+        if key is not None:
+            self._cache.save(key, response)
+        return response
+
+
+class _AsyncCompletions(_Completions):
+    async def create(self, **kwargs):
+        # SQLite 读写在锁竞争时会阻塞，放到线程池中执行，不占用事件循环
+        key = self._cache.key_for(kwargs)
+        self._cache.remember(key)
+        if key is not None:
+            cached = await asyncio.to_thread(self._cache.lookup, key)
+            if cached is not None:
+                return cached
+        response = await self._completions.create(**kwargs)
+        if key is not None:
+            await asyncio.to_thread(self._cache.save, key, response)
+        return response
+
+
+class _Chat:
+    def __init__(self, completions):
+        self.completions = completions
+
+
+class CachedClient:
+    """
+    为 OpenAI 兼容客户端加上响应缓存，接口与被包装的客户端一致。
+
+    只拦截 chat.completions.create，其余属性直接转发给被包装的客户端。
+    """
+
+    _completions_class = _Completions
+
+    def __init__(self, client, cache: LLMCache):
+        self._client = client
+        self.cache = cache
+        self.chat = _Chat(self._completions_class(client.chat.completions, cache))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class AsyncCachedClient(CachedClient):
+    """CachedClient 的异步版本，用于包装 AsyncOpenAI"""
+
+    _completions_class = _AsyncCompletions
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def cache_enabled() -> bool:
+    return os.getenv("LLM_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def default_cache() -> LLMCache:
+    """返回进程内共享的 LLMCache，配置读取自环境变量"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            store = SQLiteStore(
+                os.getenv("LLM_CACHE_PATH", os.path.join(".cache", "llm_cache.sqlite3")),
+                table="llm_responses",
+                ttl=float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600)),
+                max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000))
+            )
+            skip_stages = [stage.strip() for stage in os.getenv("LLM_CACHE_SKIP_STAGES", DEFAULT_SKIP_STAGES).split(",") if stage.strip()]
+            _default_cache = LLMCache(store, skip_stages=skip_stages)
+        return _default_cache
+
+
+def invalidate_last(stage: Optional[str]) -> bool:
+    """
+    删除当前上下文中最近一次 stage 阶段请求写入或命中的缓存条目，返回是否删除。
+
+    由 llm.metrics.note_failure 在解析失败时调用。只在失败时执行一次删除，直接在调用方线程中进行。
+    """
+    entry = _last_entry.get()
+    if entry is None or entry[0] != stage:
+        return False
+    _last_entry.set(None)
+    entry[1].invalidate(entry[2])
+    return True
+
+
+def with_cache(client, cache: Optional[LLMCache] = None):
+    """按配置为同步客户端加上缓存；LLM_CACHE_ENABLED=0 时原样返回"""
+    if not cache_enabled():
+        return client
+    return CachedClient(client, cache or default_cache())
+
+
+def with_async_cache(client, cache: Optional[LLMCache] = None):
+    """with_cache 的异步客户端版本"""
+    if not cache_enabled():
+        return client
+    return AsyncCachedClient(client, cache or default_cache())
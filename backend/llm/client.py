@@ -0,0 +1,160 @@
+"""
+进程内共享的 LLM 客户端工厂。
+
+所有生成器、简历提取器和面试会话都通过 get_client() / get_async_client() 获取客户端，
+共用同一个 HTTP 连接池（保持长连接、可选 HTTP/2），避免每个对象各自建连、重复 TLS 握手，
+也便于统一限制对外连接数。连接配置只在这里读取。
+
+环境变量：
+    OPENAI_API_KEY / OPENAI_API_BASE / OPENAI_MODEL: 模型服务配置
+    LLM_TIMEOUT: 单次请求超时（秒），默认 60
+    LLM_MAX_CONNECTIONS: 连接池最大连接数，默认 100
+    LLM_MAX_KEEPALIVE: 最多保持的空闲长连接数，默认 20
+    LLM_KEEPALIVE_EXPIRY: 空闲长连接的保持时间（秒），默认 60
+    LLM_HTTP2: 是否启用 HTTP/2，auto（默认，安装了 h2 时启用）/ 1 / 0
+    LLM_WARMUP: 服务启动时是否预热连接，默认 1
+    LLM_BACKEND: openai（默认）或 fake；fake 时使用 llm.fake 中的离线模拟客户端，
+        延迟和错误注入见 llm/fake.py
+"""
+
+import importlib
+import importlib.util
+import os
+import threading
+
+import openai
+from dotenv import load_dotenv
+from openai import OpenAI, AsyncOpenAI
+
+from .cache import with_cache, with_async_cache
+from .metrics import on_response, on_response_async, with_metrics, with_async_metrics
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "sk-06a1fc23f04940cf93e06e4b39e1f949")
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.deepseek.com/v1")
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "deepseek-chat")
+
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 60))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", 20))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 60))
+
+_lock = threading.Lock()
+_client = None
+_async_client = None
+
+
+def _http_module():
+    """openai SDK 底层使用的 HTTP 库（httpx，较新的 SDK 为 httpx2），连接池参数需用同一个库构造"""
+    return importlib.import_module(openai.DefaultHttpxClient.__bases__[0].__module__.split(".")[0])
+
+
+def http2_enabled() -> bool:
+    setting = os.getenv("LLM_HTTP2", "auto").lower()
+    if setting == "auto":
+        return importlib.util.find_spec("h2") is not None
+    return setting not in ("0", "false", "no")
+
+
+def _http_options() -> dict:
+    http = _http_module()
+    return {
+        "limits": http.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+        ),
+        "http2": http2_enabled()
+    }
+
+
+def _client_options() -> dict:
+    return {
+        "api_key": OPENAI_API_KEY,
+        "base_url": OPENAI_API_BASE,
+        "timeout": LLM_TIMEOUT,
+        "default_headers": {"Authorization": f"Bearer {OPENAI_API_KEY}"}
+    }
+
+
+def backend() -> str:
+    return os.getenv("LLM_BACKEND", "openai").lower()
+
+
+def _new_client():
+    if backend() == "fake":
+        from .fake import FakeOpenAI
+        return FakeOpenAI()
+    http_client = openai.DefaultHttpxClient(**_http_options(), event_hooks={"response": [on_response]})
+    return OpenAI(http_client=http_client, **_client_options())
+
+
+def _new_async_client():
+    if backend() == "fake":
+        from .fake import AsyncFakeOpenAI
+        return AsyncFakeOpenAI()
+    http_client = openai.DefaultAsyncHttpxClient(**_http_options(), event_hooks={"response": [on_response_async]})
+    return AsyncOpenAI(http_client=http_client, **_client_options())
+
+
+def get_client():
+    """返回进程内共享的同步客户端（记录调用指标，并按 LLM_CACHE_* 配置带响应缓存）"""
+    global _client
+    with _lock:
+        if _client is None:
+            # 指标包装在缓存之内，只统计真正发往模型服务的请求
+            _client = with_cache(with_metrics(_new_client()))
+        return _client
+
+
+def get_async_client():
+    """返回进程内共享的异步客户端（记录调用指标，并按 LLM_CACHE_* 配置带响应缓存）"""
+    global _async_client
+    with _lock:
+        if _async_client is None:
+            _async_client = with_async_cache(with_async_metrics(_new_async_client()))
+        return _async_client
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("LLM_WARMUP", "1").lower() not in ("0", "false", "no")
+
+
+def warm_up() -> bool:
+    """预先建立到模型服务的连接（TCP + TLS），失败时只打印警告"""
+    try:
+        get_client().with_options(timeout=10, max_retries=0).models.list()
+        return True
+    except Exception as e:
+        print(f"LLM 连接预热失败: {e}")
+        return False
+
+
+async def warm_up_async() -> bool:
+    """warm_up 的异步版本，预热异步客户端的连接池"""
+    try:
+        await get_async_client().with_options(timeout=10, max_retries=0).models.list()
+        return True
+    except Exception as e:
+        print(f"LLM 连接预热失败: {e}")
+        return False
+
+
+def close_clients() -> None:
+    """关闭同步客户端的连接池；异步客户端请使用 aclose_clients"""
+    global _client
+    with _lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def aclose_clients() -> None:
+    """关闭全部共享客户端的连接池，用于服务退出"""
+    global _async_client
+    close_clients()
+    with _lock:
+        client, _async_client = _async_client, None
+    if client is not None:
+        await client.close()
@@ -0,0 +1,519 @@
+"""
+离线的模拟模型客户端，用于在没有网络和 API Key 的情况下运行、压测整条流水线。
+
+FakeOpenAI / AsyncFakeOpenAI 与 OpenAI SDK 的客户端接口一致（chat.completions.create、
+models.list、with_options、close），按请求所属的提示词类别返回结构合法的内容：
+简历提取、问题池、选题、参考答案、评分等。类别优先取 llm_stage 标记的阶段，
+没有标记时（例如经由 fake_server 的 HTTP 请求）根据系统提示词判断。
+
+延迟、输出速度和错误注入均可配置，便于在本机测量吞吐量和尾延迟：
+    LLM_FAKE_LATENCY_MS: 首个 token 的延迟中位数（毫秒），默认 300，服从对数正态分布
+    LLM_FAKE_LATENCY_SIGMA: 对数正态分布的 sigma，默认 0.5，0 表示固定延迟
+    LLM_FAKE_TOKENS_PER_SEC: 输出速度（token/秒），默认 50，0 表示瞬间输出
+    LLM_FAKE_PROMPT_TOKENS_PER_SEC: 输入处理速度（token/秒），首 token 延迟额外加上 prompt 的处理时间，默认 0 表示不计
+    LLM_FAKE_ERROR_RATE: 返回 500 错误的概率，默认 0
+    LLM_FAKE_RATE_LIMIT_RATE: 返回 429 错误的概率，默认 0
+    LLM_FAKE_SEED: 随机种子，设置后延迟和错误序列可复现
+
+token 数按 llm.tokens 的规则粗略估算，只用于统计和控制输出速度。
+压测时一般应同时设置 LLM_CACHE_ENABLED=0，否则重复请求会直接命中响应缓存。
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import openai
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from .stage import current_stage
+from .tokens import estimate_messages_tokens, estimate_tokens
+
+FAKE_MODEL = "fake-chat"
+
+# 没有阶段标记时，按系统提示词中的特征文本判断请求类别，按顺序匹配
+_FAMILY_MARKERS = [
+    ("简历解析助手", "extract"),
+    ("生成一系列专业的面试问题", "project.generate"),
+    ("请一次完成以下三步", "project.fast"),
+    ("一次性为候选人简历中的所有项目经历准备面试问题", "project.batch"),
+    ("selected_questions", "project.select"),
+    ("优秀的技术应聘者", "project.answer"),
+    ("深入探究以下三个维度", "advantage.pool"),
+    ("选择最适合的1个问题", "advantage.select"),
+    ("专业的编程面试官", "code.generate"),
+    ("专业的技术面试专家", "code.select"),
+    ("先生成参考答案，再以参考答案为基准对求职者的回答评分", "eval.combined"),
+    ("生成一个完整、专业且符合标准的参考答案", "eval.reference"),
+    ("对求职者的回答进行评分", "eval.grade"),
+    ("进行深入的面试对话", "session.turn"),
+    ("经验丰富的技术候选人", "session.answer"),
+    ("面试评估专家", "session.evaluate"),
+    ("生成针对性的面试问题和参考答案", "item.generate"),
+]
+
+_GRADE_KEYS = ["技术深度", "表达能力", "项目理解", "问题解决能力", "总评"]
+_PROJECT_LINE = re.compile(r"^\s*项目(?:名称)?\s*[:：]\s*(\S.*?)\s*$", re.MULTILINE)
+_SKILLS_LINE = re.compile(r"^\s*技能\s*[:：]\s*(\S.*?)\s*$", re.MULTILINE)
+_EXTRACT_FIELDS = re.compile(r"只需要返回以下字段[^:：]*[:：]\s*(.+)")
+
+
+def classify(messages: List[Dict[str, Any]]) -> str:
+    """根据当前阶段或系统提示词判断请求类别，无法判断时返回 "text" """
+    stage = current_stage()
+    if stage:
+        return stage
+    system = _system_content(messages)
+    for marker, family in _FAMILY_MARKERS:
+        if marker in system:
+            return family
+    return "text"
+
+
+def _system_content(messages: List[Dict[str, Any]]) -> str:
+    return next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+
+
+def _user_content(messages: List[Dict[str, Any]]) -> str:
+    return next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+
+
+def _json_payload(text: str) -> Any:
+    """取出用户消息中的 JSON 部分（可能带有一行说明文字）"""
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        return None
+    try:
+        return json.loads(text[start:])
+    except json.JSONDecodeError:
+        return None
+
+
+def _field(text: str, name: str) -> str:
+    match = re.search(rf"{name}[:：]\s*(.*)", text)
+    return match.group(1).strip() if match else ""
+
+
+def _resume(text: str) -> Dict[str, Any]:
+    """
+    模拟简历提取。按 "项目：名称" / "项目名称：名称" 行识别项目、按 "技能：a, b" 行识别技能，
+    便于用合成简历控制项目数量。
+    """
+    projects = _PROJECT_LINE.findall(text) or ["示例项目"]
+    skills_line = _SKILLS_LINE.search(text)
+    skills = [s.strip() for s in re.split(r"[,，、]", skills_line.group(1))] if skills_line else ["Python", "SQL"]
+    return {
+        "education": [{"school": "示例大学", "degree": "本科", "major": "计算机科学与技术", "graduation_year": "2022"}],
+        "projects": [
+            {
+                "name": name,
+                "description": f"{name}的项目描述",
+                "technologies": skills[:3],
+                "responsibilities": ["负责核心模块的设计与开发"],
+                "achievements": ["接口延迟降低 30%"]
+            }
+            for name in projects
+        ],
+        "work_experience": [{
+            "company": "示例科技有限公司",
+            "position": "后端开发工程师",
+            "duration": "2022-2024",
+            "responsibilities": ["负责服务端开发"],
+            "achievements": ["完成系统迁移"]
+        }],
+        "skills": [s for s in skills if s],
+        "advantages": ["分布式系统", "性能优化"]
+    }
+
+
+_ANSWER = (
+    "我在这个项目里主要负责核心模块的设计和实现。当时最大的问题是高峰期接口延迟比较高，"
+    "我先通过压测定位到数据库查询是瓶颈，然后加了缓存和批量查询，最后把 P99 延迟降低了一半左右。"
+)
+
+
+def _project_questions(name: str) -> Dict[str, Any]:
+    kinds = [("基础", "项目背景和技术选型"), ("技术", "核心技术的实现细节"), ("挑战", "遇到的难点及解决方案")]
+    return {
+        "project_name": name,
+        "questions": [
+            {"question": f"请介绍一下{name}中{topic}。", "type": kind, "purpose": f"考察候选人对{topic}的理解"}
+            for kind, topic in kinds
+        ]
+    }
+
+
+def _grades() -> Dict[str, Any]:
+    return {key: {"评分": "B", "理由": "回答清晰，有一定深度，可以补充更多实现细节"} for key in _GRADE_KEYS}
+
+
+def _ranked_project(name: str) -> Dict[str, Any]:
+    """快速模式和批量模式中单个项目的结果：问题池、选中问题和参考答案"""
+    pool = _project_questions(name)
+    top = pool["questions"][0]["question"]
+    return {
+        **pool,
+        "selected_questions": [{"question": top, "reason": "与候选人的技术栈和项目职责最相关", "answer": _ANSWER}]
+    }
+
+
+def _content_for(family: str, messages: List[Dict[str, Any]]) -> str:
+    """按请求类别生成与真实模型输出结构一致的内容"""
+    user = _user_content(messages)
+
+    if family == "extract":
+        resume = _resume(user)
+        # 只提取部分字段（规则提取已填好其余字段）时只输出这些字段
+        fields = _EXTRACT_FIELDS.search(_system_content(messages))
+        if fields:
+            wanted = [f.strip() for f in fields.group(1).split(",")]
+            resume = {key: value for key, value in resume.items() if key in wanted}
+        return json.dumps(resume, ensure_ascii=False)
+
+    if family == "project.generate":
+        return json.dumps(_project_questions(_field(user, "项目名称") or "示例项目"), ensure_ascii=False)
+
+    if family == "project.fast":
+        return json.dumps(_ranked_project(_field(user, "项目名称") or "示例项目"), ensure_ascii=False)
+
+    if family == "project.batch":
+        projects = (_json_payload(user) or {}).get("projects") or []
+        return json.dumps({
+            "projects": {p.get("name", ""): _ranked_project(p.get("name", "")) for p in projects}
+        }, ensure_ascii=False)
+
+    if family == "project.select":
+        pool = (_json_payload(user) or {}).get("questions_pool") or {}
+        questions = pool.get("questions") if isinstance(pool, dict) else None
+        question = questions[0]["question"] if questions else "请介绍一下你负责的项目。"
+        return json.dumps({
+            "selected_questions": [{"question": question, "reason": "与候选人的技术栈和项目职责最相关"}]
+        }, ensure_ascii=False)
+
+    if family == "advantage.pool":
+        advantages = (_json_payload(user) or {}).get("advantages") or ["系统设计"]
+        return json.dumps([
+            {
+                "question": f"请谈谈你对{advantages[i % len(advantages)]}中第{i + 1}个关键问题的理解。",
+                "purpose": "考察技术原理掌握度",
+                "answer": "参考答案：从原理、演进和实践三个角度展开。"
+            }
+            for i in range(3)
+        ], ensure_ascii=False)
+
+    if family == "advantage.select":
+        pool = (_json_payload(user) or {}).get("questions_pool") or []
+        chosen = pool[0] if isinstance(pool, list) and pool and isinstance(pool[0], dict) else {}
+        return json.dumps({
+            "question": chosen.get("question", "请谈谈你最擅长的技术领域。"),
+            "answer": chosen.get("answer", "参考答案"),
+            "reason": "与候选人的工作经历最相关"
+        }, ensure_ascii=False)
+
+    if family == "code.generate":
+        return json.dumps([
+            {"question": f"编程题{i + 1}：实现一个支持过期时间的 LRU 缓存。", "answer": "使用哈希表加双向链表，get/put 均为 O(1)。"}
+            for i in range(3)
+        ], ensure_ascii=False)
+
+    if family == "code.select":
+        return "1"
+
+    if family == "eval.grade":
+        return json.dumps(_grades(), ensure_ascii=False)
+
+    if family == "eval.combined":
+        return json.dumps({"参考答案": _ANSWER, "评估": _grades()}, ensure_ascii=False)
+
+    if family == "item.generate":
+        return json.dumps([{
+            "question": "请介绍项目的整体架构。",
+            "answer": "项目采用前后端分离架构，后端按模块拆分服务。",
+            "type": "basic",
+            "score_criteria": [
+                {"score": 1, "description": "无法说明架构"},
+                {"score": 3, "description": "能说明主要模块"},
+                {"score": 5, "description": "能说明模块划分的原因和权衡"}
+            ]
+        }], ensure_ascii=False)
+
+    if family == "session.turn":
+        return "能具体说说你在这个项目中遇到的最大技术难点，以及你是怎么解决的吗？"
+
+    if family == "session.evaluate":
+        return "技术深度：4分，对核心实现比较熟悉。\n表达能力：4分，逻辑清晰。\n项目理解：4分。\n问题解决：3分，可以补充更多细节。"
+
+    # project.answer、eval.reference、session.answer 等自由文本
+    return _ANSWER
+
+
+class FakeConfig:
+    """
+    模拟客户端的延迟和错误注入配置。
+
+    Args:
+        latency_ms: 首个 token 的延迟中位数（毫秒）
+        latency_sigma: 对数正态分布的 sigma，0 表示固定延迟
+        tokens_per_sec: 输出速度，0 表示瞬间输出
+        prompt_tokens_per_sec: 输入处理速度，0 表示 prompt 长度不影响首 token 延迟
+        error_rate: 返回 500 错误的概率
+        rate_limit_rate: 返回 429 错误的概率
+        seed: 随机种子
+    """
+
+    def __init__(self, latency_ms: float = 300, latency_sigma: float = 0.5, tokens_per_sec: float = 50,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: Optional[int] = None,
+                 prompt_tokens_per_sec: float = 0.0):
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+
+    @classmethod
+    def from_env(cls) -> "FakeConfig":
+        seed = os.getenv("LLM_FAKE_SEED")
+        return cls(
+            latency_ms=float(os.getenv("LLM_FAKE_LATENCY_MS", 300)),
+            latency_sigma=float(os.getenv("LLM_FAKE_LATENCY_SIGMA", 0.5)),
+            tokens_per_sec=float(os.getenv("LLM_FAKE_TOKENS_PER_SEC", 50)),
+            error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", 0)),
+            rate_limit_rate=float(os.getenv("LLM_FAKE_RATE_LIMIT_RATE", 0)),
+            seed=int(seed) if seed else None,
+            prompt_tokens_per_sec=float(os.getenv("LLM_FAKE_PROMPT_TOKENS_PER_SEC", 0))
+        )
+
+
+class FakeLLM:
+    """
+    模拟模型：负责生成内容、抽样延迟、注入错误，并按类别统计调用次数和 token 数。
+    同一个 FakeLLM 可被同步、异步客户端和 fake_server 共享。
+    """
+
+    def __init__(self, config: Optional[FakeConfig] = None):
+        self.config = config or FakeConfig.from_env()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._counters = defaultdict(lambda: {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0})
+
+    def first_token_delay(self, request: Optional[Dict[str, Any]] = None) -> float:
+        """抽样首个 token 的延迟（秒），配置了 prompt_tokens_per_sec 时加上处理 request 中 prompt 的时间"""
+        prefill = 0.0
+        if request and self.config.prompt_tokens_per_sec > 0:
+            prefill = estimate_messages_tokens(request.get("messages") or []) / self.config.prompt_tokens_per_sec
+        median = self.config.latency_ms / 1000
+        if median <= 0:
+            return prefill
+        if self.config.latency_sigma <= 0:
+            return median + prefill
+        with self._lock:
+            return self._random.lognormvariate(math.log(median), self.config.latency_sigma) + prefill
+
+    def token_delay(self, tokens: int) -> float:
+        """输出 tokens 个 token 所需的时间（秒）"""
+        if self.config.tokens_per_sec <= 0:
+            return 0.0
+        return tokens / self.config.tokens_per_sec
+
+    def prepare(self, request: Dict[str, Any]) -> Tuple[str, str, int, int]:
+        """
+        处理一次请求：判断类别、按配置注入错误、生成内容并记录统计。
+
+        Returns:
+            (类别, 内容, prompt token 数, completion token 数)
+
+        Raises:
+            openai.RateLimitError / openai.InternalServerError: 按配置的概率注入
+        """
+        messages = request.get("messages") or []
+        family = classify(messages)
+        with self._lock:
+            roll = self._random.random()
+            counters = self._counters[family]
+            counters["calls"] += 1
+            if roll < self.config.rate_limit_rate + self.config.error_rate:
+                counters["errors"] += 1
+        if roll < self.config.rate_limit_rate:
+            raise _status_error(openai.RateLimitError, 429, "fake rate limit")
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            raise _status_error(openai.InternalServerError, 500, "fake server error")
+
+        content = _content_for(family, messages)
+        prompt_tokens = estimate_messages_tokens(messages)
+        completion_tokens = estimate_tokens(content)
+        with self._lock:
+            counters["prompt_tokens"] += prompt_tokens
+            counters["completion_tokens"] += completion_tokens
+        return family, content, prompt_tokens, completion_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """返回调用统计：总计和按类别明细"""
+        with self._lock:
+            by_family = {family: dict(counts) for family, counts in self._counters.items()}
+        totals = {"calls": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        for counts in by_family.values():
+            for name in totals:
+                totals[name] += counts[name]
+        return {**totals, "by_family": by_family}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+
+_default_llm = None
+_default_llm_lock = threading.Lock()
+
+
+def default_llm() -> FakeLLM:
+    """返回进程内共享的 FakeLLM，配置读取自环境变量"""
+    global _default_llm
+    with _default_llm_lock:
+        if _default_llm is None:
+            _default_llm = FakeLLM()
+        return _default_llm
+
+
+def _status_error(error_class, status_code: int, message: str):
+    from .client import _http_module
+
+    http = _http_module()
+    request = http.Request("POST", "http://fake-llm/v1/chat/completions")
+    return error_class(message, response=http.Response(status_code, request=request), body=None)
+
+
+def _split_tokens(content: str) -> List[str]:
+    """按估算的 token 粒度切分内容，用于流式输出"""
+    return [content[i:i + 2] for i in range(0, len(content), 2)] or [""]
+
+
+def completion_payload(request: Dict[str, Any], content: str, prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-fake-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request.get("model") or FAKE_MODEL,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop"
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+def chunk_payloads(request: Dict[str, Any], content: str) -> Iterator[Dict[str, Any]]:
+    """把内容切分为流式响应的 chunk，最后一个 chunk 带 finish_reason"""
+    completion_id = f"chatcmpl-fake-{uuid.uuid4().hex[:12]}"
+    created = int(time.time())
+    model = request.get("model") or FAKE_MODEL
+    pieces = _split_tokens(content)
+    for i, piece in enumerate(pieces):
+        yield {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "delta": {"role": "assistant", "content": piece} if i == 0 else {"content": piece},
+                "finish_reason": "stop" if i == len(pieces) - 1 else None
+            }]
+        }
+
+
+class _Completions:
+    def __init__(self, llm: FakeLLM):
+        self._llm = llm
+
+    def create(self, **kwargs):
+        time.sleep(self._llm.first_token_delay(kwargs))
+        _, content, prompt_tokens, completion_tokens = self._llm.prepare(kwargs)
+        if kwargs.get("stream"):
+            return self._stream(kwargs, content)
+        time.sleep(self._llm.token_delay(completion_tokens))
+        return ChatCompletion.model_validate(completion_payload(kwargs, content, prompt_tokens, completion_tokens))
+
+    def _stream(self, request, content):
+        per_token = self._llm.token_delay(1)
+        for payload in chunk_payloads(request, content):
+            yield ChatCompletionChunk.model_validate(payload)
+            time.sleep(per_token)
+
+
+class _AsyncCompletions(_Completions):
+    async def create(self, **kwargs):
+        await asyncio.sleep(self._llm.first_token_delay(kwargs))
+        _, content, prompt_tokens, completion_tokens = self._llm.prepare(kwargs)
+        if kwargs.get("stream"):
+            return self._stream(kwargs, content)
+        await asyncio.sleep(self._llm.token_delay(completion_tokens))
+        return ChatCompletion.model_validate(completion_payload(kwargs, content, prompt_tokens, completion_tokens))
+
+    async def _stream(self, request, content):
+        per_token = self._llm.token_delay(1)
+        for payload in chunk_payloads(request, content):
+            yield ChatCompletionChunk.model_validate(payload)
+            await asyncio.sleep(per_token)
+
+
+class _Chat:
+    def __init__(self, completions):
+        self.completions = completions
+
+
+class _Models:
+    def list(self):
+        return [{"id": FAKE_MODEL, "object": "model"}]
+
+
+class _AsyncModels:
+    async def list(self):
+        return [{"id": FAKE_MODEL, "object": "model"}]
+
+
+class FakeOpenAI:
+    """
+    与 OpenAI 同步客户端接口一致的模拟客户端。
+
+    Args:
+        llm: 使用的 FakeLLM，不指定时使用 default_llm()
+    """
+
+    _completions_class = _Completions
+    _models_class = _Models
+
+    def __init__(self, llm: Optional[FakeLLM] = None):
+        self.llm = llm or default_llm()
+        self.chat = _Chat(self._completions_class(self.llm))
+        self.models = self._models_class()
+
+    def with_options(self, **kwargs):
+        return self
+
+    def close(self) -> None:
+        pass
+
+
+class AsyncFakeOpenAI(FakeOpenAI):
+    """FakeOpenAI 的异步版本，接口与 AsyncOpenAI 一致"""
+
+    _completions_class = _AsyncCompletions
+    _models_class = _AsyncModels
+
+    async def close(self) -> None:
+        pass
@@ -0,0 +1,71 @@
+"""
+本地 OpenAI 兼容模拟服务，使用与 llm.fake 相同的内容生成、延迟和错误注入逻辑。
+
+适用于需要走真实 HTTP 连接的压测，例如测量连接池和 SDK 重试的影响：
+
+    python -m llm.fake_server --port 8001
+    OPENAI_API_BASE=http://127.0.0.1:8001/v1 OPENAI_API_KEY=fake python app.py
+
+配置见 llm/fake.py 中的 LLM_FAKE_* 环境变量。GET /stats 返回按类别统计的调用次数和 token 数。
+"""
+
+import argparse
+import asyncio
+import json
+
+import openai
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from .fake import FAKE_MODEL, FakeLLM, chunk_payloads, completion_payload
+
+
+def create_app(llm: FakeLLM = None) -> FastAPI:
+    """创建模拟服务，llm 不指定时按环境变量创建"""
+    llm = llm or FakeLLM()
+    app = FastAPI()
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": FAKE_MODEL, "object": "model", "owned_by": "fake"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(llm.first_token_delay(body))
+        try:
+            _, content, prompt_tokens, completion_tokens = llm.prepare(body)
+        except openai.APIStatusError as e:
+            return JSONResponse(
+                status_code=e.status_code,
+                content={"error": {"message": e.message, "type": "fake_error", "code": e.status_code}}
+            )
+
+        if body.get("stream"):
+            return StreamingResponse(_sse(llm, body, content), media_type="text/event-stream")
+
+        await asyncio.sleep(llm.token_delay(completion_tokens))
+        return completion_payload(body, content, prompt_tokens, completion_tokens)
+
+    @app.get("/stats")
+    async def stats():
+        return llm.stats()
+
+    return app
+
+
+async def _sse(llm: FakeLLM, body, content):
+    per_token = llm.token_delay(1)
+    for payload in chunk_payloads(body, content):
+        yield f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        await asyncio.sleep(per_token)
+    yield "data: [DONE]\n\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+    uvicorn.run(create_app(), host=args.host, port=args.port)
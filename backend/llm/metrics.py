@@ -0,0 +1,243 @@
+"""
+LLM 调用指标。
+
+MetricsClient 包装 OpenAI 兼容客户端，按 llm_stage 标记的阶段记录每次
+chat.completions.create 的耗时分布、结果和 response.usage 中的 token 数；
+调用方的重试与解析失败通过 record_retry / note_failure 记录。
+render() 输出 Prometheus 文本格式，由 FastAPI 应用和 Flask 蓝图的 /metrics 路由暴露。
+
+指标均为进程内统计，服务重启后清零：
+    llm_requests_total{stage, outcome}          请求数，outcome 为 ok / error
+    llm_request_duration_seconds{stage}         请求耗时直方图（流式请求为建立流的耗时）
+    llm_tokens_total{stage, type}               token 数，type 为 prompt / completion
+    llm_http_errors_total{stage, status}        模型服务返回的错误状态码，SDK 会对 429/5xx 自动重试
+    llm_retries_total{stage}                    调用方自身的重试次数
+    llm_parse_failures_total{stage}             模型输出无法解析或校验失败的次数
+    llm_cache_requests_total{stage, result}     响应缓存的命中情况（启用缓存时）
+    llm_prompt_tokens_saved_total{stage}        输入预处理（如简历文本规范化）减少的估算 prompt token 数
+    resume_extractions_total{path}              简历提取次数，path 为 rules / hybrid / llm（见 parser.extractor）
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from .cache import invalidate_last
+from .stage import current_stage
+
+# 耗时直方图的桶上限（秒）
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+_HELP = {
+    "llm_requests_total": ("counter", "Chat completion requests by stage and outcome."),
+    "llm_request_duration_seconds": ("histogram", "Chat completion latency in seconds."),
+    "llm_tokens_total": ("counter", "Tokens reported in response.usage."),
+    "llm_http_errors_total": ("counter", "Error responses from the model API by status code."),
+    "llm_retries_total": ("counter", "Retries performed by application code."),
+    "llm_parse_failures_total": ("counter", "Model outputs that failed to parse or validate."),
+    "llm_cache_requests_total": ("counter", "Response cache lookups by result."),
+    "llm_prompt_tokens_saved_total": ("counter", "Estimated prompt tokens removed by input preprocessing."),
+    "resume_extractions_total": ("counter", "Resume extractions by path (rules, hybrid or llm)."),
+}
+
+
+def _stage(stage: Optional[str] = None) -> str:
+    return stage or current_stage() or "unlabeled"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metrics:
+    """线程安全的计数器和直方图集合"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, tuple], float] = defaultdict(float)
+        self._histograms: Dict[Tuple[str, tuple], list] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            # 各桶计数（非累计）、溢出桶、总和、次数
+            histogram = self._histograms.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0, 0])
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            histogram[index] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+
+    def value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def record_call(self, stage: str, seconds: float, outcome: str, usage=None) -> None:
+        self.inc("llm_requests_total", stage=stage, outcome=outcome)
+        self.observe("llm_request_duration_seconds", seconds, stage=stage)
+        if usage is not None:
+            self.inc("llm_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, stage=stage, type="prompt")
+            self.inc("llm_tokens_total", getattr(usage, "completion_tokens", 0) or 0, stage=stage, type="completion")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self, extra_counters: Optional[Dict[Tuple[str, tuple], float]] = None) -> str:
+        """输出 Prometheus 文本格式（0.0.4）"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+        counters.update(extra_counters or {})
+
+        lines = []
+        for name, (kind, help_text) in _HELP.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for (metric, labels), values in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), values[:-2]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _format_value(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(round(values[-2], 6))}")
+                lines.append(f"{name}_count{_format_labels(labels)} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def record_retry(stage: Optional[str] = None) -> None:
+    """记录一次调用方重试"""
+    metrics.inc("llm_retries_total", stage=_stage(stage))
+
+
+def note_failure(stage: str, error: BaseException) -> None:
+    """
+    记录调用方处理模型输出时的失败。
+    ValueError（包括 json.JSONDecodeError 和结构校验失败）计为解析失败，并删除该请求的缓存条目
+    （见 llm.cache.invalidate_last），重试时重新请求模型；
+    请求本身的错误已由 MetricsClient 记录，这里不重复统计。
+    """
+    if isinstance(error, ValueError):
+        metrics.inc("llm_parse_failures_total", stage=stage)
+        invalidate_last(stage)
+
+
+def on_response(response) -> None:
+    """HTTP 客户端的 response 事件钩子，记录模型服务返回的错误状态码"""
+    if response.status_code >= 400:
+        metrics.inc("llm_http_errors_total", stage=_stage(), status=str(response.status_code))
+
+
+async def on_response_async(response) -> None:
+    on_response(response)
+
+
+def render() -> str:
+    """当前进程的全部 LLM 指标，包括响应缓存的命中统计"""
+    from .cache import cache_enabled, default_cache
+
+    extra = {}
+    if cache_enabled():
+        for stage, counts in default_cache().stats()["by_stage"].items():
+            for result, name in (("hit", "hits"), ("miss", "misses"), ("skipped", "skipped")):
+                extra[("llm_cache_requests_total", (("result", result), ("stage", stage)))] = counts[name]
+    return metrics.render(extra)
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Completions:
+    def __init__(self, completions, registry: Metrics):
+        self._completions = completions
+        self._metrics = registry
+
+    def create(self, **kwargs):
+        stage = _stage()
+        start = time.perf_counter()
+        try:
+            response = self._completions.create(**kwargs)
+        except Exception:
+            self._metrics.record_call(stage, time.perf_counter() - start, "error")
+            raise
+        self._metrics.record_call(stage, time.perf_counter() - start, "ok", getattr(response, "usage", None))
+        return response
+
+
+class _AsyncCompletions(_Completions):
+    async def create(self, **kwargs):
+        stage = _stage()
+        start = time.perf_counter()
+        try:
+            response = await self._completions.create(**kwargs)
+        except Exception:
+            self._metrics.record_call(stage, time.perf_counter() - start, "error")
+            raise
+        self._metrics.record_call(stage, time.perf_counter() - start, "ok", getattr(response, "usage", None))
+        return response
+
+
+class _Chat:
+    def __init__(self, completions):
+        self.completions = completions
+
+
+class MetricsClient:
+    """
+    为 OpenAI 兼容客户端记录调用指标，接口与被包装的客户端一致。
+
+    只拦截 chat.completions.create，其余属性直接转发给被包装的客户端。
+    """
+
+    _completions_class = _Completions
+
+    def __init__(self, client, registry: Optional[Metrics] = None):
+        self._client = client
+        self.metrics = registry or metrics
+        self.chat = _Chat(self._completions_class(client.chat.completions, self.metrics))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class AsyncMetricsClient(MetricsClient):
+    """MetricsClient 的异步版本，用于包装 AsyncOpenAI"""
+
+    _completions_class = _AsyncCompletions
+
+
+def with_metrics(client):
+    """为同步客户端记录调用指标"""
+    return MetricsClient(client)
+
+
+def with_async_metrics(client):
+    """with_metrics 的异步客户端版本"""
+    return AsyncMetricsClient(client)
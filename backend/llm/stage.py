@@ -0,0 +1,28 @@
+"""
+LLM 调用阶段标签。
+
+生成器在调用模型前用 llm_stage("project.generate") 标记当前所处的阶段，
+缓存等客户端包装层通过 current_stage() 读取，用于按阶段配置行为。
+标签保存在 contextvars 中，线程池任务和 asyncio 任务之间互不干扰。
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+_current_stage: ContextVar[Optional[str]] = ContextVar("llm_stage", default=None)
+
+
+@contextmanager
+def llm_stage(name: str):
+    """在 with 块内将当前 LLM 调用阶段标记为 name"""
+    token = _current_stage.set(name)
+    try:
+        yield
+    finally:
+        _current_stage.reset(token)
+
+
+def current_stage() -> Optional[str]:
+    """返回当前 LLM 调用阶段，未标记时返回 None"""
+    return _current_stage.get()
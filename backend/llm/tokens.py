@@ -0,0 +1,19 @@
+"""
+粗略的 token 数估算。
+
+没有引入分词器，按字符数估算（中文约 1~2 个字符 1 个 token，英文约 4 个字符 1 个 token，
+这里统一取 2 个字符 1 个 token，中文为主的文本会略微高估），只用于预算判断和统计，不用于计费。
+"""
+
+import math
+from typing import Any, Dict, List
+
+
+def estimate_tokens(text: str) -> int:
+    """估算文本的 token 数"""
+    return max(1, math.ceil(len(text or "") / 2))
+
+
+def estimate_messages_tokens(messages: List[Dict[str, Any]]) -> int:
+    """估算一组消息的 prompt token 数"""
+    return sum(estimate_tokens(m.get("content") or "") for m in messages)
@@ -0,0 +1,122 @@
+"""
+DOCX 简历的流式文本提取。
+
+python-docx 的 Document() 会把整个 document.xml 解析成 lxml 树并构建对象模型，而解析简历只需要文本；
+doc.paragraphs 也只包含正文段落，很多中文简历模板整页用表格排版，表格里的内容会全部丢失。
+这里直接从 zip 中流式读取 word/document.xml（ElementTree.iterparse），按文档顺序输出：
+    正文段落：每段一行（包括空段落，与 python-docx 的输出一致）
+    表格：每行一行，单元格之间用制表符分隔，单元格内的多个段落用空格连接；嵌套表格并入所在单元格
+    文本框：文本框内的段落各占一行，输出在所在段落之前；兼容格式（mc:Fallback）中的重复内容跳过
+段落和表格处理完即清空对应元素，内存占用不随文档长度增长。
+
+环境变量：
+    DOCX_STREAMING: 是否使用流式读取，默认 1；为 0 时使用 python-docx（只读取正文段落）
+"""
+
+import io
+import os
+import zipfile
+from typing import List
+from xml.etree import ElementTree
+
+from docx import Document
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+
+_P = _W + "p"
+_T = _W + "t"
+_TAB = _W + "tab"
+_BR = _W + "br"
+_CR = _W + "cr"
+_HYPHEN = _W + "noBreakHyphen"
+_TBL = _W + "tbl"
+_TR = _W + "tr"
+_TC = _W + "tc"
+
+# 段落内的制表位定义（w:pPr/w:tabs/w:tab）与文本中的制表符同名，只有 run 内的才输出
+_PPR = _W + "pPr"
+
+
+def streaming_enabled() -> bool:
+    return os.getenv("DOCX_STREAMING", "1").lower() not in ("0", "false", "no")
+
+
+def iter_docx_lines(source) -> List[str]:
+    """
+    按文档顺序返回 DOCX 的文本行。
+
+    Args:
+        source: DOCX 文件路径或可随机读取的文件对象
+    """
+    lines: List[str] = []
+    sinks = [lines]        # 段落文本的去向：正文，或当前单元格
+    paragraphs = []        # 未结束的段落（文本框中的段落嵌套在外层段落内）
+    rows = []              # 未结束的表格行
+    skip = 0               # 位于 mc:Fallback 或段落属性内的深度
+
+    with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml:
+        for event, elem in ElementTree.iterparse(xml, events=("start", "end")):
+            tag = elem.tag
+            if tag == _MC_FALLBACK or tag == _PPR:
+                skip += 1 if event == "start" else -1
+                if event == "end":
+                    elem.clear()
+                continue
+            if skip:
+                continue
+
+            if event == "start":
+                if tag == _P:
+                    paragraphs.append([])
+                elif tag == _TR:
+                    rows.append([])
+                elif tag == _TC:
+                    sinks.append([])
+                continue
+
+            if tag == _T:
+                if paragraphs and elem.text:
+                    paragraphs[-1].append(elem.text)
+            elif tag == _TAB:
+                if paragraphs:
+                    paragraphs[-1].append("\t")
+            elif tag == _BR or tag == _CR:
+                if paragraphs:
+                    paragraphs[-1].append("\n")
+            elif tag == _HYPHEN:
+                if paragraphs:
+                    paragraphs[-1].append("-")
+            elif tag == _P:
+                sinks[-1].append("".join(paragraphs.pop()))
+                elem.clear()
+            elif tag == _TC:
+                cell = sinks.pop()
+                if rows:
+                    rows[-1].append(" ".join(text.strip() for text in cell if text.strip()))
+            elif tag == _TR:
+                row = rows.pop()
+                if any(row):
+                    sinks[-1].append("\t".join(row))
+            elif tag == _TBL:
+                elem.clear()
+    return lines
+
+
+def docx_text_python_docx(raw: bytes) -> str:
+    """改动前的实现：python-docx 对象模型，只读取正文段落"""
+    return "\n".join(para.text for para in Document(io.BytesIO(raw)).paragraphs)
+
+
+def extract_docx_text(raw: bytes, streaming: bool = None) -> str:
+    """
+    提取 DOCX 的文本。
+
+    Args:
+        raw: DOCX 文件内容
+        streaming: 是否使用流式读取，默认读取环境变量 DOCX_STREAMING
+    """
+    streaming = streaming_enabled() if streaming is None else streaming
+    if not streaming:
+        return docx_text_python_docx(raw)
+    return "\n".join(iter_docx_lines(io.BytesIO(raw)))
@@ -1,78 +1,26 @@
 import json
-from dotenv import load_dotenv
-from openai import OpenAI
-import chardet
-from docx import Document
-import pdfplumber
+import asyncio
 import os
-import io
+import hashlib
+from typing import List, Optional, Tuple
 
-load_dotenv()
+from llm.client import get_client, get_async_client, OPENAI_MODEL
+from llm.metrics import metrics, note_failure
+from llm.stage import llm_stage
+from .docx_text import extract_docx_text
+from .ingest import UploadedResume
+from .normalize import normalize_enabled, normalize_resume_text
+from .pdf_text import extract_pdf_text
+from .resume_store import resume_store_from_env
+from .rule_extract import FIELDS, extract_by_rules, min_resume_confidence, rule_extraction_enabled
+from .text_decode import decode_text
 
-OPENAI_API_KEY = "sk-06a1fc23f04940cf93e06e4b39e1f949"
-OPENAI_API_BASE = "https://api.deepseek.com"
-OPENAI_MODEL = "deepseek-chat"
+# 共享的模型客户端，与各生成器使用同一个连接池
+client = get_client()
 
-client = OpenAI(
-    api_key=OPENAI_API_KEY,
-    base_url=OPENAI_API_BASE
-)
-
-def read_file_smart(file_source) -> str:
-    ext = None
-
-    if isinstance(file_source, str):
-        ext = os.path.splitext(file_source)[1].lower()
-        file_obj = open(file_source, 'rb')
-    else:
-        filename = getattr(file_source, 'filename', '')
-        ext = os.path.splitext(filename)[1].lower()
-        file_obj = file_source
-
-    if ext == '.docx':
-        file_content = file_obj.read()
-        docx_obj = io.BytesIO(file_content)
-        doc = Document(docx_obj)
-        return '\n'.join([para.text for para in doc.paragraphs])
-
-    elif ext == '.pdf':
-        file_content = file_obj.read()
-        pdf_obj = io.BytesIO(file_content)
-        text = ""
-        with pdfplumber.open(pdf_obj) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text
-
-    else:
-        raw = file_obj.read()
-        result = chardet.detect(raw)
-        encoding = result['encoding']
-        return raw.decode(encoding)
+async_client = get_async_client()
 
-def extract_resume(file_source) -> dict:
-    """
-    提取简历关键信息的接口。
-
-    输入：
-        file_source: 支持两种类型
-            - str，本地文件路径，例如 '/path/to/resume.docx'
-            - file-like对象，例如 Flask中 request.files['file'] 上传的文件对象
-
-    输出：
-        dict，包含以下JSON结构：
-        {
-            "education": [...],
-            "projects": [...],
-            "work_experience": [...],
-            "skills": [...],
-            "advantages": [...]
-        }
-    如果提取失败，将返回空字典 {}。
-    """
-    system_prompt = """你是一个专业的简历解析助手。请分析简历内容，提取以下信息并直接返回JSON格式数据（不要添加任何markdown标记）：
+EXTRACTION_SYSTEM_PROMPT = """你是一个专业的简历解析助手。请分析简历内容，提取以下信息并直接返回JSON格式数据（不要添加任何markdown标记）：
     {
         "education": [
             {
@@ -109,40 +57,249 @@ def extract_resume(file_source) -> dict:
     2. 如果某些信息在简历中没有提到，对应的字段返回空列表
     3. 确保所有字段都存在，即使是空值"""
 
+# 规则提取已填好部分字段时附加在系统提示词后，模型只需输出其余字段
+EXTRACTION_FIELDS_INSTRUCTION = """
+
+    本次只需要返回以下字段（其余字段已经提取）：{fields}"""
+
+
+# 提取提示词的版本号。修改 EXTRACTION_SYSTEM_PROMPT、解析逻辑或规则提取（parser.rule_extract）后应递增，
+# 已缓存的解析结果会在下次启动时失效。
+EXTRACTION_PROMPT_VERSION = "3"
+
+# 实际用于缓存的版本：显式版本号 + 提示词和模型的指纹，防止忘记递增版本号
+EXTRACTION_CACHE_VERSION = "{}-{}".format(
+    EXTRACTION_PROMPT_VERSION,
+    hashlib.sha256(f"{OPENAI_MODEL}\n{EXTRACTION_SYSTEM_PROMPT}".encode("utf-8")).hexdigest()[:12]
+)
+
+# 已解析简历的缓存，RESUME_CACHE_ENABLED=0 时为 None
+resume_store = resume_store_from_env(EXTRACTION_CACHE_VERSION)
+
+
+def resume_digest(raw: bytes, ext: str) -> str:
+    """简历文件内容的 SHA-256，扩展名决定解析方式，也计入摘要"""
+    sha = hashlib.sha256(raw)
+    sha.update(ext.encode("utf-8"))
+    return sha.hexdigest()
+
+def read_source_bytes(file_source) -> Tuple[bytes, str]:
+    """
+    读取简历文件的原始内容。
+
+    Returns:
+        (原始字节, 小写的文件扩展名)
+    """
+    if isinstance(file_source, UploadedResume):
+        return file_source.content, file_source.ext
+
+    if isinstance(file_source, str):
+        ext = os.path.splitext(file_source)[1].lower()
+        with open(file_source, 'rb') as file_obj:
+            return file_obj.read(), ext
+
+    filename = getattr(file_source, 'filename', '')
+    ext = os.path.splitext(filename)[1].lower()
+    return file_source.read(), ext
+
+def source_digest(file_source, raw: bytes, ext: str) -> str:
+    """读取上传内容时已计算摘要（UploadedResume）的直接使用，否则按内容计算"""
+    if isinstance(file_source, UploadedResume):
+        return file_source.digest
+    return resume_digest(raw, ext)
+
+def parse_file_bytes(raw: bytes, ext: str) -> str:
+    """按扩展名将原始字节解析为纯文本"""
+    if ext == '.docx':
+        return extract_docx_text(raw)
+
+    elif ext == '.pdf':
+        return extract_pdf_text(raw)
+
+    else:
+        return decode_text(raw)[0]
+
+def prepare_resume_text(raw: bytes, ext: str) -> str:
+    """解析文件并规范化（见 parser.normalize），作为提取提示词的输入"""
+    text = parse_file_bytes(raw, ext)
+    if not normalize_enabled():
+        return text
+    result = normalize_resume_text(text)
+    print(f"简历文本规范化: {result.original_tokens} → {result.tokens} tokens（节省 {result.saved_tokens}），"
+          f"分节 {result.sections}，去掉 {result.dropped_sections}")
+    metrics.inc("llm_prompt_tokens_saved_total", result.saved_tokens, stage="extract")
+    return result.text
+
+def plan_extraction(resume_text: str) -> Tuple[dict, List[str], float]:
+    """
+    先按规则提取（见 parser.rule_extract），决定哪些字段还需要模型提取。
+
+    Returns:
+        (规则提取的数据, 需要模型提取的字段, 规则提取的整体置信度)。
+        规则提取关闭或整体置信度低于 RESUME_RULE_MIN_OVERALL 时，全部字段交给模型
+    """
+    if not rule_extraction_enabled():
+        return {}, list(FIELDS), 0.0
+    result = extract_by_rules(resume_text)
+    llm_fields = result.gaps()
+    if result.overall < min_resume_confidence():
+        llm_fields = list(FIELDS)
+    print(f"规则提取: 置信度 {result.confidence}，需要模型提取的字段 {llm_fields or '无'}")
+    return result.data, llm_fields, result.overall
+
+def read_file_smart(file_source) -> str:
+    raw, ext = read_source_bytes(file_source)
+    return parse_file_bytes(raw, ext)
+
+def extract_resume(file_source) -> dict:
+    """
+    提取简历关键信息的接口。
+
+    输入：
+        file_source: 支持三种类型
+            - str，本地文件路径，例如 '/path/to/resume.docx'
+            - file-like对象，例如 Flask中 request.files['file'] 上传的文件对象
+            - parser.ingest.UploadedResume，已读入内存的上传文件
+
+    输出：
+        dict，包含以下JSON结构：
+        {
+            "education": [...],
+            "projects": [...],
+            "work_experience": [...],
+            "skills": [...],
+            "advantages": [...],
+            "extraction": {"path": "rules" | "hybrid" | "llm", "llm_fields": [...], "confidence": ...}
+        }
+    先按规则提取，只有规则提取不了或置信度不足的字段才调用模型（见 plan_extraction）。
+    如果提取失败，将返回空字典 {}。
+    """
     try:
-        resume_text = read_file_smart(file_source)
+        raw, ext = read_source_bytes(file_source)
+        digest = source_digest(file_source, raw, ext)
+
+        # 同一份简历重复上传时直接返回已解析的结果
+        cached = resume_store.get(digest) if resume_store else None
+        if cached is not None:
+            return cached
 
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": resume_text}
-            ],
-            stream=False
-        )
+        resume_text = prepare_resume_text(raw, ext)
+        rules, llm_fields, confidence = plan_extraction(resume_text)
+
+        # 规则提取覆盖全部字段时不调用模型
+        content = None
+        if llm_fields:
+            with llm_stage("extract"):
+                response = client.chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=_extraction_messages(resume_text, llm_fields),
+                    stream=False
+                )
+            content = response.choices[0].message.content
+
+        data = _complete_extraction(rules, llm_fields, confidence, content)
+        if resume_store:
+            resume_store.put(digest, data)
+        return data
+
+    except Exception as e:
+        print(f"[❌] 提取失败: {e}")
+        note_failure("extract", e)
+        return {}
+
+async def extract_resume_async(file_source, llm_client=None) -> dict:
+    """
+    extract_resume 的异步版本。
 
-        content = response.choices[0].message.content.strip()
+    文件读取与解析（PDF / DOCX）和简历缓存的 SQLite 读写在线程池中执行，不阻塞事件循环；
+    llm_client 需为 AsyncOpenAI 兼容客户端，默认使用模块级 async_client。
+    """
+    try:
+        raw, ext = await asyncio.to_thread(read_source_bytes, file_source)
+        digest = source_digest(file_source, raw, ext)
 
-        if content.startswith("```"):
-            content = content.split('\n', 1)[1].rsplit('\n', 1)[0]
-        if content.startswith('json'):
-            content = content.split('\n', 1)[1]
+        cached = await asyncio.to_thread(resume_store.get, digest) if resume_store else None
+        if cached is not None:
+            return cached
 
-        data = json.loads(content)
-        for key in ["education", "projects", "work_experience", "skills", "advantages"]:
-            if key not in data:
-                data[key] = []
+        resume_text = await asyncio.to_thread(prepare_resume_text, raw, ext)
+        rules, llm_fields, confidence = await asyncio.to_thread(plan_extraction, resume_text)
 
-        issues = check_resume_issues(data)
-        if issues:
-            raise ValueError(f"简历信息不足，存在以下问题：{'; '.join(issues)}")
+        content = None
+        if llm_fields:
+            with llm_stage("extract"):
+                response = await (llm_client or async_client).chat.completions.create(
+                    model=OPENAI_MODEL,
+                    messages=_extraction_messages(resume_text, llm_fields),
+                    stream=False
+                )
+            content = response.choices[0].message.content
 
+        data = _complete_extraction(rules, llm_fields, confidence, content)
+        if resume_store:
+            await asyncio.to_thread(resume_store.put, digest, data)
         return data
 
     except Exception as e:
         print(f"[❌] 提取失败: {e}")
+        note_failure("extract", e)
         return {}
 
+def _extraction_messages(resume_text: str, fields: Optional[List[str]] = None) -> list:
+    """fields 为需要模型提取的字段，为空或包含全部字段时提取完整 schema"""
+    system = EXTRACTION_SYSTEM_PROMPT
+    if fields and set(fields) != set(FIELDS):
+        system += EXTRACTION_FIELDS_INSTRUCTION.format(fields=", ".join(fields))
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": resume_text}
+    ]
+
+def _complete_extraction(rules: dict, llm_fields: List[str], confidence: float, content: Optional[str]) -> dict:
+    """
+    合并规则提取和模型提取的结果：llm_fields 取模型输出，其余字段取规则提取。
+    结果的 extraction 字段记录提取路径：
+        path: rules（未调用模型）/ hybrid（模型只提取 llm_fields）/ llm（模型提取全部字段）
+        llm_fields: 由模型提取的字段
+        confidence: 规则提取的整体置信度
+    信息不完整时抛出 ValueError。
+    """
+    data = {field: rules.get(field, []) for field in FIELDS}
+    if content is not None:
+        extracted = _load_extraction(content)
+        for field in llm_fields:
+            data[field] = extracted[field]
+
+    if not llm_fields:
+        path = "rules"
+    elif set(llm_fields) == set(FIELDS):
+        path = "llm"
+    else:
+        path = "hybrid"
+
+    issues = check_resume_issues(data)
+    if issues:
+        raise ValueError(f"简历信息不足，存在以下问题：{'; '.join(issues)}")
+
+    metrics.inc("resume_extractions_total", path=path)
+    data["extraction"] = {"path": path, "llm_fields": llm_fields, "confidence": round(confidence, 3)}
+    return data
+
+def _load_extraction(content: str) -> dict:
+    """解析模型返回的简历 JSON，补全缺失字段"""
+    content = content.strip()
+
+    if content.startswith("```"):
+        content = content.split('\n', 1)[1].rsplit('\n', 1)[0]
+    if content.startswith('json'):
+        content = content.split('\n', 1)[1]
+
+    data = json.loads(content)
+    for key in FIELDS:
+        if key not in data:
+            data[key] = []
+    return data
+
 def check_resume_issues(data: dict) -> list:
     issues = []
 
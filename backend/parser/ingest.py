@@ -0,0 +1,114 @@
+"""
+上传简历的内存接入。
+
+上传接口原先把文件整体读入内存、写到 test/data，解析时再按路径重新打开并读取一遍。
+read_upload 按块读取上传内容，边读边计算 SHA-256 和大小，最后拼接为一个不可变的 bytes：
+    解析器直接使用这份内容（io.BytesIO(bytes) 与原对象共享内存，不再复制）
+    简历缓存的摘要在读取时已经算好，不必再遍历一遍
+    落盘改为可选，并在后台线程中进行，不阻塞解析
+
+环境变量：
+    UPLOAD_SAVE_DIR: 上传文件的保存目录，默认不保存
+    UPLOAD_MAX_BYTES: 上传文件大小上限（字节），默认 20MB，0 表示不限制
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Optional, Set
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# 后台保存任务的引用，防止任务在完成前被回收
+_background_saves: Set[asyncio.Task] = set()
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class UploadedResume:
+    """
+    已读入内存的上传简历，可直接作为 extract_resume / extract_resume_async 的 file_source。
+
+    Attributes:
+        filename: 上传时的文件名
+        ext: 小写的文件扩展名
+        content: 文件内容
+        size: 文件大小（字节）
+        digest: 与 extractor.resume_digest(content, ext) 相同的摘要
+    """
+
+    def __init__(self, filename: str, content: bytes, digest: str):
+        self.filename = filename or ""
+        self.ext = os.path.splitext(self.filename)[1].lower()
+        self.content = content
+        self.size = len(content)
+        self.digest = digest
+
+
+def max_upload_bytes() -> Optional[int]:
+    limit = int(os.getenv("UPLOAD_MAX_BYTES", 20 * 1024 * 1024))
+    return limit if limit > 0 else None
+
+
+async def read_upload(upload, chunk_size: int = UPLOAD_CHUNK_SIZE, max_bytes: Optional[int] = -1) -> UploadedResume:
+    """
+    按块读取上传文件（需提供 filename 属性和异步的 read(size) 方法，如 FastAPI 的 UploadFile）。
+
+    Args:
+        upload: 上传文件
+        chunk_size: 每次读取的字节数
+        max_bytes: 大小上限，默认读取环境变量 UPLOAD_MAX_BYTES，None 表示不限制
+
+    Raises:
+        UploadTooLarge: 文件超过大小上限
+    """
+    max_bytes = max_upload_bytes() if max_bytes == -1 else max_bytes
+    filename = getattr(upload, "filename", "") or ""
+    sha = hashlib.sha256()
+    chunks = []
+    size = 0
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            raise UploadTooLarge(f"文件大小超过上限 {max_bytes} 字节")
+        sha.update(chunk)
+        chunks.append(chunk)
+
+    # 扩展名决定解析方式，与 resume_digest 一样计入摘要
+    sha.update(os.path.splitext(filename)[1].lower().encode("utf-8"))
+    content = chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    return UploadedResume(filename, content, sha.hexdigest())
+
+
+def _write_file(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def save_upload_in_background(resume: UploadedResume, directory: Optional[str] = None) -> Optional[asyncio.Task]:
+    """
+    在后台线程中把上传文件保存到 directory（默认读取环境变量 UPLOAD_SAVE_DIR），未配置目录时不保存。
+    只使用文件名部分，上传的文件名不能把文件写到目录之外。
+    """
+    directory = directory if directory is not None else os.getenv("UPLOAD_SAVE_DIR")
+    if not directory:
+        return None
+    path = os.path.join(directory, os.path.basename(resume.filename) or resume.digest)
+
+    async def save():
+        try:
+            await asyncio.to_thread(_write_file, path, resume.content)
+            print(f"文件保存成功: {path}")
+        except Exception as e:
+            print(f"文件保存失败: {e}")
+
+    task = asyncio.get_running_loop().create_task(save())
+    _background_saves.add(task)
+    task.add_done_callback(_background_saves.discard)
+    return task
@@ -0,0 +1,222 @@
+"""
+简历文本在送入提取提示词之前的规范化。
+
+PDF / DOCX 提取出的文本常带有多余空白、每页重复的页眉页脚、页码，以及提取 schema 不需要的
+个人信息、求职意向、兴趣爱好等内容，都会计入提取调用的 prompt。normalize_resume_text 是确定性的
+纯文本处理（不调用模型）：
+    空白：去掉零宽字符和空行，全角空格和不换行空格转为普通空格，合并连续空格，
+          表格单元格之间的制表符保留
+    页面元素：页码行（“第 2 页”“- 3 -”“2/5”“Page 1 of 3”），以及按换页符（\\f）分页时
+              在超过半数页面的页首或页尾重复出现的行（含“页”/“page”的行忽略其中的数字，
+              如“张三的简历 第 2 页”）
+    联系方式：电话、邮箱、微信、出生年月、籍贯等个人信息行
+    分节：识别教育经历 / 项目经历 / 工作经历 / 专业技能 / 个人优势等标题，
+          去掉 schema 不使用的分节（基本信息、求职意向、兴趣爱好、推荐人）；这类分节超过
+          MAX_DROPPED_SECTION_LINES 行时多半是漏识别了后面的标题，保留原文。
+          基本信息中的毕业院校、学历、专业等教育信息不去掉，移到补上的“教育背景”标题下
+处理后文本为空时返回原文。
+
+环境变量：
+    RESUME_NORMALIZE: 是否在提取前规范化简历文本，默认 1
+"""
+
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from llm.tokens import estimate_tokens
+
+HEADER = "header"
+
+# 分节标题 → 分节名称，分节名称与提取 schema 的字段对应
+SECTION_HEADINGS: Dict[str, str] = {}
+for _section, _headings in {
+    "basic_info": ["基本信息", "个人信息", "个人资料", "联系方式", "联系信息", "basic information", "contact"],
+    "job_intention": ["求职意向", "求职目标", "期望职位", "期望工作", "career objective", "objective"],
+    "education": ["教育经历", "教育背景", "学历背景", "学习经历", "education"],
+    "work_experience": ["工作经历", "工作经验", "实习经历", "实习经验", "工作与实习经历", "work experience", "experience"],
+    "projects": ["项目经历", "项目经验", "项目介绍", "主要项目", "projects", "project experience"],
+    "skills": ["专业技能", "技能", "技能特长", "个人技能", "技术栈", "技术能力", "技能清单", "skills"],
+    "advantages": ["个人优势", "自我评价", "个人评价", "个人总结", "自我介绍", "个人简介", "summary"],
+    "awards": ["荣誉奖项", "获奖经历", "获奖情况", "荣誉证书", "资格证书", "证书", "awards", "certificates"],
+    "hobbies": ["兴趣爱好", "爱好", "hobbies", "interests"],
+    "references": ["推荐人", "证明人", "references"],
+}.items():
+    for _heading in _headings:
+        SECTION_HEADINGS[_heading] = _section
+
+# schema（education / projects / work_experience / skills / advantages）用不到的分节
+DROPPED_SECTIONS = {"basic_info", "job_intention", "hobbies", "references"}
+MAX_DROPPED_SECTION_LINES = 20
+
+_ZERO_WIDTH_RE = re.compile("[\\u200b\\u200c\\u200d\\u2060\\ufeff]")
+_SPACES_RE = re.compile("[ \\u3000\\xa0]+")
+_TABS_RE = re.compile(r" *\t[\t ]*")
+# 标题前后的序号和装饰符号：“一、”“1.”“■”“【项目经历】”“项目经历：”
+_HEADING_DECORATION_RE = re.compile(r"^(?:[一二三四五六七八九十]+[、.．]|\d+[、.．)]?|[■◆●▌▶★☆#*|【\[])\s*|[】\]：:\s|_—-]+$")
+_PAGE_NUMBER_RE = re.compile(
+    r"^(?:第\s*\d+\s*页(?:\s*[/／,，]?\s*共\s*\d+\s*页)?|[-–—]\s*\d{1,3}\s*[-–—]|\d{1,3}|\d{1,3}\s*[/／]\s*\d{1,3}"
+    r"|page\s*\d+(?:\s*(?:of|/)\s*\d+)?)$",
+    re.IGNORECASE
+)
+_CONTACT_LABEL_RE = re.compile(
+    r"^(?:电话|手机|联系电话|手机号码?|邮箱|电子邮箱|e-?mail|微信|qq|地址|住址|现居住?地|出生年月|出生日期|生日|性别|年龄"
+    r"|籍贯|民族|政治面貌|身高|体重|婚姻状况|婚否|身份证号?)\s*[:：\t]",
+    re.IGNORECASE
+)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"(?:\+?86[-\s]?)?1[3-9]\d(?:[-\s]?\d{4}){2}")
+_SEPARATORS_RE = re.compile(r"[\s|/｜,，;；·•]+")
+_PAGE_WORD_RE = re.compile(r"页|page", re.IGNORECASE)
+_EDUCATION_LABEL_RE = re.compile(
+    r"^(?:毕业院校|毕业学校|院校|学校|学历|最高学历|学位|专业|所学专业|毕业时间|毕业年份|毕业日期|school|degree|major)"
+    r"\s*[:：\t]",
+    re.IGNORECASE
+)
+_EDUCATION_WORD_RE = re.compile(r"大学|学院|本科|硕士|博士|大专|专科|研究生|university|college", re.IGNORECASE)
+
+
+def normalize_enabled() -> bool:
+    return os.getenv("RESUME_NORMALIZE", "1").lower() not in ("0", "false", "no")
+
+
+class NormalizedResume:
+    """
+    规范化结果。
+
+    Attributes:
+        text: 规范化后的文本
+        sections: 识别出的分节名称（按出现顺序）
+        dropped_sections: 被去掉的分节名称
+        removed_lines: 去掉的页面元素和联系方式行数
+        original_tokens / tokens: 规范化前后的估算 token 数（llm.tokens.estimate_tokens）
+    """
+
+    def __init__(self, text: str, sections: List[str], dropped_sections: List[str], removed_lines: int,
+                 original_tokens: int, tokens: int):
+        self.text = text
+        self.sections = sections
+        self.dropped_sections = dropped_sections
+        self.removed_lines = removed_lines
+        self.original_tokens = original_tokens
+        self.tokens = tokens
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def _clean_line(line: str) -> str:
+    line = _ZERO_WIDTH_RE.sub("", line)
+    line = _SPACES_RE.sub(" ", line)
+    return _TABS_RE.sub("\t", line).strip()
+
+
+def section_of(line: str) -> Optional[str]:
+    """line 为分节标题时返回分节名称"""
+    if len(line) > 24:
+        return None
+    previous = None
+    key = line.strip()
+    while key != previous:
+        previous = key
+        key = _HEADING_DECORATION_RE.sub("", key).strip()
+    return SECTION_HEADINGS.get(key.lower())
+
+
+def is_page_number(line: str) -> bool:
+    return bool(_PAGE_NUMBER_RE.match(line))
+
+
+def is_contact_line(line: str) -> bool:
+    """个人信息字段行，或只由邮箱、手机号和分隔符组成的行"""
+    if len(line) > 80:
+        return False
+    if _CONTACT_LABEL_RE.match(line):
+        return True
+    if not (_EMAIL_RE.search(line) or _PHONE_RE.search(line)):
+        return False
+    rest = _PHONE_RE.sub("", _EMAIL_RE.sub("", line))
+    return not _SEPARATORS_RE.sub("", rest)
+
+
+def is_education_line(line: str) -> bool:
+    """毕业院校、学历、专业等字段行，或含学校名、学历的行（常见于基本信息分节）"""
+    return bool(_EDUCATION_LABEL_RE.match(line) or _EDUCATION_WORD_RE.search(line))
+
+
+def _edge_key(line: str) -> str:
+    """页眉页脚的比较键：带页码的行忽略数字，其他行按原文比较（正文中只有数字不同的行很常见）"""
+    return re.sub(r"\d+", "#", line) if _PAGE_WORD_RE.search(line) else line
+
+
+def _page_furniture(pages: List[List[str]], edge: int = 2) -> set:
+    """在超过半数页面的页首或页尾 edge 行内重复出现的行"""
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        counts.update({_edge_key(line) for line in lines[:edge] + lines[-edge:]})
+    return {key for key, count in counts.items() if count >= 2 and count * 2 > len(pages)}
+
+
+def normalize_resume_text(text: str) -> NormalizedResume:
+    """规范化简历文本，见模块说明"""
+    pages = [[_clean_line(line) for line in page.splitlines()] for page in (text or "").split("\f")]
+    pages = [[line for line in lines if line] for lines in pages]
+    furniture = _page_furniture(pages)
+
+    output: List[str] = []
+    sections: List[str] = []
+    dropped: List[str] = []
+    pending: List[str] = []    # 当前待去掉的分节内容
+    moved_education = False    # 当前基本信息分节中是否已移出教育信息
+    removed = 0
+
+    def close_section():
+        # 待去掉的分节过长时保留原文，避免漏识别标题后把后面的内容全部去掉
+        if len(pending) > MAX_DROPPED_SECTION_LINES:
+            output.extend(pending)
+            dropped.pop()
+        pending.clear()
+
+    section = HEADER
+    for lines in pages:
+        for line in lines:
+            if _edge_key(line) in furniture or is_page_number(line) or is_contact_line(line):
+                removed += 1
+                continue
+            heading = section_of(line)
+            if heading:
+                if section in DROPPED_SECTIONS:
+                    close_section()
+                section = heading
+                sections.append(heading)
+                moved_education = False
+                if heading in DROPPED_SECTIONS:
+                    dropped.append(heading)
+            elif section == "basic_info" and is_education_line(line):
+                # 基本信息中的教育信息是提取 schema 需要的，放到教育背景标题下
+                if not moved_education:
+                    output.append("教育背景")
+                    sections.append("education")
+                    moved_education = True
+                output.append(line)
+                continue
+            if section in DROPPED_SECTIONS:
+                pending.append(line)
+            else:
+                output.append(line)
+    if section in DROPPED_SECTIONS:
+        close_section()
+
+    normalized = "\n".join(output) or (text or "")
+    return NormalizedResume(
+        text=normalized,
+        sections=sections,
+        dropped_sections=dropped,
+        removed_lines=removed,
+        original_tokens=estimate_tokens(text or ""),
+        tokens=estimate_tokens(normalized)
+    )
@@ -0,0 +1,207 @@
+"""
+PDF 简历的文本提取。
+
+pdfplumber 对每页做完整的版面分析（逐字符解析、按坐标排序），是上传流程中最慢的 CPU 步骤，
+图形较多的简历尤其明显。这里按页处理：
+    快速路径：先用 pypdfium2（pdfplumber 的依赖，已随之安装）直接读取文本层
+    版面分析：快速路径取不到文本或文本乱码（替换字符、私有区字符较多）的页面再交给 pdfplumber
+    多进程：页数不少于 PDF_PARALLEL_MIN_PAGES 时按页分段，在进程池中并行提取
+    页数上限：只处理前 PDF_MAX_PAGES 页，超长文件（如附带论文、作品集）不会拖慢解析
+各页文本最后一次性拼接，页与页之间以换页符（\f）分隔，供 parser.normalize 识别页眉页脚。
+
+pdfium 不是线程安全的，同一进程内的快速路径调用由锁串行化；多个上传并发时由进程池并行。
+
+环境变量：
+    PDF_FAST_PATH: 是否启用快速路径，默认 1；为 0 时全部页面使用 pdfplumber（与旧版行为一致）
+    PDF_MAX_PAGES: 最多处理的页数，默认 30，0 表示不限制
+    PDF_WORKERS: 进程池大小，默认 min(4, CPU 核数)，不大于 1 时在当前进程中提取
+    PDF_PARALLEL_MIN_PAGES: 使用进程池的最小页数，默认 4
+    PDF_MIN_PAGE_CHARS: 快速路径提取的文本少于该字符数时按需要版面分析处理，默认 1
+"""
+
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import List, Optional
+
+import pdfplumber
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - pdfplumber 的依赖，正常安装时总是存在
+    pdfium = None
+
+_PDFIUM_LOCK = threading.Lock()
+
+# 超过该比例的字符为替换字符、私有区字符或控制字符时，视为字体缺少 ToUnicode 映射的乱码
+_GARBLED_RATIO = 0.05
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def fast_path_enabled() -> bool:
+    return pdfium is not None and os.getenv("PDF_FAST_PATH", "1").lower() not in ("0", "false", "no")
+
+
+def max_pages() -> Optional[int]:
+    limit = _env_int("PDF_MAX_PAGES", 30)
+    return limit if limit > 0 else None
+
+
+def default_workers() -> int:
+    return _env_int("PDF_WORKERS", min(4, os.cpu_count() or 1))
+
+
+def _is_garbled(char: str) -> bool:
+    code = ord(char)
+    return char == "\ufffd" or 0xE000 <= code <= 0xF8FF or (code < 32 and char not in "\n\t")
+
+
+def needs_layout(text: str, min_chars: int = 1) -> bool:
+    """快速路径的结果是否不可用：文本过少（扫描件、纯图片页）或乱码较多"""
+    stripped = "".join(text.split())
+    if len(stripped) < min_chars:
+        return True
+    return sum(_is_garbled(c) for c in stripped) > _GARBLED_RATIO * len(stripped)
+
+
+def _pdfium_pages(raw: bytes, start: int, stop: int) -> List[str]:
+    """用 pdfium 读取 [start, stop) 页的文本层"""
+    texts = []
+    with _PDFIUM_LOCK:
+        document = pdfium.PdfDocument(raw)
+        try:
+            for index in range(start, stop):
+                page = document[index]
+                textpage = page.get_textpage()
+                try:
+                    texts.append(textpage.get_text_range().replace("\r\n", "\n").replace("\r", "\n"))
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            document.close()
+    return texts
+
+
+def _plumber_pages(raw: bytes, indices: List[int]) -> dict:
+    """用 pdfplumber 提取指定页的文本，返回 {页码: 文本}"""
+    if not indices:
+        return {}
+    with pdfplumber.open(io.BytesIO(raw)) as pdf:
+        result = {}
+        for index in indices:
+            page = pdf.pages[index]
+            result[index] = page.extract_text() or ""
+            # 释放已解析的字符和图形对象，长文档不会随页数累积内存
+            page.close()
+        return result
+
+
+def extract_page_range(raw: bytes, start: int, stop: int, fast: bool = True, min_chars: int = 1) -> List[str]:
+    """
+    提取 [start, stop) 页的文本，快速路径不可用的页面回退到 pdfplumber。
+    作为进程池任务运行，只接受可序列化的参数。
+    """
+    indices = list(range(start, stop))
+    if fast and pdfium is not None:
+        texts = dict(zip(indices, _pdfium_pages(raw, start, stop)))
+        layout = [i for i in indices if needs_layout(texts[i], min_chars)]
+    else:
+        texts, layout = {}, indices
+    texts.update(_plumber_pages(raw, layout))
+    return [texts[i] for i in indices]
+
+
+def page_count(raw: bytes) -> int:
+    if pdfium is not None:
+        with _PDFIUM_LOCK:
+            document = pdfium.PdfDocument(raw)
+            try:
+                return len(document)
+            finally:
+                document.close()
+    with pdfplumber.open(io.BytesIO(raw)) as pdf:
+        return len(pdf.pages)
+
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    """进程内共享的进程池，首次使用时创建；spawn 方式启动，避免在多线程的服务进程中 fork"""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def _reset_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _chunks(total: int, parts: int) -> List[tuple]:
+    """把 total 页尽量均匀地分成 parts 段连续的页码区间"""
+    size, extra = divmod(total, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        stop = start + size + (1 if i < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def extract_pdf_text(raw: bytes, workers: Optional[int] = None, page_limit: Optional[int] = -1,
+                     fast: Optional[bool] = None) -> str:
+    """
+    提取 PDF 的全部文本，每页文本后接一个换行（与逐页调用 pdfplumber 的旧实现格式一致），
+    页与页之间再以换页符分隔。
+
+    Args:
+        raw: PDF 文件内容
+        workers: 进程池大小，默认读取环境变量 PDF_WORKERS
+        page_limit: 最多处理的页数，默认读取环境变量 PDF_MAX_PAGES，None 表示不限制
+        fast: 是否使用快速路径，默认读取环境变量 PDF_FAST_PATH
+    """
+    workers = default_workers() if workers is None else workers
+    page_limit = max_pages() if page_limit == -1 else page_limit
+    fast = fast_path_enabled() if fast is None else fast
+    min_chars = _env_int("PDF_MIN_PAGE_CHARS", 1)
+
+    total = page_count(raw)
+    if page_limit is not None and total > page_limit:
+        print(f"PDF 共 {total} 页，只解析前 {page_limit} 页")
+        total = page_limit
+
+    texts = None
+    if workers > 1 and total >= _env_int("PDF_PARALLEL_MIN_PAGES", 4):
+        try:
+            pool = _get_pool(workers)
+            futures = [
+                pool.submit(extract_page_range, raw, start, stop, fast, min_chars)
+                for start, stop in _chunks(total, min(workers, total))
+            ]
+            texts = [text for future in futures for text in future.result()]
+        except BrokenProcessPool as e:
+            print(f"PDF 进程池不可用，改为在当前进程中解析: {e}")
+            _reset_pool()
+    if texts is None:
+        texts = extract_page_range(raw, 0, total, fast, min_chars)
+
+    return "\f".join(text + "\n" for text in texts if text)
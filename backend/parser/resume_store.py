@@ -0,0 +1,71 @@
+"""
+已解析简历的持久化缓存。
+
+以上传文件内容的 SHA-256 为键保存 extract_resume 的结构化结果，
+同一份简历重复上传时无需再次读取文件和调用模型。
+缓存与提取提示词版本绑定：版本变化时整表清空，避免返回按旧提示词解析的结果。
+
+环境变量：
+    RESUME_CACHE_ENABLED: 是否启用，默认 1
+    RESUME_CACHE_PATH: SQLite 文件路径，默认 .cache/resume_cache.sqlite3
+    RESUME_CACHE_TTL: 有效期（秒），默认 30 天，0 表示永不过期
+    RESUME_CACHE_MAX_ENTRIES: 最多保留的简历数，默认 5000
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from llm.cache import SQLiteStore
+
+# 记录当前提示词版本的键，保存在单独的元数据表中，不受 TTL 和淘汰影响
+_VERSION_KEY = "prompt_version"
+
+
+class ResumeStore:
+    """
+    按文件摘要缓存结构化简历。
+
+    Args:
+        path: SQLite 文件路径
+        prompt_version: 当前提取提示词版本，与已保存的版本不一致时清空缓存
+        ttl: 有效期（秒），None 表示永不过期
+        max_entries: 最多保留的简历数，None 表示不限制
+    """
+
+    def __init__(self, path: str, prompt_version: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self.store = SQLiteStore(path, table="parsed_resumes", ttl=ttl, max_entries=max_entries)
+        self._meta = SQLiteStore(path, table="parsed_resumes_meta")
+        self.prompt_version = prompt_version
+        if self._meta.get(_VERSION_KEY) != prompt_version:
+            self.invalidate()
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """返回缓存的简历，未命中时返回 None"""
+        value = self.store.get(digest)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def put(self, digest: str, data: Dict[str, Any]) -> None:
+        self.store.set(digest, json.dumps(data, ensure_ascii=False))
+
+    def invalidate(self, digest: Optional[str] = None) -> None:
+        """删除指定简历的缓存；不指定时清空全部缓存并记录当前提示词版本"""
+        if digest is not None:
+            self.store.delete(digest)
+            return
+        self.store.clear()
+        self._meta.set(_VERSION_KEY, self.prompt_version)
+
+
+def resume_store_from_env(prompt_version: str) -> Optional[ResumeStore]:
+    """按环境变量创建 ResumeStore，RESUME_CACHE_ENABLED=0 时返回 None"""
+    if os.getenv("RESUME_CACHE_ENABLED", "1").lower() in ("0", "false", "no"):
+        return None
+    return ResumeStore(
+        os.getenv("RESUME_CACHE_PATH", os.path.join(".cache", "resume_cache.sqlite3")),
+        prompt_version,
+        ttl=float(os.getenv("RESUME_CACHE_TTL", 30 * 24 * 3600)),
+        max_entries=int(os.getenv("RESUME_CACHE_MAX_ENTRIES", 5000))
+    )
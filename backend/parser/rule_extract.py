@@ -0,0 +1,472 @@
+"""
+基于规则的简历结构化提取（不调用模型）。
+
+常见模板导出的简历分节标题和条目结构都很规整。extract_by_rules 先按 parser.normalize 识别的
+分节标题切分文本，再用模式规则填充提取 schema 的各字段：
+    education: 以学校名（“大学/学院/University”，前面可有起止时间）开头的行，识别学校、学位、
+               专业和毕业年份；含“获得/奖/GPA/课程”的行不作为学校行
+    projects: “项目：名称”“项目名称：名称”行，或项目经历分节中后面紧跟字段标签的短标题行
+              开始一个项目；“描述/技术栈/职责/成就”等标签行填充对应字段，未加标签的条目按
+              是否含量化结果归入成就或职责
+    work_experience: 含公司名或起止时间的行开始一段经历，识别公司、职位和时间
+    skills: 技能分节或“技能：”行，按顿号、逗号等切分，去掉“熟悉”“精通”等程度词
+    advantages: 个人优势 / 自我评价分节的条目
+“教育背景：示例大学 ...”这类“分节标题：内容”的行按内容所属分节处理。
+
+每个字段给出 0~1 的置信度：字段缺失、条目缺少必填信息（如项目没有技术栈或成果）或
+条目看起来不像该字段时降低。置信度不足的字段由 parser.extractor 交给模型提取。
+
+环境变量：
+    RESUME_RULE_EXTRACTION: 是否先用规则提取，默认 1
+    RESUME_RULE_MIN_CONFIDENCE: 字段置信度低于该值时交给模型提取，默认 0.75
+    RESUME_RULE_MIN_OVERALL: 整体置信度（各字段平均）低于该值时整份简历交给模型提取，默认 0.5
+"""
+
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .normalize import HEADER, section_of
+
+FIELDS = ["education", "projects", "work_experience", "skills", "advantages"]
+
+# 项目 / 工作经历条目内的字段标签
+_PROJECT_NAME_LABELS = {"项目", "项目名称", "项目名", "project", "project name"}
+_ENTRY_LABELS: Dict[str, str] = {}
+for _field, _labels in {
+    "description": ["描述", "项目描述", "项目简介", "项目介绍", "简介", "项目背景", "背景", "description"],
+    "technologies": ["技术栈", "技术", "使用技术", "技术选型", "开发环境", "开发技术", "关键技术", "technologies",
+                     "tech stack"],
+    "responsibilities": ["职责", "我的职责", "主要职责", "个人职责", "职责描述", "负责内容", "工作内容", "主要工作",
+                         "responsibilities"],
+    "achievements": ["成就", "成果", "项目成果", "项目成就", "工作成果", "主要成果", "业绩", "工作业绩", "收益",
+                     "achievements", "results"],
+    "company": ["公司", "公司名称", "单位", "company"],
+    "position": ["职位", "岗位", "职务", "担任职位", "position", "title"],
+    "duration": ["时间", "工作时间", "任职时间", "在职时间", "项目时间", "duration"],
+}.items():
+    for _label in _labels:
+        _ENTRY_LABELS[_label] = _field
+
+_LABEL_RE = re.compile(r"^([^:：]{1,14}?)\s*[:：]\s*(.*)$")
+_BULLET_RE = re.compile("^(?:[\\u2022\\u00b7\\u25cf\\u25aa\\u25c6\\u25a0\\u2013\\-*>]+|\\d{1,2}[.\\u3001)\\uff09]"
+                        "|[\\uff08(]\\d{1,2}[)\\uff09])\\s*")
+_DATE = r"(?:19|20)\d{2}(?:\s*[.\-/年]\s*\d{1,2}\s*月?)?"
+_DATE_RANGE_RE = re.compile(
+    rf"{_DATE}\s*(?:[-–—~～至到]+)\s*(?:{_DATE}|至今|今|现在|present|now)",
+    re.IGNORECASE
+)
+_YEAR_RE = re.compile(r"(?:19|20)\d{2}")
+_SCHOOL_RE = re.compile(
+    r"[一-龥()（）]{2,30}?(?:大学|学院|学校)|[A-Z][A-Za-z.&' -]*?(?:University|College|Institute)"
+    r"(?: of [A-Z][A-Za-z ]*)?"
+)
+# 教育分节中的奖项、GPA、课程行，其中出现的学校名（“获得清华大学优秀研究生奖”）不是一段教育经历
+_EDUCATION_NOISE_RE = re.compile(r"获得|奖|GPA|课程", re.IGNORECASE)
+_SCHOOL_LABELS = {"学校", "毕业院校", "毕业学校", "院校", "school", "university"}
+# 看起来是形容词而不是专业名的“专业”字段
+_ADJECTIVE_MAJOR_RE = re.compile(r"^(?:优秀|优异|杰出|出色|突出|卓越|良好|优良|一等|二等|三等)|的$")
+_DEGREE_RE = re.compile(r"博士|硕士|研究生|本科|学士|大专|专科|Ph\.?D\.?|Master|Bachelor", re.IGNORECASE)
+_COMPANY_RE = re.compile(
+    r"公司|集团|科技|有限|银行|研究院|研究所|工作室|事务所|\b(?:Inc|Ltd|Corp|LLC|Co)\b\.?|Technologies"
+)
+_POSITION_RE = re.compile(
+    r"工程师|开发|经理|实习|架构师|专家|负责人|研究员|分析师|设计师|总监|主管|组长|leader|engineer|developer"
+    r"|manager|intern",
+    re.IGNORECASE
+)
+# 量化结果：“降低 30%”“提升 2 倍”“QPS 从 1k 到 5k”
+_RESULT_RE = re.compile(
+    r"\d+(?:\.\d+)?\s*(?:%|倍|万|亿|ms|毫秒|秒|qps|tps)|(?:提升|提高|降低|减少|缩短|节省|增长|优化)[^，。,;；]{0,12}\d",
+    re.IGNORECASE
+)
+_SENTENCE_RE = re.compile(r"[，,。；;]|^(?:负责|参与|主导|完成|协助|带领|使用)")
+_ITEM_SPLIT_RE = re.compile(r"\s*[,，、;；/|｜\t]\s*|(?<=[A-Za-z0-9+#])\s*(?:以及|和|及|与)\s*")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[。；;!！])\s*")
+_PROFICIENCY_RE = re.compile(r"^(?:熟练掌握|熟练使用|熟练运用|熟练|精通|熟悉|掌握|了解|擅长|具备|能够|会使用|使用|以及|和)+\s*")
+_TRAILING_RE = re.compile(r"(?:等(?:技术|框架|工具)?|[。.;；,，])+$")
+_ASCII_TECH_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#.\-]*[A-Za-z0-9+#]")
+_METRIC_WORD_RE = re.compile(r"^(?:[pP]\d+|qps|tps|rt|ms|api|kpi|ok)$", re.IGNORECASE)
+_MAX_SKILL_CHARS = 24
+_MAX_TITLE_CHARS = 40
+
+
+def rule_extraction_enabled() -> bool:
+    return os.getenv("RESUME_RULE_EXTRACTION", "1").lower() not in ("0", "false", "no")
+
+
+def min_field_confidence() -> float:
+    return float(os.getenv("RESUME_RULE_MIN_CONFIDENCE", "0.75"))
+
+
+def min_resume_confidence() -> float:
+    return float(os.getenv("RESUME_RULE_MIN_OVERALL", "0.5"))
+
+
+class RuleExtraction:
+    """
+    规则提取结果。
+
+    Attributes:
+        data: 与提取 schema 结构一致的数据，五个字段都存在
+        confidence: 字段 → 置信度（0~1）
+    """
+
+    def __init__(self, data: Dict[str, list], confidence: Dict[str, float]):
+        self.data = data
+        self.confidence = confidence
+
+    @property
+    def overall(self) -> float:
+        return sum(self.confidence.values()) / len(self.confidence)
+
+    def gaps(self, threshold: Optional[float] = None) -> List[str]:
+        """置信度低于 threshold（默认 RESUME_RULE_MIN_CONFIDENCE）的字段"""
+        threshold = min_field_confidence() if threshold is None else threshold
+        return [field for field in FIELDS if self.confidence[field] < threshold]
+
+
+def _split_label(line: str) -> Tuple[Optional[str], str]:
+    match = _LABEL_RE.match(line)
+    if not match:
+        return None, line
+    return match.group(1).strip().lower(), match.group(2).strip()
+
+
+def _strip_bullet(line: str) -> Tuple[str, bool]:
+    stripped = _BULLET_RE.sub("", line, count=1)
+    return stripped.strip(), stripped != line
+
+
+def _split_items(value: str) -> List[str]:
+    items = [item for item in _ITEM_SPLIT_RE.split(value) if item]
+    if len(items) == 1 and " " in items[0] and items[0].isascii():
+        items = items[0].split()
+    return items
+
+
+def _clean_item(item: str) -> str:
+    return _TRAILING_RE.sub("", _PROFICIENCY_RE.sub("", item.strip())).strip()
+
+
+def _unique(items: List[str]) -> List[str]:
+    seen = set()
+    result = []
+    for item in items:
+        if item and item.lower() not in seen:
+            seen.add(item.lower())
+            result.append(item)
+    return result
+
+
+def _split_sections(text: str) -> Dict[str, List[str]]:
+    """按分节标题（以及“分节标题：内容”行）把各行分到所属分节；“项目：名称”行总是属于项目经历"""
+    sections: Dict[str, List[str]] = {}
+    section = HEADER
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        label, value = _split_label(line)
+        if label in _PROJECT_NAME_LABELS and value:
+            section = "projects"
+        elif section in ("projects", "work_experience") and label in _ENTRY_LABELS:
+            pass
+        elif section_of(line):
+            section = section_of(line)
+            continue
+        elif label and value and section_of(label):
+            section = section_of(label)
+            line = value
+        sections.setdefault(section, []).append(line)
+    return sections
+
+
+def _is_title(lines: List[str], index: int) -> bool:
+    """项目经历中未加标签的短行，后面紧跟字段标签或本身带起止时间时视为项目标题"""
+    line = lines[index]
+    if len(line) > _MAX_TITLE_CHARS or "。" in line or _strip_bullet(line)[1]:
+        return False
+    if _DATE_RANGE_RE.search(line):
+        return True
+    if index + 1 < len(lines):
+        label, _ = _split_label(lines[index + 1])
+        return _ENTRY_LABELS.get(label) in ("description", "technologies", "responsibilities", "achievements")
+    return False
+
+
+def _title_name(line: str) -> str:
+    segments = [s for s in re.split(r"\s*[|｜\t]\s*|\s{2,}", _DATE_RANGE_RE.sub("", line)) if s.strip()]
+    return segments[0].strip(" -–—") if segments else line
+
+
+def _add_entry_line(entry: dict, field: Optional[str], line: str) -> Optional[str]:
+    """把条目内未加标签的行加到 field（上一个标签）或按内容归入成就 / 职责，返回当前字段"""
+    text, is_bullet = _strip_bullet(line)
+    if not text:
+        return field
+    if field == "technologies":
+        entry["technologies"].extend(_clean_item(item) for item in _split_items(text))
+        return field
+    if field in ("responsibilities", "achievements"):
+        entry[field].append(text)
+        return field
+    if field == "description" and not is_bullet:
+        entry["description"] = f"{entry['description']}{text}"
+        return field
+    if "description" in entry and not entry["description"] and not is_bullet and not _RESULT_RE.search(text):
+        entry["description"] = text
+        return "description"
+    entry["achievements" if _RESULT_RE.search(text) else "responsibilities"].append(text)
+    return None
+
+
+def _new_project(name: str) -> dict:
+    return {"name": name, "description": "", "technologies": [], "responsibilities": [], "achievements": [],
+            "_inferred_technologies": False}
+
+
+def _parse_projects(lines: List[str], skills: List[str]) -> List[dict]:
+    projects: List[dict] = []
+    current: Optional[dict] = None
+    field: Optional[str] = None
+    for index, line in enumerate(lines):
+        label, value = _split_label(line)
+        if label in _PROJECT_NAME_LABELS and value:
+            current, field = _new_project(_title_name(value)), None
+            projects.append(current)
+            continue
+        entry_field = _ENTRY_LABELS.get(label)
+        if current is not None and entry_field in ("description", "technologies", "responsibilities", "achievements"):
+            field = entry_field
+            if value and field == "description":
+                current["description"] = f"{current['description']}{value}"
+            elif value:
+                _add_entry_line(current, field, value)
+                # 同一行写完的技术栈后面的条目不再是技术名
+                field = None if field == "technologies" else field
+            continue
+        if entry_field == "duration":
+            continue
+        if current is None or _is_title(lines, index):
+            current, field = _new_project(_title_name(line)), None
+            projects.append(current)
+            continue
+        field = _add_entry_line(current, field, line)
+
+    for project in projects:
+        project["technologies"] = _unique(t for t in project["technologies"] if t)
+        if not project["technologies"]:
+            project["technologies"] = _infer_technologies(project, skills)
+            project["_inferred_technologies"] = bool(project["technologies"])
+    return projects
+
+
+def _infer_technologies(project: dict, skills: List[str]) -> List[str]:
+    """项目没有技术栈标签时，从描述和职责中取出已列出的技能和英文技术名"""
+    text = " ".join([project["description"]] + project["responsibilities"])
+    lowered = text.lower()
+    found = [skill for skill in skills if skill.lower() in lowered]
+    found += [word for word in _ASCII_TECH_RE.findall(text) if not _METRIC_WORD_RE.match(word)]
+    return _unique(found)
+
+
+def _project_confidence(project: dict) -> float:
+    if not (project["description"] and project["technologies"] and project["achievements"]):
+        return 0.4
+    score = 1.0
+    if not project["responsibilities"]:
+        score *= 0.9
+    if project["_inferred_technologies"]:
+        score *= 0.8
+    return score
+
+
+def _parse_work(lines: List[str]) -> List[dict]:
+    entries: List[dict] = []
+    current: Optional[dict] = None
+    field: Optional[str] = None
+    for line in lines:
+        label, value = _split_label(line)
+        entry_field = _ENTRY_LABELS.get(label)
+        if entry_field in ("company", "position", "duration") and value:
+            if current is None or (entry_field == "company" and current["company"]):
+                current = _new_work()
+                entries.append(current)
+            current[entry_field] = value
+            continue
+        if current is not None and entry_field in ("responsibilities", "achievements", "description"):
+            field = "responsibilities" if entry_field == "description" else entry_field
+            if value:
+                current[field].append(value)
+            continue
+        text, is_bullet = _strip_bullet(line)
+        if not is_bullet and _is_work_header(text):
+            current, field = _parse_work_header(text), None
+            entries.append(current)
+            continue
+        if current is None:
+            continue
+        if field:
+            current[field].append(text)
+        else:
+            current["achievements" if _RESULT_RE.search(text) else "responsibilities"].append(text)
+    return entries
+
+
+def _is_work_header(line: str) -> bool:
+    """带起止时间，或含公司名且不像句子（“负责与银行系统对接，……”）的短行"""
+    if len(line) > _MAX_TITLE_CHARS:
+        return False
+    if _DATE_RANGE_RE.search(line):
+        return True
+    return bool(_COMPANY_RE.search(line)) and not _SENTENCE_RE.search(line)
+
+
+def _new_work() -> dict:
+    return {"company": "", "position": "", "duration": "", "responsibilities": [], "achievements": []}
+
+
+def _parse_work_header(line: str) -> dict:
+    entry = _new_work()
+    duration = _DATE_RANGE_RE.search(line) or _YEAR_RE.search(line)
+    if duration:
+        entry["duration"] = duration.group(0)
+        line = line.replace(duration.group(0), " ")
+    rest = []
+    for segment in re.split(r"\s*[|｜\t/]\s*|\s+", line):
+        if not segment:
+            continue
+        if not entry["company"] and _COMPANY_RE.search(segment):
+            entry["company"] = segment
+        elif not entry["position"] and _POSITION_RE.search(segment):
+            entry["position"] = segment
+        else:
+            rest.append(segment)
+    if not entry["company"] and rest:
+        entry["company"] = rest.pop(0)
+    return entry
+
+
+def _work_confidence(entry: dict) -> float:
+    if not entry["company"]:
+        return 0.3
+    return 0.6 + 0.2 * bool(entry["position"]) + 0.2 * bool(entry["duration"])
+
+
+def _school_row(line: str) -> Optional[Tuple[str, re.Match]]:
+    """学校行返回 (去掉条目符号和学校标签后的文本, 学校名匹配)，学校名须出现在行首（可在起止时间之后）"""
+    text, _ = _strip_bullet(line)
+    label, value = _split_label(text)
+    if label in _SCHOOL_LABELS:
+        text = value
+    elif label:
+        return None
+    if _EDUCATION_NOISE_RE.search(text):
+        return None
+    start = _DATE_RANGE_RE.match(text) or _YEAR_RE.match(text)
+    offset = len(text) - len(text[start.end():].lstrip()) if start else 0
+    school = _SCHOOL_RE.match(text, offset)
+    return (text, school) if school else None
+
+
+def _parse_education(lines: List[str]) -> List[dict]:
+    entries: List[dict] = []
+    for line in lines:
+        label, value = _split_label(_strip_bullet(line)[0])
+        if entries and label in ("专业", "major") and value:
+            entries[-1]["major"] = value
+            continue
+        if entries and label in ("学历", "学位", "degree") and value:
+            entries[-1]["degree"] = value
+            continue
+        if entries and label in ("毕业时间", "毕业年份", "毕业") and _YEAR_RE.search(value):
+            entries[-1]["graduation_year"] = _YEAR_RE.findall(value)[-1]
+            continue
+        row = _school_row(line)
+        if row is None:
+            continue
+        line, school = row
+        degree = _DEGREE_RE.search(line)
+        years = _YEAR_RE.findall(line)
+        rest = line.replace(school.group(0), " ")
+        rest = _DATE_RANGE_RE.sub(" ", rest)
+        rest = _DEGREE_RE.sub(" ", rest)
+        major = next((s for s in re.split(r"\s*[|｜\t/,，]\s*|\s+", _YEAR_RE.sub(" ", rest))
+                      if len(s) >= 2 and not re.search(r"\d|gpa|排名", s, re.IGNORECASE)), "")
+        entries.append({
+            "school": school.group(0).strip(),
+            "degree": degree.group(0) if degree else "",
+            "major": major,
+            "graduation_year": years[-1] if years else ""
+        })
+    return entries
+
+
+def _education_confidence(entry: dict) -> float:
+    # 缺少毕业年份或专业像形容词时，这一行很可能不是真正的教育经历，交给模型确认
+    if not entry["graduation_year"] or _ADJECTIVE_MAJOR_RE.search(entry["major"]):
+        return 0.5
+    return 0.7 + 0.2 * bool(entry["degree"]) + 0.1 * bool(entry["major"])
+
+
+def _parse_skills(lines: List[str]) -> Tuple[List[str], int]:
+    """返回 (技能列表, 看起来不是技能名的条目数)"""
+    skills: List[str] = []
+    rejected = 0
+    for line in lines:
+        text, _ = _strip_bullet(line)
+        label, value = _split_label(text)
+        for item in _split_items(value if label else text):
+            item = _clean_item(item)
+            if not item:
+                continue
+            if len(item) > _MAX_SKILL_CHARS or "。" in item:
+                rejected += 1
+            else:
+                skills.append(item)
+    return _unique(skills), rejected
+
+
+def _parse_advantages(lines: List[str]) -> List[str]:
+    advantages = []
+    for line in lines:
+        text, _ = _strip_bullet(line)
+        advantages.extend(s.strip() for s in _SENTENCE_SPLIT_RE.split(text) if s.strip())
+    return advantages
+
+
+def _min(scores: List[float], empty: float) -> float:
+    return min(scores) if scores else empty
+
+
+def extract_by_rules(text: str) -> RuleExtraction:
+    """按规则提取简历的结构化信息，见模块说明"""
+    sections = _split_sections(text or "")
+
+    skills, rejected = _parse_skills(sections.get("skills", []))
+    projects = _parse_projects(sections.get("projects", []), skills)
+    work = _parse_work(sections.get("work_experience", []))
+    education = _parse_education(sections.get("education", []))
+    advantages = _parse_advantages(sections.get("advantages", []))
+
+    skills_confidence = min(1.0, 0.6 + 0.15 * len(skills)) * len(skills) / (len(skills) + rejected) if skills else 0.0
+    # 没有工作经历分节且全文不像有公司经历（如应届生）时，空列表是可信的
+    work_empty = 0.3 if "work_experience" in sections or _COMPANY_RE.search(text or "") else 0.9
+    confidence = {
+        "education": _min([_education_confidence(e) for e in education], 0.3),
+        "projects": _min([_project_confidence(p) for p in projects], 0.0),
+        "work_experience": _min([_work_confidence(e) for e in work], work_empty),
+        "skills": skills_confidence,
+        "advantages": 1.0 if advantages else 0.0,
+    }
+    for project in projects:
+        del project["_inferred_technologies"]
+    data = {
+        "education": education,
+        "projects": projects,
+        "work_experience": work,
+        "skills": skills,
+        "advantages": advantages,
+    }
+    return RuleExtraction(data, {field: round(score, 3) for field, score in confidence.items()})
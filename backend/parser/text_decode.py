@@ -0,0 +1,93 @@
+"""
+纯文本简历的编码识别与解码。
+
+chardet 是纯 Python 实现，对整个文件做统计检测，耗时随文件大小线性增长；检测失败时返回的
+encoding 为 None，raw.decode(None) 直接抛出异常，整个简历解析失败。这里按代价从低到高依次尝试：
+    BOM：UTF-8 / UTF-16 / UTF-32 的字节顺序标记
+    UTF-8、GB18030：严格解码整个文件（C 实现，中文简历绝大多数属于这两种）。
+          Big5、EUC-KR、Shift-JIS 的双字节文本几乎都能按 GB18030 解码成乱码，因此 GB18030
+          解码成功时再用 chardet 检测前 CROSS_CHECK_BYTES 字节，检测为这几种编码时改用检测结果
+    统计检测：chardet 只检测前 TXT_DETECT_BYTES 字节，检测结果能严格解码整个文件时使用
+    兜底：以 UTF-8 解码，无法解码的字节替换为 U+FFFD，不再抛出异常
+
+环境变量：
+    TXT_DETECT_BYTES: 统计检测读取的最大字节数，默认 64KB
+"""
+
+import codecs
+import os
+from typing import Optional, Tuple
+
+import chardet
+
+# UTF-32 的 BOM 以 UTF-16 的 BOM 开头，需要先检查
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+# GB18030 能解码时交叉检测读取的字节数：几 KB 足以区分简繁体中文、韩文和日文，检测只需几毫秒
+CROSS_CHECK_BYTES = 4096
+
+# 与 GB18030 字节范围重叠、需要交叉检测的编码（chardet 返回的名称，小写）
+_OVERLAPPING_ENCODINGS = {"big5", "cp949", "euc-kr", "shift_jis", "cp932", "euc-jp"}
+
+
+def detect_bytes() -> int:
+    return int(os.getenv("TXT_DETECT_BYTES", 64 * 1024))
+
+
+def _strict(raw: bytes, encoding: str) -> Optional[str]:
+    try:
+        return raw.decode(encoding)
+    except (UnicodeDecodeError, LookupError):
+        return None
+
+
+def decode_text(raw: bytes, prefix_bytes: Optional[int] = None) -> Tuple[str, str]:
+    """
+    识别编码并解码。
+
+    Args:
+        raw: 文件内容
+        prefix_bytes: 统计检测读取的最大字节数，默认读取环境变量 TXT_DETECT_BYTES
+
+    Returns:
+        (文本, 使用的编码)
+    """
+    for bom, encoding in _BOMS:
+        if raw.startswith(bom):
+            text = _strict(raw, encoding)
+            if text is not None:
+                return text, encoding
+
+    try:
+        return raw.decode("utf-8"), "utf-8"
+    except UnicodeDecodeError as e:
+        # 只有结尾的多字节字符被截断时，仍按 UTF-8 处理
+        if e.reason == "unexpected end of data" and e.start >= len(raw) - 3:
+            return raw[:e.start].decode("utf-8"), "utf-8"
+
+    text = _strict(raw, "gb18030")
+    if text is not None:
+        limit = min(prefix_bytes or detect_bytes(), CROSS_CHECK_BYTES)
+        encoding = (chardet.detect(raw[:limit]).get("encoding") or "").lower()
+        if encoding in _OVERLAPPING_ENCODINGS:
+            detected = _strict(raw, encoding)
+            if detected is not None:
+                return detected, encoding
+        return text, "gb18030"
+
+    prefix = raw[:prefix_bytes or detect_bytes()]
+    encoding = chardet.detect(prefix).get("encoding")
+    if encoding:
+        text = _strict(raw, encoding)
+        if text is not None:
+            return text, encoding.lower()
+
+    print(f"无法识别文本编码（检测结果: {encoding}），按 UTF-8 解码并替换无法识别的字符")
+    return raw.decode("utf-8", errors="replace"), "utf-8"
@@ -1,24 +1,14 @@
-from dotenv import load_dotenv
-from openai import OpenAI
-import os
+from parser.extractor import extract_resume, extract_resume_async, check_resume_issues
+from qa_engine.projects import projects_main, projects_main_async, iter_projects_async
+from qa_engine.advantages import advantages_main, advantages_main_async
+from code.code_question_generotor import generate_interview_code_question, generate_interview_code_question_async
+from evaluate.report import evaluation, evaluation_async
+from llm.client import get_client, get_async_client, OPENAI_API_KEY, OPENAI_API_BASE, OPENAI_MODEL
 
-from parser.extractor import extract_resume, check_resume_issues
-from qa_engine.projects import projects_main
-from qa_engine.advantages import advantages_main
-from code.code_question_generotor import generate_interview_code_question
-from evaluate.report import evaluation
+# 所有生成器共享的客户端：同一个连接池，按 LLM_CACHE_* 配置带响应缓存（见 llm.client）
+client = get_client()
 
-load_dotenv()
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "sk-06a1fc23f04940cf93e06e4b39e1f949")
-OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.deepseek.com/v1")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "deepseek-chat")
-
-client = OpenAI(
-    api_key=OPENAI_API_KEY,
-    base_url=OPENAI_API_BASE,
-    default_headers={"Authorization": f"Bearer {OPENAI_API_KEY}"}
-)
+# 异步客户端，供 FastAPI 等异步入口使用，避免阻塞事件循环
+async_client = get_async_client()
 
 # 只保留导入、client初始化和函数暴露，不要有任何主流程代码
-
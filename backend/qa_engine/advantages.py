@@ -1,23 +1,40 @@
 import os
 import json
+import asyncio
 import dotenv
 from typing import Dict, Any, List
 
+from llm.metrics import note_failure
+from llm.stage import llm_stage
+from .dedup import choose_question, replace_duplicate
+from .question_bank import ADVANTAGE, default_question_bank, ingest_pool, serve_pool
+from .selector import LLM, default_selector, question_list, resolve_selector
+
 
 class AdvantageQAGenerator:
     """
     一个用于根据候选人简历中的技能优势领域生成深度技术面试问题的类。
     """
 
-    def __init__(self, client):
+    def __init__(self, client, selector: str = None, question_bank=None, dedup=None):
         """
         初始化 AdvantageQAGenerator。
 
         Args:
             client: 一个兼容 OpenAI SDK 接口的模型客户端对象。
+            selector: 从问题池选择问题的策略，local 为本地打分（见 qa_engine.selector），
+                llm 为调用模型选择。默认为环境变量 QUESTION_SELECTOR（默认 local）。
+            question_bank: 可选的 QuestionBank，按技能复用已生成的问题池（见 qa_engine.question_bank），
+                默认按环境变量 QUESTION_BANK_ENABLED 使用进程共享的题库。
+            dedup: 可选的 NearDuplicateIndex，与同一场面试的其他部分共享，选题时跳过近似重复的问题
+                （见 qa_engine.dedup）。
         """
         self.model = "deepseek-chat"
         self.client = client
+        self.selector = resolve_selector(selector)
+        self.local_selector = default_selector
+        self.question_bank = question_bank if question_bank is not None else default_question_bank()
+        self.dedup = dedup
 
         self.system_prompt = """
         你是一个专业的面试官，请针对简历中明确列出的专业技术领域（如机器学习、分布式系统等），深入探究以下三个维度：
@@ -46,62 +63,143 @@ class AdvantageQAGenerator:
         }
         """
 
+    def _pool_messages(self, resume_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """构建生成问题池的消息"""
+        context = {
+            "skills": resume_data.get("skills", []),
+            "advantages": resume_data.get("advantages", [])
+        }
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": json.dumps(context, ensure_ascii=False)}
+        ]
+
+    def _select_messages(self, resume_data: Dict[str, Any], questions_pool: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """构建从问题池中选择问题的消息"""
+        context = {
+            "questions_pool": questions_pool,
+            "candidate_info": {
+                "experience": resume_data.get("experience", []),
+                "education": resume_data.get("education", [])
+            }
+        }
+        return [
+            {"role": "system", "content": self.interview_prompt},
+            {"role": "user", "content": json.dumps(context, ensure_ascii=False)}
+        ]
+
     def generate_pool(self, resume_data: Dict[str, Any]) -> List[Dict[str, str]]:
         """
-        根据简历中的优势领域生成技术问题池。
+        根据简历中的优势领域生成技术问题池。题库中有强匹配的问题时直接复用，不调用模型。
         """
+        served = serve_pool(self.question_bank, ADVANTAGE, resume_data.get("skills"))
+        if served is not None:
+            return served
         try:
-            context = {
-                "skills": resume_data.get("skills", []),
-                "advantages": resume_data.get("advantages", [])
-            }
-            messages = [
-                {"role": "system", "content": self.system_prompt},
-                {"role": "user", "content": json.dumps(context, ensure_ascii=False)}
-            ]
+            with llm_stage("advantage.pool"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._pool_messages(resume_data),
+                    response_format={"type": "json_object"}
+                )
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                response_format={"type": "json_object"}
-            )
+            content = response.choices[0].message.content.strip()
+            questions_pool = json.loads(content)
+            ingest_pool(self.question_bank, ADVANTAGE, questions_pool, resume_data.get("skills"))
+            return questions_pool
+
+        except Exception as e:
+            print(f"生成问题池失败: {e}")
+            note_failure("advantage.pool", e)
+            return []
+
+    async def generate_pool_async(self, resume_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """
+        generate_pool 的异步版本，client 需为 AsyncOpenAI 兼容客户端。
+        题库的 SQLite 读写在线程池中执行，不阻塞事件循环。
+        """
+        served = await asyncio.to_thread(serve_pool, self.question_bank, ADVANTAGE, resume_data.get("skills"))
+        if served is not None:
+            return served
+        try:
+            with llm_stage("advantage.pool"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._pool_messages(resume_data),
+                    response_format={"type": "json_object"}
+                )
 
             content = response.choices[0].message.content.strip()
-            return json.loads(content)
+            questions_pool = json.loads(content)
+            await asyncio.to_thread(ingest_pool, self.question_bank, ADVANTAGE, questions_pool, resume_data.get("skills"))
+            return questions_pool
 
         except Exception as e:
             print(f"生成问题池失败: {e}")
+            note_failure("advantage.pool", e)
             return []
 
+    def select_question_local(self, resume_data: Dict[str, Any], questions_pool: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        在本地按技能和优势领域的覆盖度选择问题，返回结构与 select_question 相同。
+        """
+        keywords = (resume_data.get("skills") or []) + (resume_data.get("advantages") or [])
+        chosen = choose_question(
+            self.dedup,
+            question_list(questions_pool),
+            lambda candidates: self.local_selector.select(candidates, keywords)
+        )
+        if chosen is None:
+            return {}
+        return {
+            "question": chosen["question"],
+            "answer": chosen.get("answer", ""),
+            "reason": self.local_selector.reason(chosen, keywords)
+        }
+
     def select_question(self, resume_data: Dict[str, Any], questions_pool: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
         根据候选人背景，从问题池中选择最合适的问题。
         """
+        if self.selector != LLM:
+            return self.select_question_local(resume_data, questions_pool)
         try:
-            context = {
-                "questions_pool": questions_pool,
-                "candidate_info": {
-                    "experience": resume_data.get("experience", []),
-                    "education": resume_data.get("education", [])
-                }
-            }
-            messages = [
-                {"role": "system", "content": self.interview_prompt},
-                {"role": "user", "content": json.dumps(context, ensure_ascii=False)}
-            ]
+            with llm_stage("advantage.select"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._select_messages(resume_data, questions_pool),
+                    response_format={"type": "json_object"}
+                )
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                response_format={"type": "json_object"}
-            )
+            content = response.choices[0].message.content.strip()
+            return replace_duplicate(self.dedup, json.loads(content), question_list(questions_pool))
+
+        except Exception as e:
+            print(f"选择问题失败: {e}")
+            note_failure("advantage.select", e)
+            return self.select_question_local(resume_data, questions_pool)
+
+    async def select_question_async(self, resume_data: Dict[str, Any], questions_pool: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        select_question 的异步版本。
+        """
+        if self.selector != LLM:
+            return self.select_question_local(resume_data, questions_pool)
+        try:
+            with llm_stage("advantage.select"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._select_messages(resume_data, questions_pool),
+                    response_format={"type": "json_object"}
+                )
 
             content = response.choices[0].message.content.strip()
-            return json.loads(content)
+            return replace_duplicate(self.dedup, json.loads(content), question_list(questions_pool))
 
         except Exception as e:
             print(f"选择问题失败: {e}")
-            return {}
+            note_failure("advantage.select", e)
+            return self.select_question_local(resume_data, questions_pool)
 
     def generate(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -114,8 +212,25 @@ class AdvantageQAGenerator:
             "selected_question": selected_question
         }
 
+    async def generate_async(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        generate 的异步版本。
+        """
+        questions_pool = await self.generate_pool_async(resume_data)
+        selected_question = await self.select_question_async(resume_data, questions_pool)
+        return {
+            "questions_pool": questions_pool,
+            "selected_question": selected_question
+        }
+
+
+def _save_result(result: Dict[str, Any], out_path: str) -> None:
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=4, ensure_ascii=False)
+
 
-def advantages_main(resume_data: Dict[str, Any], client, out_path: str = None) -> Dict[str, Any]:
+def advantages_main(resume_data: Dict[str, Any], client, out_path: str = None, selector: str = None,
+                    dedup=None) -> Dict[str, Any]:
     """
     优势问题生成主入口。
 
@@ -123,16 +238,32 @@ def advantages_main(resume_data: Dict[str, Any], client, out_path: str = None) -
         resume_data: 简历结构化数据，要求含有 skills 和 advantages 字段。
         client: OpenAI 兼容客户端。
         out_path: 可选，将结果保存到的文件路径。
+        selector: 可选，问题选择策略 local / llm，默认读取环境变量 QUESTION_SELECTOR。
+        dedup: 可选，与同一场面试其他部分共享的 NearDuplicateIndex，用于跳过近似重复的问题。
 
     Returns:
         选定的最合适的问题及其参考答案。
     """
     dotenv.load_dotenv()
-    generator = AdvantageQAGenerator(client)
+    generator = AdvantageQAGenerator(client, selector=selector, dedup=dedup)
     result = generator.generate(resume_data)
 
     if out_path:
-        with open(out_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=4, ensure_ascii=False)
+        _save_result(result, out_path)
+
+    return result.get("selected_question", {})
+
+
+async def advantages_main_async(resume_data: Dict[str, Any], client, out_path: str = None, selector: str = None,
+                                dedup=None) -> Dict[str, Any]:
+    """
+    advantages_main 的异步版本，client 需为 AsyncOpenAI 兼容客户端。
+    """
+    dotenv.load_dotenv()
+    generator = AdvantageQAGenerator(client, selector=selector, dedup=dedup)
+    result = await generator.generate_async(resume_data)
+
+    if out_path:
+        await asyncio.to_thread(_save_result, result, out_path)
 
     return result.get("selected_question", {})
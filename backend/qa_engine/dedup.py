@@ -0,0 +1,238 @@
+"""
+同一场面试内的近似重复问题检测。
+
+相似项目的问题池、个人优势题池中经常出现几乎相同的问题（如“介绍一下项目的技术架构”），
+每道重复题都要多花一次参考答案调用和一次评分调用。NearDuplicateIndex 在一场面试的各部分
+（项目问答、个人优势题、编程题）之间共享，选题时跳过与已选问题近似重复的候选，改用问题池中的下一个。
+
+相似度按字符二元组（中文以二字词为主）的 Jaccard 系数计算：
+    规范化：小写、去掉空白和标点，项目名称等 mask_terms 替换为同一个占位符，
+            “订单系统的技术架构”与“推荐系统的技术架构”视为相同
+    MinHash：每个问题 64 个哈希值的签名，按 32 段 × 2 行做 LSH 分桶（相似度 0.6 时成为候选的概率约 99.9%），只与同桶的问题比较
+    校验：对 LSH 候选计算精确的 Jaccard 系数，不低于 threshold 视为重复
+
+并发为多个项目选题时，SelectionOrder 让各项目按简历中的顺序依次查重和登记，
+近似重复时由排在前面的项目保留问题，结果与各项目完成的先后无关。
+
+环境变量：
+    QUESTION_DEDUP_ENABLED: 是否在上传流程中去重，默认 1
+    QUESTION_DEDUP_THRESHOLD: 重复判定的 Jaccard 下限，默认 0.6
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import struct
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_PUNCT_RE = re.compile(r"[\W_]+")
+_MASK = "#"
+
+
+def _permutations(seed: int = 1) -> List[tuple]:
+    """MinHash 使用的 NUM_PERM 组 (a, b) 参数，由固定种子生成，签名跨进程一致"""
+    params = []
+    for i in range(NUM_PERM):
+        digest = hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack("<QQ", digest)
+        params.append((a % (_MERSENNE_PRIME - 1) + 1, b % _MERSENNE_PRIME))
+    return params
+
+
+_PERMUTATIONS = _permutations()
+
+
+def normalize_question(text: str, mask_terms: Iterable[str] = ()) -> str:
+    """小写、把 mask_terms（如项目名称）替换为占位符，并去掉空白和标点"""
+    text = _PUNCT_RE.sub("", (text or "").lower())
+    terms = {_PUNCT_RE.sub("", t.lower()) for t in mask_terms if t}
+    # 先替换较长的词，避免短词是长词的一部分
+    for term in sorted((t for t in terms if t), key=len, reverse=True):
+        text = text.replace(term, _MASK)
+    return text
+
+
+def shingles(text: str) -> set:
+    """字符二元组集合，不足两个字符时返回整个文本"""
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(shingle_set: set) -> tuple:
+    """MinHash 签名"""
+    hashes = [struct.unpack("<I", hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest())[0] for s in shingle_set]
+    if not hashes:
+        return (_MAX_HASH,) * NUM_PERM
+    return tuple(
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    )
+
+
+class NearDuplicateIndex:
+    """
+    一场面试内已选问题的索引，线程安全。
+
+    Args:
+        threshold: 重复判定的 Jaccard 下限
+        mask_terms: 比较前替换为占位符的词，通常为简历中的项目名称
+    """
+
+    def __init__(self, threshold: Optional[float] = None, mask_terms: Iterable[str] = ()):
+        if threshold is None:
+            threshold = float(os.getenv("QUESTION_DEDUP_THRESHOLD", 0.6))
+        self.threshold = threshold
+        self.mask_terms = [t for t in mask_terms if isinstance(t, str) and t.strip()]
+        self._lock = threading.Lock()
+        self._shingles: List[set] = []
+        self._questions: List[str] = []
+        self._buckets: Dict[tuple, List[int]] = defaultdict(list)
+        self.duplicates_skipped = 0
+
+    def _signature(self, question: str):
+        shingle_set = shingles(normalize_question(question, self.mask_terms))
+        signature = minhash(shingle_set)
+        bands = [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+        return shingle_set, bands
+
+    def _find(self, shingle_set: set, bands) -> Optional[str]:
+        candidates = {i for band in bands for i in self._buckets.get(band, ())}
+        for i in sorted(candidates):
+            if jaccard(shingle_set, self._shingles[i]) >= self.threshold:
+                return self._questions[i]
+        return None
+
+    def _add(self, question: str, shingle_set: set, bands) -> None:
+        index = len(self._questions)
+        self._questions.append(question)
+        self._shingles.append(shingle_set)
+        for band in bands:
+            self._buckets[band].append(index)
+
+    def duplicate_of(self, question: str) -> Optional[str]:
+        """返回与 question 近似重复的已选问题，没有时返回 None"""
+        shingle_set, bands = self._signature(question)
+        with self._lock:
+            return self._find(shingle_set, bands)
+
+    def add(self, question: str) -> None:
+        """登记已选问题"""
+        shingle_set, bands = self._signature(question)
+        with self._lock:
+            self._add(question, shingle_set, bands)
+
+    def choose(self, candidates: List[Dict[str, Any]], pick: Callable[[List[Dict[str, Any]]], Optional[Dict[str, Any]]] = None,
+               key: str = "question") -> Optional[Dict[str, Any]]:
+        """
+        去掉与已选问题近似重复的候选后调用 pick 选择，并登记选中的问题；检查和登记在同一把锁内完成，
+        并发选题时不会选出彼此重复的问题。候选全部重复时仍从全部候选中选择。
+
+        Args:
+            candidates: 候选问题，按优先顺序排列
+            pick: 从候选中选出一个，默认选第一个
+            key: 问题文本所在的字段
+        """
+        pick = pick or (lambda items: items[0] if items else None)
+        signatures = [self._signature(c.get(key) or "") for c in candidates]
+        with self._lock:
+            fresh = [c for c, (s, b) in zip(candidates, signatures) if self._find(s, b) is None]
+            self.duplicates_skipped += len(candidates) - len(fresh)
+            chosen = pick(fresh or candidates)
+            if chosen is not None:
+                for c, (s, b) in zip(candidates, signatures):
+                    if c is chosen:
+                        self._add(c.get(key) or "", s, b)
+                        break
+            return chosen
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._questions)
+
+
+class SelectionOrder:
+    """
+    让并发处理的多个项目按位置顺序去重选题：位置 i 的项目在位置 i-1 的项目选题完成（或失败）后才选题。
+    只有查重和登记按顺序进行，生成问题池和参考答案仍然并发。
+
+    Args:
+        count: 项目数
+    """
+
+    def __init__(self, count: int):
+        self._done = [threading.Event() for _ in range(count)]
+
+    def done(self, position: int) -> None:
+        """标记位置 position 的项目已选题完成，可重复调用"""
+        self._done[position].set()
+
+    @contextmanager
+    def turn(self, position: int):
+        if position > 0:
+            self._done[position - 1].wait()
+        try:
+            yield
+        finally:
+            self.done(position)
+
+
+class AsyncSelectionOrder(SelectionOrder):
+    """SelectionOrder 的异步版本，用于同一事件循环中的协程"""
+
+    def __init__(self, count: int):
+        self._done = [asyncio.Event() for _ in range(count)]
+
+    @asynccontextmanager
+    async def turn(self, position: int):
+        if position > 0:
+            await self._done[position - 1].wait()
+        try:
+            yield
+        finally:
+            self.done(position)
+
+
+def dedup_enabled() -> bool:
+    return os.getenv("QUESTION_DEDUP_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def interview_index(resume_data: Dict[str, Any]) -> Optional[NearDuplicateIndex]:
+    """为一份简历创建各部分共享的索引，以项目名称为 mask_terms；未启用去重时返回 None"""
+    if not dedup_enabled():
+        return None
+    names = [project.get("name") for project in resume_data.get("projects") or [] if isinstance(project, dict)]
+    return NearDuplicateIndex(mask_terms=names)
+
+
+def choose_question(index: Optional[NearDuplicateIndex], candidates: List[Dict[str, Any]],
+                    pick: Callable[[List[Dict[str, Any]]], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+    """生成器本地选题的入口：index 为 None（未启用去重）时直接调用 pick"""
+    if index is None:
+        return pick(candidates)
+    return index.choose(candidates, pick)
+
+
+def replace_duplicate(index: Optional[NearDuplicateIndex], chosen: Optional[Dict[str, Any]],
+                      candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """模型选出的问题与已选问题重复时，按问题池顺序换成第一个不重复的候选，并登记最终选中的问题"""
+    if index is None or not chosen or not chosen.get("question"):
+        return chosen
+    ordered = [chosen] + [c for c in candidates if c.get("question") != chosen["question"]]
+    return index.choose(ordered)
@@ -1,8 +1,10 @@
-from typing import Dict, Any
-from flask import Blueprint, request, jsonify
+from typing import Dict, Any, Iterator
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from .item import InterviewSession
+from llm import metrics
 import logging
 import traceback
+import json
 import os
 
 # 设置日志
@@ -24,6 +26,11 @@ def test_api():
         logger.error(f"测试API异常: {str(e)}")
         return jsonify({"error": "API测试失败", "details": str(e)}), 500
 
+@flask_router.route("/metrics", methods=['GET'])
+def llm_metrics():
+    """以 Prometheus 文本格式输出本进程的 LLM 调用指标"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
 @flask_router.route("/interview/start", methods=['POST'])
 def start_interview():
     """开始一个新的面试会话"""
@@ -112,4 +119,100 @@ def continue_interview():
             "candidate_answer": result["candidate_answer"]
         })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+def _ndjson(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False) + "\n"
+
+def _stream_turn(session_id: str, tokens: Iterator[str]) -> Response:
+    """
+    以 NDJSON 分块返回一轮面试问题：
+    {"type": "session"} -> 若干 {"type": "token"} -> {"type": "question"} -> {"type": "done"}。
+    参考答案在后台生成，通过 GET /interview/answer 获取。
+    """
+    def generate():
+        yield _ndjson({"type": "session", "session_id": session_id})
+        parts = []
+        try:
+            for token in tokens:
+                parts.append(token)
+                yield _ndjson({"type": "token", "content": token})
+        except Exception as e:
+            logger.error(f"流式生成问题失败: {str(e)}\n{traceback.format_exc()}")
+            yield _ndjson({"type": "error", "error": str(e)})
+            return
+        yield _ndjson({"type": "question", "content": "".join(parts).strip()})
+        yield _ndjson({"type": "done"})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@flask_router.route("/interview/start/stream", methods=['POST'])
+def start_interview_stream():
+    """开始一个新的面试会话，流式返回第一个问题"""
+    try:
+        if not request.is_json:
+            return jsonify({"error": "请求必须是JSON格式"}), 400
+
+        project_data = request.json
+        if not project_data:
+            return jsonify({"error": "项目数据为空"}), 400
+
+        required_fields = ["name", "description", "technologies"]
+        missing_fields = [field for field in required_fields if field not in project_data]
+        if missing_fields:
+            return jsonify({"error": f"缺少必要的项目数据字段: {', '.join(missing_fields)}"}), 400
+
+        session = InterviewSession(project_data)
+        session_id = str(len(interview_sessions) + 1)  # 简单的会话ID生成
+        interview_sessions[session_id] = session
+
+        return _stream_turn(session_id, session.start_interview_stream())
+    except Exception as e:
+        error_traceback = traceback.format_exc()
+        logger.error(f"开始流式面试失败: {str(e)}\n{error_traceback}")
+        return jsonify({"error": "启动面试失败", "details": str(e)}), 500
+
+@flask_router.route("/interview/continue/stream", methods=['POST'])
+def continue_interview_stream():
+    """继续面试会话，流式返回下一个问题；面试结束时与 /interview/continue 一样返回评估结果"""
+    try:
+        data = request.json
+        session_id = data.get("session_id")
+        user_answer = data.get("answer")
+
+        session = interview_sessions.get(session_id)
+        if not session:
+            return jsonify({"error": "面试会话不存在"}), 404
+
+        tokens = session.continue_interview_stream(user_answer)
+        if tokens is None:
+            evaluation = session.evaluate_answers()
+            del interview_sessions[session_id]
+            return jsonify({
+                "status": "completed",
+                "evaluation": evaluation
+            })
+
+        return _stream_turn(session_id, tokens)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@flask_router.route("/interview/answer", methods=['GET'])
+def get_candidate_answer():
+    """获取当前问题的参考答案（流式接口在后台生成，尚未完成时等待）"""
+    try:
+        session_id = request.args.get("session_id")
+        session = interview_sessions.get(session_id)
+        if not session:
+            return jsonify({"error": "面试会话不存在"}), 404
+
+        return jsonify({
+            "session_id": session_id,
+            "candidate_answer": session.get_candidate_answer()
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
@@ -1,11 +1,16 @@
 import os
 import json
 import time
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Iterator
 from dotenv import load_dotenv
 import logging
 
+from llm.client import get_client, OPENAI_API_KEY, OPENAI_API_BASE, OPENAI_MODEL
+from llm.metrics import note_failure, record_retry
+from llm.stage import llm_stage
+
 # 设置openai相关模块日志级别为WARNING
 logging.getLogger('openai').setLevel(logging.WARNING)
 logging.getLogger('openai._base_client').setLevel(logging.WARNING)
@@ -13,16 +18,15 @@ logging.getLogger('openai._base_client').setLevel(logging.WARNING)
 # 确保环境变量加载
 load_dotenv()
 
+# 流式面试时在后台生成参考答案的线程池
+_answer_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SESSION_ANSWER_WORKERS", 8)))
+
 class ProjectQAGenerator:
     def __init__(self):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.api_base = os.getenv("OPENAI_API_BASE")
-        self.model = os.getenv("OPENAI_MODEL", "deepseek-chat")
+        self.model = OPENAI_MODEL
 
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url=self.api_base
-        )
+        # 使用进程内共享的客户端（见 llm.client）
+        self.client = get_client()
 
     def generate_questions(self, project_data: Dict[str, Any], question_types: List[str]) -> List[Dict[str, Any]]:
         """根据项目信息和问题类型生成问答数据
@@ -76,14 +80,15 @@ class ProjectQAGenerator:
             问题类型：{', '.join(question_types)}
             """
 
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": project_context}
-                ],
-                stream=False
-            )
+            with llm_stage("item.generate"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": project_context}
+                    ],
+                    stream=False
+                )
 
             content = response.choices[0].message.content.strip()
             if content.startswith('```'):
@@ -96,16 +101,20 @@ class ProjectQAGenerator:
 
         except Exception as e:
             print(f"[❌] 问题生成失败: {e}")
+            note_failure("item.generate", e)
             return []
 
 class InterviewSession:
     def __init__(self, project_data: Dict[str, Any]):
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        self.api_base = os.getenv("OPENAI_API_BASE")
-        self.model = os.getenv("OPENAI_MODEL", "deepseek-chat")
+        self.api_key = OPENAI_API_KEY
+        self.api_base = OPENAI_API_BASE
+        self.model = OPENAI_MODEL
         self.project_data = project_data
         self.conversation_history = []
         self.candidate_answers = []
+        # 流式面试中正在后台生成的参考答案；Flask 多线程处理同一会话的并发请求时由锁保护
+        self._pending_answer = None
+        self._answer_lock = threading.Lock()
         
         # 打印重要的调试信息
         print(f"初始化InterviewSession: API Key存在: {bool(self.api_key)}, API Base: {self.api_base}, Model: {self.model}")
@@ -114,37 +123,27 @@ class InterviewSession:
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY 环境变量未设置或为空")
             
-        # 检查API基础URL是否有效
-        if not self.api_base:
-            print("警告: OPENAI_API_BASE 环境变量未设置，将使用默认URL")
+        # 所有会话共享同一个客户端和连接池，超时等配置见 llm.client
+        self.client = get_client()
             
-        try:
-            self.client = OpenAI(
-                api_key=self.api_key,
-                base_url=self.api_base,
-                timeout=60.0  # 设置60秒超时
-            )
-            print("OpenAI客户端创建成功")
-        except Exception as e:
-            print(f"OpenAI客户端创建失败: {str(e)}")
-            raise
-            
-    def _call_openai_with_retry(self, messages, max_retries=3):
+    def _call_openai_with_retry(self, messages, max_retries=3, stage="session.turn"):
         """调用OpenAI API，带有重试逻辑"""
         last_error = None
         for attempt in range(max_retries):
             try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    stream=False
-                )
+                with llm_stage(stage):
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        stream=False
+                    )
                 return response
             except Exception as e:
                 last_error = e
                 if attempt == 0:  # 仅在第一次尝试失败时打印消息
                     print(f"OpenAI API调用失败，正在重试... (错误: {str(e)[:50]})")
                 if attempt < max_retries - 1:
+                    record_retry(stage)
                     time.sleep(2)  # 等待2秒后重试
         
         # 所有重试都失败
@@ -218,7 +217,7 @@ class InterviewSession:
                     {"role": "user", "content": f"请回答以下问题：\n{question}\n项目信息：\n{project_context}"}
                 ]
                 
-                candidate_response = self._call_openai_with_retry(candidate_messages)
+                candidate_response = self._call_openai_with_retry(candidate_messages, stage="session.answer")
                 
                 candidate_answer = candidate_response.choices[0].message.content.strip()
                 self.candidate_answers.append(candidate_answer)
@@ -247,6 +246,7 @@ class InterviewSession:
     def continue_interview(self, user_answer: str) -> Optional[Dict[str, str]]:
         """继续面试，根据用户回答生成下一个问题"""
         try:
+            self._collect_pending_answer()
             self.conversation_history.append({"role": "user", "content": user_answer})
             if len(self.conversation_history) >= 10:  # 最多5轮对话
                 return None
@@ -278,7 +278,7 @@ class InterviewSession:
                     {"role": "user", "content": f"请回答以下问题：\n{question}\n项目信息：\n{self._get_project_context()}"}
                 ]
                 
-                candidate_response = self._call_openai_with_retry(candidate_messages)
+                candidate_response = self._call_openai_with_retry(candidate_messages, stage="session.answer")
                 
                 candidate_answer = candidate_response.choices[0].message.content.strip()
                 self.candidate_answers.append(candidate_answer)
@@ -304,9 +304,135 @@ class InterviewSession:
             print(f"continue_interview方法异常: {str(e)}")
             raise
 
+    def _stream_openai_with_retry(self, messages, max_retries=3, stage="session.turn") -> Iterator[str]:
+        """以流式方式调用OpenAI API，逐段产出内容；只在收到首个内容之前重试"""
+        last_error = None
+        for attempt in range(max_retries):
+            received = False
+            try:
+                with llm_stage(stage):
+                    stream = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        stream=True
+                    )
+                    for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            received = True
+                            yield delta
+                return
+            except Exception as e:
+                if received:
+                    raise
+                last_error = e
+                if attempt == 0:
+                    print(f"OpenAI API流式调用失败，正在重试... (错误: {str(e)[:50]})")
+                if attempt < max_retries - 1:
+                    record_retry(stage)
+                    time.sleep(2)
+
+        print(f"OpenAI API流式调用失败: {str(last_error)[:50]}")
+        raise last_error
+
+    def _stream_question(self, interviewer_messages, default_question: str, default_answer: str) -> Iterator[str]:
+        """
+        流式产出面试官问题，结束后记录到对话历史，并在后台开始生成参考答案。
+        调用失败时产出默认问题，与非流式接口的降级行为一致。
+        """
+        self._collect_pending_answer()
+        parts = []
+        try:
+            for delta in self._stream_openai_with_retry(interviewer_messages):
+                parts.append(delta)
+                yield delta
+            question = "".join(parts).strip()
+        except Exception as e:
+            print(f"OpenAI API调用失败: {str(e)}")
+            if parts:
+                # 已经输出了部分问题，保留已生成的内容
+                question = "".join(parts).strip()
+            else:
+                question = default_question
+                yield default_question
+
+        self.conversation_history.append({"role": "interviewer", "content": question})
+        with self._answer_lock:
+            self._pending_answer = _answer_executor.submit(self._generate_candidate_answer, question, default_answer)
+
+    def _generate_candidate_answer(self, question: str, default_answer: str) -> str:
+        candidate_messages = [
+            {"role": "system", "content": self._get_candidate_system_prompt()},
+            {"role": "user", "content": f"请回答以下问题：\n{question}\n项目信息：\n{self._get_project_context()}"}
+        ]
+        try:
+            candidate_response = self._call_openai_with_retry(candidate_messages, stage="session.answer")
+            return candidate_response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"OpenAI API调用失败: {str(e)}")
+            return default_answer
+
+    def _collect_pending_answer(self) -> Optional[str]:
+        """
+        等待后台参考答案生成完毕并记录到 candidate_answers。
+        检查、等待和记录在同一把锁内完成，并发调用时同一个答案只记录一次。
+        """
+        with self._answer_lock:
+            if self._pending_answer is None:
+                return None
+            candidate_answer = self._pending_answer.result()
+            self._pending_answer = None
+            self.candidate_answers.append(candidate_answer)
+            return candidate_answer
+
+    def get_candidate_answer(self) -> Optional[str]:
+        """返回最近一个问题的参考答案，后台尚未生成完时阻塞等待"""
+        collected = self._collect_pending_answer()
+        if collected is not None:
+            return collected
+        return self.candidate_answers[-1] if self.candidate_answers else None
+
+    def start_interview_stream(self) -> Iterator[str]:
+        """
+        start_interview 的流式版本：逐段产出第一个面试问题。
+
+        参考答案在问题生成完毕后于后台生成，通过 get_candidate_answer 获取。
+        """
+        interviewer_messages = [
+            {"role": "system", "content": self._get_interviewer_system_prompt()},
+            {"role": "user", "content": f"请根据以下项目信息，提出第一个面试问题：\n{self._get_project_context()}"}
+        ]
+        return self._stream_question(
+            interviewer_messages,
+            "请详细介绍一下这个项目的技术架构和你负责的部分。",
+            "我负责的是简历解析模块和大模型对接部分。在技术架构上，我们使用了Python和FastAPI构建后端服务，PostgreSQL存储数据，并通过OpenAI API实现智能解析功能。"
+        )
+
+    def continue_interview_stream(self, user_answer: str) -> Optional[Iterator[str]]:
+        """
+        continue_interview 的流式版本：逐段产出下一个面试问题，面试结束时返回 None。
+        """
+        self._collect_pending_answer()
+        self.conversation_history.append({"role": "user", "content": user_answer})
+        if len(self.conversation_history) >= 10:  # 最多5轮对话
+            return None
+
+        interviewer_messages = [
+            {"role": "system", "content": self._get_interviewer_system_prompt()},
+            {"role": "user", "content": f"请根据以下对话历史，提出下一个问题：\n{self._format_conversation_history()}"}
+        ]
+        return self._stream_question(
+            interviewer_messages,
+            "您能更详细地介绍一下项目中遇到的技术挑战和解决方案吗？",
+            "在项目中我们面临的主要挑战是文档格式多样性和非结构化文本解析。对于格式多样性，我们使用了python-docx和PyPDF2库处理不同格式；对于文本解析，结合了规则和大模型方法，提高了准确率。"
+        )
+
     def evaluate_answers(self) -> Dict[str, Any]:
         """评估用户回答"""
         try:
+            self._collect_pending_answer()
             # user_answers = [msg["content"] for msg in self.conversation_history if msg["role"] == "user"]
             
             evaluation_prompt = f"""
@@ -338,7 +464,7 @@ class InterviewSession:
                     {"role": "user", "content": evaluation_prompt}
                 ]
                 
-                response = self._call_openai_with_retry(evaluation_messages)
+                response = self._call_openai_with_retry(evaluation_messages, stage="session.evaluate")
                 
                 evaluation = response.choices[0].message.content.strip()
                 # print("评估结果生成成功")
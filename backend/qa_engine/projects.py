@@ -1,9 +1,22 @@
 import dotenv
 import os
 import json
-from typing import Dict, Any, List
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 from openai import OpenAI
 
+from llm.metrics import note_failure
+from llm.stage import llm_stage
+from llm.tokens import estimate_messages_tokens
+from .dedup import AsyncSelectionOrder, NearDuplicateIndex, SelectionOrder, choose_question, replace_duplicate
+from .question_bank import PROJECT, default_question_bank, ingest_pool
+from .selector import LLM, default_selector, question_list, resolve_selector
+
+# 批量模式下预计每个项目输出的 token 数（问题池、选中问题和参考答案），用于判断是否超出预算
+BATCH_OUTPUT_TOKENS_PER_PROJECT = 500
+
 
 class ProjectQAGenerator:
     """
@@ -16,20 +29,49 @@ class ProjectQAGenerator:
     - 为选定的问题生成优秀的口语化参考答案。
     - 处理整个简历，为所有项目生成问题和答案。
     """
-    def __init__(self, client):
+    def __init__(self, client, max_workers: Optional[int] = None, fast_mode: Optional[bool] = None,
+                 batch_mode: Optional[bool] = None, batch_token_budget: Optional[int] = None,
+                 selector: Optional[str] = None, question_bank=None, dedup: Optional[NearDuplicateIndex] = None):
         """
         初始化 ProjectQAGenerator。
 
         Args:
-            **kwargs: 关键字参数，用于覆盖默认配置或环境变量。
-                api_key (str, optional): OpenAI API 密钥。默认为环境变量 OPENAI_API_KEY。
-                api_base (str, optional): OpenAI API 基础 URL。默认为环境变量 OPENAI_API_BASE。
-                model (str, optional): 使用的 OpenAI 模型。默认为 "deepseek-chat"。
+            client: 一个兼容 OpenAI SDK 接口的模型客户端对象。
+            max_workers: 并发处理项目的最大数量。默认为环境变量 PROJECT_QA_CONCURRENCY（默认 4），
+                设置为 1 时按顺序逐个处理项目。
+            fast_mode: 是否使用快速模式，即每个项目只调用一次模型，同时返回排序后的问题池、
+                选中的问题和参考答案。默认为环境变量 PROJECT_QA_FAST_MODE（默认 0）。
+            batch_mode: 是否使用批量模式，即整份简历的所有项目在一次调用中完成。
+                默认为环境变量 PROJECT_QA_BATCH_MODE（默认 0）。
+            batch_token_budget: 批量请求的 token 预算（估算的输入加预计输出），超出时回退到逐项目调用。
+                默认为环境变量 PROJECT_QA_BATCH_TOKEN_BUDGET（默认 6000）。
+            selector: 逐步生成时从问题池选择问题的策略，local 为本地打分（见 qa_engine.selector），
+                llm 为调用模型选择。默认为环境变量 QUESTION_SELECTOR（默认 local）。
+            question_bank: 可选的 QuestionBank，生成的问题池按项目技术写入题库（见 qa_engine.question_bank），
+                默认按环境变量 QUESTION_BANK_ENABLED 使用进程共享的题库。项目问题针对具体经历，只入库不复用。
+            dedup: 可选的 NearDuplicateIndex，与同一场面试的其他部分共享，选题时跳过近似重复的问题
+                （见 qa_engine.dedup）。快速模式和批量模式的问题由模型选定并已生成答案，只登记不替换。
         """
         
         # 初始化OpenAI客户端
         self.model = "deepseek-chat"
         self.client = client
+        if max_workers is None:
+            max_workers = int(os.getenv("PROJECT_QA_CONCURRENCY", 4))
+        self.max_workers = max(1, max_workers)
+        if fast_mode is None:
+            fast_mode = os.getenv("PROJECT_QA_FAST_MODE", "0").lower() in ("1", "true", "yes")
+        self.fast_mode = fast_mode
+        if batch_mode is None:
+            batch_mode = os.getenv("PROJECT_QA_BATCH_MODE", "0").lower() in ("1", "true", "yes")
+        self.batch_mode = batch_mode
+        if batch_token_budget is None:
+            batch_token_budget = int(os.getenv("PROJECT_QA_BATCH_TOKEN_BUDGET", 6000))
+        self.batch_token_budget = batch_token_budget
+        self.selector = resolve_selector(selector)
+        self.local_selector = default_selector
+        self.question_bank = question_bank if question_bank is not None else default_question_bank()
+        self.dedup = dedup
         
         # 系统提示词
         self.system_prompt = """
@@ -82,6 +124,301 @@ class ProjectQAGenerator:
         }
         """
 
+        # 快速模式：一次调用完成生成问题池、选择问题和生成参考答案
+        self.fast_prompt = """
+        你是一位经验丰富的技术面试官，正在根据候选人简历中的一个项目经历准备面试。请一次完成以下三步：
+        1. 生成至少3个专业的面试问题，覆盖项目基础（背景、技术选型、架构设计）、技术深度、挑战与解决方案
+        2. 结合候选人的背景信息（技能、工作经验、教育背景），将问题按适合程度从高到低排序
+        3. 选出排名第一的问题，并以优秀候选人的口吻给出自然流畅、口语化的参考答案
+        
+        参考答案要求：突出专业能力、项目贡献和沟通能力，简洁有逻辑，避免书面语和模板化，
+        不要以“这个问题问得好”类似话术开头。
+        
+        返回JSON格式数据：
+        {
+            "project_name": "项目名称",
+            "questions": [
+                {
+                    "question": "问题内容",
+                    "type": "问题类型(基础/技术/挑战)",
+                    "purpose": "提问目的"
+                },
+                ...
+            ],
+            "selected_questions": [
+                {
+                    "question": "排名第一的问题内容",
+                    "reason": "选择该问题的原因（需要结合候选人背景说明）",
+                    "answer": "口语化的参考答案"
+                }
+            ]
+        }
+        """
+
+        # 批量模式：一次调用为简历中的全部项目完成生成、选择和回答
+        self.batch_prompt = """
+        你是一位经验丰富的技术面试官，需要一次性为候选人简历中的所有项目经历准备面试问题。对每个项目分别完成：
+        1. 生成至少3个专业的面试问题，覆盖项目基础（背景、技术选型、架构设计）、技术深度、挑战与解决方案
+        2. 结合候选人的背景信息（技能、工作经验、教育背景），将问题按适合程度从高到低排序
+        3. 选出排名第一的问题，并以优秀候选人的口吻给出自然流畅、口语化的参考答案
+        
+        参考答案要求：突出专业能力、项目贡献和沟通能力，简洁有逻辑，避免书面语和模板化，
+        不要以“这个问题问得好”类似话术开头。
+        
+        以项目名称为键返回JSON格式数据，项目名称必须与输入完全一致，且每个项目都要返回：
+        {
+            "projects": {
+                "项目名称": {
+                    "questions": [
+                        {
+                            "question": "问题内容",
+                            "type": "问题类型(基础/技术/挑战)",
+                            "purpose": "提问目的"
+                        },
+                        ...
+                    ],
+                    "selected_questions": [
+                        {
+                            "question": "排名第一的问题内容",
+                            "reason": "选择该问题的原因（需要结合候选人背景说明）",
+                            "answer": "口语化的参考答案"
+                        }
+                    ]
+                },
+                ...
+            }
+        }
+        """
+
+    def _project_context(self, project_data: Dict[str, Any]) -> str:
+        """构建项目上下文"""
+        return f"""
+            项目名称：{project_data.get('name', '')}
+            项目描述：{project_data.get('description', '')}
+            使用技术：{', '.join(project_data.get('technologies', []))}
+            项目职责：{', '.join(project_data.get('responsibilities', []))}
+            项目成就：{', '.join(project_data.get('achievements', []))}
+            """
+
+    def _questions_messages(self, project_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """构建生成问题池的消息"""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self._project_context(project_data)}
+        ]
+
+    def _select_messages(self, questions_pool: Dict[str, Any], resume_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """构建从问题池中选择问题的消息"""
+        # 构建问题池和简历上下文
+        context = {
+            "questions_pool": questions_pool,
+            "candidate_info": {
+                "skills": resume_data.get("skills", []),
+                "experience": resume_data.get("experience", []),
+                "education": resume_data.get("education", [])
+            }
+        }
+        questions_context = json.dumps(context, ensure_ascii=False)
+        return [
+            {"role": "system", "content": self.interviewer_prompt},
+            {"role": "user", "content": f"请根据候选人的背景信息，从问题池中选择最适合的问题:\n{questions_context}"}
+        ]
+
+    def _answer_messages(self, project_data: Dict[str, Any], question: Dict[str, str]) -> List[Dict[str, str]]:
+        """构建生成参考答案的消息"""
+        context = f"""
+                你是一位正在参加技术面试的优秀候选人。请针对以下项目经历和面试官提出的问题，给出一个自然流畅、口语化、能打动面试官的高水平回答（不要书面语）：\n\n项目名称：{project_data.get('name', '')}\n项目描述：{project_data.get('description', '')}\n使用技术：{', '.join(project_data.get('technologies', []))}\n项目职责：{', '.join(project_data.get('responsibilities', []))}\n项目成就：{', '.join(project_data.get('achievements', []))}\n\n面试问题：{question.get('question', '')}\n"""
+        system_prompt = "你是一位优秀的技术应聘者，请用自然、流畅、口语化的表达方式，回答面试官的问题，突出你的专业能力、项目贡献和沟通能力，避免书面语和模板化。答案要简洁有逻辑，能让面试官留下深刻印象。只返回答案内容，不要添加任何说明。注意：不要以“这个问题问得好”类似话术开头，因为不符合你的应聘者身份"
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": context}
+        ]
+
+    def _fast_messages(self, project_data: Dict[str, Any], resume_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """构建快速模式的消息：项目信息和候选人背景一起发送"""
+        candidate_info = json.dumps({
+            "skills": resume_data.get("skills", []),
+            "experience": resume_data.get("experience", []),
+            "education": resume_data.get("education", [])
+        }, ensure_ascii=False)
+        return [
+            {"role": "system", "content": self.fast_prompt},
+            {"role": "user", "content": f"{self._project_context(project_data)}\n候选人背景信息：\n{candidate_info}"}
+        ]
+
+    @staticmethod
+    def _parse_fast(content: str) -> Dict[str, Any]:
+        """把快速模式的响应拆分为与逐步生成相同的项目结果结构，结构不完整时抛出 ValueError"""
+        return ProjectQAGenerator._fast_result(json.loads(content.strip()))
+
+    @staticmethod
+    def _fast_result(data: Dict[str, Any]) -> Dict[str, Any]:
+        """校验并转换单个项目的 问题池+选中问题+参考答案 结构，用于快速模式和批量模式"""
+        if not isinstance(data, dict):
+            raise ValueError("项目结果不是JSON对象")
+        questions = data.get("questions") or []
+        selected = [q for q in data.get("selected_questions") or [] if q.get("question") and q.get("answer")]
+        if not questions or not selected:
+            raise ValueError("快速模式响应缺少问题池或参考答案")
+        return {
+            "questions_pool": {"project_name": data.get("project_name", ""), "questions": questions},
+            "selected_questions": {
+                "selected_questions": [{"question": q["question"], "reason": q.get("reason", "")} for q in selected]
+            },
+            "answers": [{"question": q["question"], "answer": q["answer"]} for q in selected]
+        }
+
+    def _batch_messages(self, projects: List[Dict[str, Any]], resume_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """构建批量模式的消息：全部项目和候选人背景在一次请求中发送"""
+        context = {
+            "projects": [
+                {
+                    "name": project.get("name", ""),
+                    "description": project.get("description", ""),
+                    "technologies": project.get("technologies", []),
+                    "responsibilities": project.get("responsibilities", []),
+                    "achievements": project.get("achievements", [])
+                }
+                for project in projects
+            ],
+            "candidate_info": {
+                "skills": resume_data.get("skills", []),
+                "experience": resume_data.get("experience", []),
+                "education": resume_data.get("education", [])
+            }
+        }
+        return [
+            {"role": "system", "content": self.batch_prompt},
+            {"role": "user", "content": f"请为以下每个项目准备面试问题:\n{json.dumps(context, ensure_ascii=False)}"}
+        ]
+
+    def _batch_fits(self, projects: List[Dict[str, Any]], resume_data: Dict[str, Any]) -> bool:
+        """批量请求的估算 token 数（输入加预计输出）是否在预算之内"""
+        estimated = (estimate_messages_tokens(self._batch_messages(projects, resume_data))
+                     + BATCH_OUTPUT_TOKENS_PER_PROJECT * len(projects))
+        return estimated <= self.batch_token_budget
+
+    def _use_batch(self, projects: List[Dict[str, Any]], resume_data: Dict[str, Any]) -> bool:
+        if not self.batch_mode or len(projects) < 2:
+            return False
+        if not self._batch_fits(projects, resume_data):
+            print(f"简历包含{len(projects)}个项目，超出批量请求的 token 预算，改为逐项目生成")
+            return False
+        return True
+
+    def _parse_batch(self, content: str, projects: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """
+        按项目名称拆分批量响应，返回 {项目名称: 项目结果}。
+        缺失或结构不完整的项目不包含在结果中，由调用方逐项目补齐。
+        """
+        data = json.loads(content.strip()).get("projects") or {}
+        if not isinstance(data, dict):
+            raise ValueError("批量响应的 projects 字段不是JSON对象")
+        results = {}
+        for project in projects:
+            name = project.get("name", "未知项目")
+            try:
+                result = self._fast_result(data.get(name))
+            except ValueError:
+                continue
+            result["questions_pool"]["project_name"] = name
+            results[name] = result
+        return results
+
+    def generate_batch(self, projects: List[Dict[str, Any]], resume_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        批量模式：一次调用为全部项目生成问题池、选中问题和参考答案
+
+        Returns:
+            {项目名称: 与 generate_for_project 结构相同的结果}，失败时返回空字典
+        """
+        try:
+            with llm_stage("project.batch"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._batch_messages(projects, resume_data),
+                    response_format={"type": "json_object"}
+                )
+            return self._bank_batch(projects, self._parse_batch(response.choices[0].message.content, projects))
+        except Exception as e:
+            print(f"批量生成失败: {e}")
+            note_failure("project.batch", e)
+            return {}
+
+    async def generate_batch_async(self, projects: List[Dict[str, Any]], resume_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """generate_batch 的异步版本"""
+        try:
+            with llm_stage("project.batch"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._batch_messages(projects, resume_data),
+                    response_format={"type": "json_object"}
+                )
+            return await self._bank_batch_async(projects, self._parse_batch(response.choices[0].message.content, projects))
+        except Exception as e:
+            print(f"批量生成失败: {e}")
+            note_failure("project.batch", e)
+            return {}
+
+    def _bank_project(self, project: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        """把项目的问题池连同已生成的参考答案写入题库，返回原结果"""
+        if self.question_bank is None or not result:
+            return result
+        answers = {a.get("question"): a.get("answer") for a in result.get("answers") or [] if a.get("answer")}
+        pool = [
+            {**q, "answer": answers.get(q.get("question"))} if q.get("question") in answers else q
+            for q in question_list(result.get("questions_pool"))
+        ]
+        ingest_pool(self.question_bank, PROJECT, pool, project.get("technologies"))
+        return result
+
+    async def _bank_project_async(self, project: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]:
+        """_bank_project 的异步版本，题库的 SQLite 写入在线程池中执行"""
+        if self.question_bank is None or not result:
+            return result
+        return await asyncio.to_thread(self._bank_project, project, result)
+
+    def _batch_items(self, projects: List[Dict[str, Any]], results: Dict[str, Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """按简历顺序返回批量结果中各项目的 (项目, 结果)，并登记模型选定的问题"""
+        items = []
+        for project in projects:
+            name = project.get("name", "未知项目")
+            if name in results:
+                items.append((project, self._register_selected(results[name])))
+        return items
+
+    def _bank_batch(self, projects: List[Dict[str, Any]], results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        for project, result in self._batch_items(projects, results):
+            self._bank_project(project, result)
+        return results
+
+    async def _bank_batch_async(self, projects: List[Dict[str, Any]], results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """_bank_batch 的异步版本"""
+        for project, result in self._batch_items(projects, results):
+            await self._bank_project_async(project, result)
+        return results
+
+    @staticmethod
+    def _pending_projects(projects: List[Dict[str, Any]], batched: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """批量模式未覆盖（超出预算、调用失败或响应中缺失）、需要逐项目生成的项目"""
+        return [project for project in projects if project.get("name", "未知项目") not in batched]
+
+    @staticmethod
+    def _merge_results(projects: List[Dict[str, Any]], batched: Dict[str, Dict[str, Any]],
+                       pending_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """按简历中的项目顺序合并批量结果和逐项目生成的结果（与 _pending_projects 的顺序对应）"""
+        pending_results = iter(pending_results)
+        result = {}
+        for project in projects:
+            name = project.get("name", "未知项目")
+            result[name] = batched[name] if name in batched else next(pending_results)
+        return result
+
+    @staticmethod
+    def _selected_list(selected_questions) -> List[Dict[str, str]]:
+        """兼容 selected_questions 结构"""
+        return selected_questions.get("selected_questions", []) if isinstance(selected_questions, dict) else selected_questions
+
     def generate_questions(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         根据项目数据生成面试问题
@@ -93,24 +430,13 @@ class ProjectQAGenerator:
             包含问题列表的字典
         """
         try:
-            # 构建项目上下文
-            project_context = f"""
-            项目名称：{project_data.get('name', '')}
-            项目描述：{project_data.get('description', '')}
-            使用技术：{', '.join(project_data.get('technologies', []))}
-            项目职责：{', '.join(project_data.get('responsibilities', []))}
-            项目成就：{', '.join(project_data.get('achievements', []))}
-            """
-            
             # 调用API生成问题
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": project_context}
-                ],
-                response_format={"type": "json_object"}
-            )
+            with llm_stage("project.generate"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._questions_messages(project_data),
+                    response_format={"type": "json_object"}
+                )
             
             # 解析响应
             content = response.choices[0].message.content.strip()
@@ -120,83 +446,322 @@ class ProjectQAGenerator:
             
         except Exception as e:
             print(f"生成问题失败: {e}")
+            note_failure("project.generate", e)
+            return 0
+
+    async def generate_questions_async(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        """generate_questions 的异步版本，client 需为 AsyncOpenAI 兼容客户端"""
+        try:
+            with llm_stage("project.generate"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._questions_messages(project_data),
+                    response_format={"type": "json_object"}
+                )
+            content = response.choices[0].message.content.strip()
+            return json.loads(content)
+        except Exception as e:
+            print(f"生成问题失败: {e}")
+            note_failure("project.generate", e)
             return 0
     
-    def select_questions(self, questions_pool: Dict[str, Any], resume_data: Dict[str, Any]) -> Dict[str, List[Dict[str, str]]]:
+    def _project_technologies(self, questions_pool: Dict[str, Any], resume_data: Dict[str, Any]) -> List[str]:
+        """按问题池中的项目名称找到简历中对应项目使用的技术"""
+        name = questions_pool.get("project_name") if isinstance(questions_pool, dict) else None
+        for project in resume_data.get("projects") or []:
+            if project.get("name") == name:
+                return project.get("technologies") or []
+        return []
+
+    def select_questions_local(self, questions_pool: Dict[str, Any], resume_data: Dict[str, Any]) -> Dict[str, List[Dict[str, str]]]:
+        """在本地按技能覆盖和项目技术重合度选择问题，返回结构与 select_questions 相同"""
+        skills = resume_data.get("skills") or []
+        technologies = self._project_technologies(questions_pool, resume_data)
+        chosen = choose_question(
+            self.dedup,
+            question_list(questions_pool),
+            lambda candidates: self.local_selector.select(candidates, skills, technologies)
+        )
+        if chosen is None:
+            return {"selected_questions": []}
+        return {
+            "selected_questions": [
+                {"question": chosen["question"], "reason": self.local_selector.reason(chosen, skills, technologies)}
+            ]
+        }
+
+    def _dedup_selected(self, selected_questions, questions_pool: Dict[str, Any]):
+        """模型选出的问题与本场面试已选问题近似重复时，换成问题池中不重复的问题"""
+        if self.dedup is None:
+            return selected_questions
+        candidates = question_list(questions_pool)
+        result = []
+        for q in self._selected_list(selected_questions) or []:
+            chosen = replace_duplicate(self.dedup, q, candidates)
+            if chosen is not q:
+                chosen = {"question": chosen["question"], "reason": "原选中问题与其他部分的问题近似重复，改用问题池中的下一个问题"}
+            result.append(chosen)
+        return {"selected_questions": result}
+
+    def _register_selected(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """登记快速模式和批量模式中由模型选定的问题，供其他项目和部分去重"""
+        if self.dedup is not None and result:
+            for q in self._selected_list(result.get("selected_questions")) or []:
+                if q.get("question"):
+                    self.dedup.add(q["question"])
+        return result
+
+    @staticmethod
+    def _turn(order: Optional[SelectionOrder], position: int):
+        """并发处理多个项目时按简历顺序去重选题（见 qa_engine.dedup.SelectionOrder），order 为 None 时不等待"""
+        return order.turn(position) if order is not None else nullcontext()
+
+    def _selection_order(self, pending: List[Dict[str, Any]], order_class=SelectionOrder) -> Optional[SelectionOrder]:
+        """启用去重且有多个项目并发处理时返回 SelectionOrder"""
+        if self.dedup is None or len(pending) < 2:
+            return None
+        return order_class(len(pending))
+
+    def select_questions(self, questions_pool: Dict[str, Any], resume_data: Dict[str, Any],
+                         order: Optional[SelectionOrder] = None, position: int = 0) -> Dict[str, List[Dict[str, str]]]:
         """
         从问题池中选择最适合的问题
         
         Args:
             questions_pool: 问题池，包含project_name和questions字段
             resume_data: 候选人的简历数据
+            order: 可选的 SelectionOrder，查重和登记等到排在前面的项目选题完成后再进行
+            position: 本项目在 order 中的位置
             
         Returns:
             包含选定问题的字典
         """
+        if self.selector != LLM:
+            with self._turn(order, position):
+                return self.select_questions_local(questions_pool, resume_data)
         try:
-            # 构建问题池和简历上下文
-            context = {
-                "questions_pool": questions_pool,
-                "candidate_info": {
-                    "skills": resume_data.get("skills", []),
-                    "experience": resume_data.get("experience", []),
-                    "education": resume_data.get("education", [])
-                }
-            }
-            questions_context = json.dumps(context, ensure_ascii=False)
-            
             # 调用API选择问题
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.interviewer_prompt},
-                    {"role": "user", "content": f"请根据候选人的背景信息，从问题池中选择最适合的问题:\n{questions_context}"}
-                ],
-                response_format={"type": "json_object"}
-            )
+            with llm_stage("project.select"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._select_messages(questions_pool, resume_data),
+                    response_format={"type": "json_object"}
+                )
             
             # 解析响应
             content = response.choices[0].message.content.strip()
             selected_questions = json.loads(content)
             
-            return selected_questions
-            
         except Exception as e:
             print(f"选择问题失败: {e}")
+            note_failure("project.select", e)
+            with self._turn(order, position):
+                return self.select_questions_local(questions_pool, resume_data)
+
+        # 模型调用仍然并发，只有查重替换按项目顺序进行
+        with self._turn(order, position):
+            return self._dedup_selected(selected_questions, questions_pool)
+
+    async def select_questions_async(self, questions_pool: Dict[str, Any], resume_data: Dict[str, Any],
+                                     order: Optional[AsyncSelectionOrder] = None, position: int = 0) -> Dict[str, List[Dict[str, str]]]:
+        """select_questions 的异步版本，order 为 AsyncSelectionOrder"""
+        if self.selector != LLM:
+            async with self._turn(order, position):
+                return self.select_questions_local(questions_pool, resume_data)
+        try:
+            with llm_stage("project.select"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._select_messages(questions_pool, resume_data),
+                    response_format={"type": "json_object"}
+                )
+            content = response.choices[0].message.content.strip()
+            selected_questions = json.loads(content)
+        except Exception as e:
+            print(f"选择问题失败: {e}")
+            note_failure("project.select", e)
+            async with self._turn(order, position):
+                return self.select_questions_local(questions_pool, resume_data)
+
+        async with self._turn(order, position):
+            return self._dedup_selected(selected_questions, questions_pool)
+
+    def generate_fast(self, project: Dict[str, Any], resume_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        快速模式：一次调用生成排序后的问题池、选中的问题及其参考答案
+
+        Returns:
+            与 generate_for_project 结构相同的字典，失败时返回 None
+        """
+        try:
+            with llm_stage("project.fast"):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._fast_messages(project, resume_data),
+                    response_format={"type": "json_object"}
+                )
+            return self._parse_fast(response.choices[0].message.content)
+        except Exception as e:
+            print(f"快速生成失败: {e}")
+            note_failure("project.fast", e)
+            return None
+
+    async def generate_fast_async(self, project: Dict[str, Any], resume_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """generate_fast 的异步版本"""
+        try:
+            with llm_stage("project.fast"):
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._fast_messages(project, resume_data),
+                    response_format={"type": "json_object"}
+                )
+            return self._parse_fast(response.choices[0].message.content)
+        except Exception as e:
+            print(f"快速生成失败: {e}")
+            note_failure("project.fast", e)
+            return None
+
+    def generate_for_project(self, project: Dict[str, Any], resume_data: Dict[str, Any],
+                             order: Optional[SelectionOrder] = None, position: int = 0) -> Dict[str, Any]:
+        """
+        为单个项目依次完成生成问题池、选择问题和生成参考答案
+
+        快速模式下先尝试一次调用完成全部步骤，失败时回退到逐步生成。
 
+        Args:
+            project: 单个项目数据
+            resume_data: 候选人的简历数据
+            order: 可选的 SelectionOrder，并发处理多个项目时让去重选题按简历顺序进行
+            position: 本项目在 order 中的位置
+
+        Returns:
+            包含questions_pool、selected_questions和answers字段的字典
+        """
+        try:
+            if self.fast_mode:
+                result = self.generate_fast(project, resume_data)
+                if result is not None:
+                    with self._turn(order, position):
+                        self._register_selected(result)
+                    return self._bank_project(project, result)
+            # 为项目生成问题
+            questions_pool = self.generate_questions(project)
+            # 从问题池中选择最佳问题
+            selected_questions = self.select_questions(questions_pool, resume_data, order, position)
+        finally:
+            # 出错时也让排在后面的项目继续选题
+            if order is not None:
+                order.done(position)
+        # 生成每个问题的优秀口语化参考答案
+        answers = self.generate_ans(project, self._selected_list(selected_questions))
+        return self._bank_project(project, {
+            "questions_pool": questions_pool,
+            "selected_questions": selected_questions,
+            "answers": answers
+        })
+
+    async def generate_for_project_async(self, project: Dict[str, Any], resume_data: Dict[str, Any],
+                                         order: Optional[AsyncSelectionOrder] = None, position: int = 0) -> Dict[str, Any]:
+        """generate_for_project 的异步版本，order 为 AsyncSelectionOrder"""
+        try:
+            if self.fast_mode:
+                result = await self.generate_fast_async(project, resume_data)
+                if result is not None:
+                    async with self._turn(order, position):
+                        self._register_selected(result)
+                    return await self._bank_project_async(project, result)
+            questions_pool = await self.generate_questions_async(project)
+            selected_questions = await self.select_questions_async(questions_pool, resume_data, order, position)
+        finally:
+            if order is not None:
+                order.done(position)
+        answers = await self.generate_ans_async(project, self._selected_list(selected_questions))
+        return await self._bank_project_async(project, {
+            "questions_pool": questions_pool,
+            "selected_questions": selected_questions,
+            "answers": answers
+        })
 
     def generate_for_resume(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         为简历中的所有项目生成问题并选择最佳问题
-        
+
+        每个项目的 生成-选择-回答 调用链互不依赖，max_workers 大于 1 时各项目并发执行，
+        结果仍按简历中的项目顺序返回；启用去重时选题按简历顺序进行，近似重复的问题总是由
+        排在前面的项目保留。批量模式下先用一次调用处理全部项目，
+        超出 token 预算、调用失败或响应中缺失的项目再逐项目生成。
+
         Args:
             resume_data: 简历数据，包含projects字段
             
         Returns:
             包含所有项目问题的字典
         """
-        result = {}
-        
         # 获取简历中的项目列表
         projects = resume_data.get("projects", [])
-        
-        for project in projects:
-            # 为每个项目生成问题
-            questions_pool = self.generate_questions(project)
-            # 从问题池中选择最佳问题
-            selected_questions = self.select_questions(questions_pool, resume_data)
-            # 兼容 selected_questions 结构
-            selected_q_list = selected_questions.get("selected_questions", []) if isinstance(selected_questions, dict) else selected_questions
-            # 生成每个问题的优秀口语化参考答案
-            answers = self.generate_ans(project, selected_q_list)
-            # 将结果添加到结果字典中
-            result[project.get("name", "未知项目")] = {
-                "questions_pool": questions_pool,
-                "selected_questions": selected_questions,
-                "answers": answers
-            }
-        
-        return result
+        batched = self.generate_batch(projects, resume_data) if self._use_batch(projects, resume_data) else {}
+        pending = self._pending_projects(projects, batched)
+
+        if self.max_workers > 1 and len(pending) > 1:
+            order = self._selection_order(pending)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                # map 按提交顺序返回结果，保证输出顺序与简历一致；线程池按提交顺序开始执行，
+                # 等待前一个项目选题的线程不会占住前一个项目所需的线程
+                project_results = list(executor.map(
+                    lambda item: self.generate_for_project(item[1], resume_data, order, item[0]), enumerate(pending)
+                ))
+        else:
+            project_results = [self.generate_for_project(project, resume_data) for project in pending]
+
+        return self._merge_results(projects, batched, project_results)
+
+    async def generate_for_resume_async(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        generate_for_resume 的异步版本，用信号量将同时处理的项目数限制在 max_workers 以内
+        """
+        projects = resume_data.get("projects", [])
+        batched = await self.generate_batch_async(projects, resume_data) if self._use_batch(projects, resume_data) else {}
+        pending = self._pending_projects(projects, batched)
+        semaphore = asyncio.Semaphore(self.max_workers)
+        order = self._selection_order(pending, AsyncSelectionOrder)
+
+        async def run(position, project):
+            # 各任务按创建顺序获取信号量，等待前一个项目选题的任务不会占住前一个项目所需的名额
+            async with semaphore:
+                return await self.generate_for_project_async(project, resume_data, order, position)
+
+        # gather 按传入顺序返回结果，保证输出顺序与简历一致
+        return self._merge_results(projects, batched, await asyncio.gather(*(run(i, project) for i, project in enumerate(pending))))
+
+    async def iter_for_resume_async(self, resume_data: Dict[str, Any]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        与 generate_for_resume_async 相同，但每个项目完成后立即产出 (项目名称, 项目结果)，
+        产出顺序为完成顺序，用于流式返回；去重选题仍按简历顺序进行。
+        """
+        projects = resume_data.get("projects", [])
+        batched = await self.generate_batch_async(projects, resume_data) if self._use_batch(projects, resume_data) else {}
+        for name, project_result in batched.items():
+            yield name, project_result
+        semaphore = asyncio.Semaphore(self.max_workers)
+        pending = self._pending_projects(projects, batched)
+        order = self._selection_order(pending, AsyncSelectionOrder)
+
+        async def run(position, project):
+            async with semaphore:
+                return project.get("name", "未知项目"), await self.generate_for_project_async(project, resume_data, order, position)
+
+        tasks = [asyncio.ensure_future(run(i, project)) for i, project in enumerate(pending)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 调用方提前停止迭代（如客户端断开）时取消剩余项目
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _failed_answer(q: Dict[str, str], e: Exception) -> Dict[str, Any]:
+        return {"question": q.get("question", ""), "answer": None, "error": f"生成答案失败: {e}"}
 
     def generate_ans(self, project_data: Dict[str, Any], selected_questions: List[Dict[str, str]]) -> List[Dict[str, str]]:
         """
@@ -205,30 +770,63 @@ class ProjectQAGenerator:
             project_data: 项目数据，包含name, description, technologies, responsibilities, achievements等字段
             selected_questions: 已选定的问题列表，每项包含question字段
         Returns:
-            包含每个问题及其参考答案的列表
+            包含每个问题及其参考答案的列表；生成失败的问题 answer 为 None，error 为失败原因，
+            评估时会重新生成参考答案，而不是拿错误信息当参考答案评分
         """
         answers = []
         for q in selected_questions:
             try:
-                # 构建上下文
-                context = f"""
-                你是一位正在参加技术面试的优秀候选人。请针对以下项目经历和面试官提出的问题，给出一个自然流畅、口语化、能打动面试官的高水平回答（不要书面语）：\n\n项目名称：{project_data.get('name', '')}\n项目描述：{project_data.get('description', '')}\n使用技术：{', '.join(project_data.get('technologies', []))}\n项目职责：{', '.join(project_data.get('responsibilities', []))}\n项目成就：{', '.join(project_data.get('achievements', []))}\n\n面试问题：{q.get('question', '')}\n"""
-                system_prompt = "你是一位优秀的技术应聘者，请用自然、流畅、口语化的表达方式，回答面试官的问题，突出你的专业能力、项目贡献和沟通能力，避免书面语和模板化。答案要简洁有逻辑，能让面试官留下深刻印象。只返回答案内容，不要添加任何说明。注意：不要以“这个问题问得好”类似话术开头，因为不符合你的应聘者身份"
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": context}
-                    ],
-                    response_format={"type": "text"}
-                )
+                with llm_stage("project.answer"):
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=self._answer_messages(project_data, q),
+                        response_format={"type": "text"}
+                    )
                 answer = response.choices[0].message.content.strip()
                 answers.append({"question": q.get("question", ""), "answer": answer})
             except Exception as e:
-                answers.append({"question": q.get("question", ""), "answer": f"生成答案失败: {e}"})
+                note_failure("project.answer", e)
+                answers.append(self._failed_answer(q, e))
         return answers
 
-def projects_main(resume_data: Dict[str, Any], client) -> Dict[str, Any]:
+    async def generate_ans_async(self, project_data: Dict[str, Any], selected_questions: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """generate_ans 的异步版本，各问题的参考答案并发生成"""
+        async def answer_one(q):
+            try:
+                with llm_stage("project.answer"):
+                    response = await self.client.chat.completions.create(
+                        model=self.model,
+                        messages=self._answer_messages(project_data, q),
+                        response_format={"type": "text"}
+                    )
+                return {"question": q.get("question", ""), "answer": response.choices[0].message.content.strip()}
+            except Exception as e:
+                note_failure("project.answer", e)
+                return self._failed_answer(q, e)
+
+        return list(await asyncio.gather(*(answer_one(q) for q in selected_questions)))
+
+def _collect_answers(results: Dict[str, Any]) -> Dict[str, Any]:
+    """从生成器结果中提取每个项目的选定问题和答案"""
+    # 初始化用于存储最终结果的字典
+    final_a = {} # 存储每个项目问题的答案
+
+    # 遍历生成器返回的结果，提取每个项目的选定问题和答案
+    for project_name, project_data in results.items():
+        # 检查是否存在选定的问题和答案
+        if "selected_questions" in project_data and "answers" in project_data:
+            # 提取问题和答案列表
+            final_a[project_name] = project_data["answers"]
+        else:
+            # 如果没有选定问题或答案，则设置为空列表
+            final_a[project_name] = []
+
+    return final_a
+
+
+def projects_main(resume_data: Dict[str, Any], client, max_workers: Optional[int] = None, fast_mode: Optional[bool] = None,
+                  batch_mode: Optional[bool] = None, selector: Optional[str] = None,
+                  dedup: Optional[NearDuplicateIndex] = None) -> Dict[str, Any]:
     """
     项目问题生成的主接口函数。
 
@@ -237,6 +835,12 @@ def projects_main(resume_data: Dict[str, Any], client) -> Dict[str, Any]:
 
     Args:
         resume_data: json格式的简历结构化数据，需要包含 'projects' 字段。
+        client: OpenAI 兼容客户端。
+        max_workers: 可选，并发处理项目的最大数量，默认读取环境变量 PROJECT_QA_CONCURRENCY。
+        fast_mode: 可选，是否每个项目只调用一次模型，默认读取环境变量 PROJECT_QA_FAST_MODE。
+        batch_mode: 可选，是否用一次调用处理整份简历，默认读取环境变量 PROJECT_QA_BATCH_MODE。
+        selector: 可选，问题选择策略 local / llm，默认读取环境变量 QUESTION_SELECTOR。
+        dedup: 可选，与同一场面试其他部分共享的 NearDuplicateIndex，用于跳过近似重复的问题。
 
     Returns:
         {"项目名称": 
@@ -250,25 +854,42 @@ def projects_main(resume_data: Dict[str, Any], client) -> Dict[str, Any]:
     dotenv.load_dotenv()
 
     # 初始化问题生成器实例
-    generator = ProjectQAGenerator(client)
+    generator = ProjectQAGenerator(client, max_workers=max_workers, fast_mode=fast_mode, batch_mode=batch_mode,
+                                   selector=selector, dedup=dedup)
 
     # 为简历中的所有项目生成问题、选择问题并生成答案
     results = generator.generate_for_resume(resume_data)
 
-    # 初始化用于存储最终结果的字典
-    final_a = {} # 存储每个项目问题的答案
+    # 返回包含所有项目选定问题和答案的字典
+    return _collect_answers(results)
 
-    # 遍历生成器返回的结果，提取每个项目的选定问题和答案
-    for project_name, project_data in results.items():
-        # 检查是否存在选定的问题和答案
-        if "selected_questions" in project_data and "answers" in project_data:
-            # 提取问题和答案列表
-            final_a[project_name] = project_data["answers"]
-        else:
-            # 如果没有选定问题或答案，则设置为空列表
-            final_a[project_name] = []
 
-    # 返回包含所有项目选定问题和答案的两个字典
-    return final_a
+async def projects_main_async(resume_data: Dict[str, Any], client, max_workers: Optional[int] = None, fast_mode: Optional[bool] = None,
+                              batch_mode: Optional[bool] = None, selector: Optional[str] = None,
+                              dedup: Optional[NearDuplicateIndex] = None) -> Dict[str, Any]:
+    """
+    projects_main 的异步版本，client 需为 AsyncOpenAI 兼容客户端，返回结构与 projects_main 相同。
+    """
+    dotenv.load_dotenv()
+    generator = ProjectQAGenerator(client, max_workers=max_workers, fast_mode=fast_mode, batch_mode=batch_mode,
+                                   selector=selector, dedup=dedup)
+    results = await generator.generate_for_resume_async(resume_data)
+    return _collect_answers(results)
 
 
+async def iter_projects_async(resume_data: Dict[str, Any], client, max_workers: Optional[int] = None, fast_mode: Optional[bool] = None,
+                              batch_mode: Optional[bool] = None, selector: Optional[str] = None,
+                              dedup: Optional[NearDuplicateIndex] = None) -> AsyncIterator[Tuple[str, List[Dict[str, str]]]]:
+    """
+    projects_main_async 的流式版本：每个项目的问答生成完成后立即产出 (项目名称, 问答列表)。
+    """
+    dotenv.load_dotenv()
+    generator = ProjectQAGenerator(client, max_workers=max_workers, fast_mode=fast_mode, batch_mode=batch_mode,
+                                   selector=selector, dedup=dedup)
+    project_stream = generator.iter_for_resume_async(resume_data)
+    try:
+        async for project_name, project_data in project_stream:
+            yield project_name, _collect_answers({project_name: project_data})[project_name]
+    finally:
+        # 本生成器被关闭时一并关闭内层生成器，取消其中仍在运行的项目任务
+        await project_stream.aclose()
@@ -0,0 +1,261 @@
+"""
+可复用的面试题库。
+
+生成器每次生成的问题池（项目问答、个人优势题、编程题）都按归一化后的技能 / 技术标签写入
+本地 SQLite 题库；常见技术栈（如 Python/Flask/MySQL/Redis）再次出现时，
+个人优势题和编程题可以直接从题库取出候选问题，只在未命中时调用模型生成。
+项目问答的问题针对具体项目经历，只入库不复用。
+
+存储结构：
+    questions       问题、参考答案和出处类型，按规范化问题文本去重
+    question_tags   倒排索引 (kind, tag) → question_id，WITHOUT ROWID 表即按标签排序的 B 树，
+                    查询时只读取命中标签的索引页
+连接启用 mmap（PRAGMA mmap_size），多个 worker 进程读取同一个题库文件时直接映射
+操作系统页缓存，不再各自复制到 SQLite 的页缓存中。
+
+命中规则：候选问题的标签与查询标签的 Jaccard 相似度不低于 min_match，且命中问题数
+不少于问题池大小时视为强匹配；强匹配时仍按 novelty 比例调用模型生成新问题，保持题库更新。
+
+环境变量：
+    QUESTION_BANK_ENABLED: 是否启用，默认 0
+    QUESTION_BANK_PATH: SQLite 文件路径，默认 .cache/question_bank.sqlite3
+    QUESTION_BANK_MIN_MATCH: 强匹配的标签相似度下限，默认 0.6
+    QUESTION_BANK_NOVELTY: 强匹配时仍调用模型生成新问题的比例，默认 0.2
+    QUESTION_BANK_MMAP_BYTES: SQLite mmap 大小（字节），默认 64MB，0 表示不使用 mmap
+"""
+
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .selector import question_list
+
+PROJECT = "project"
+ADVANTAGE = "advantage"
+CODE = "code"
+
+# 常见技术名称的别名，归一化到同一个标签
+_TAG_ALIASES = {
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "pg": "postgresql",
+    "js": "javascript",
+    "ts": "typescript",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "py": "python",
+    "python3": "python",
+    "sklearn": "scikit-learn",
+    "tf": "tensorflow",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "reactjs": "react",
+    "react.js": "react",
+    "mongo": "mongodb",
+    "es": "elasticsearch",
+    "springboot": "spring boot",
+}
+
+# 结尾的版本号：空格分隔（Vue 3、Java v17）或带小数点（python3.10）
+_VERSION_RE = re.compile(r"(\s+v?\d+(\.\d+)*|\s*v?\d+(\.\d+)+)(\.x)?$")
+
+
+def normalize_tag(tag: Any) -> str:
+    """统一大小写和空白，去掉结尾的版本号（如 Python 3.10），并合并常见别名"""
+    text = re.sub(r"\s+", " ", str(tag or "").strip().lower())
+    stripped = _VERSION_RE.sub("", text)
+    text = stripped or text
+    return _TAG_ALIASES.get(text, text)
+
+
+def normalize_tags(tags: Optional[Iterable[Any]]) -> List[str]:
+    """归一化并去重，保持顺序"""
+    result = []
+    for tag in tags or []:
+        if not isinstance(tag, str):
+            continue
+        tag = normalize_tag(tag)
+        if tag and tag not in result:
+            result.append(tag)
+    return result
+
+
+def _fingerprint(kind: str, question: str) -> str:
+    """按规范化问题文本去重：忽略大小写、空白和标点"""
+    text = re.sub(r"[\W_]+", "", question.lower())
+    return hashlib.sha1(f"{kind}:{text}".encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """
+    按技能 / 技术标签索引的问题库。
+
+    Args:
+        path: SQLite 文件路径
+        min_match: 强匹配的标签 Jaccard 相似度下限
+        novelty: 强匹配时仍返回 None（由调用方调用模型生成新问题）的比例
+        mmap_size: SQLite mmap 大小（字节），0 表示不使用 mmap
+        seed: novelty 抽样的随机种子，便于测试复现
+    """
+
+    def __init__(self, path: str, min_match: float = 0.6, novelty: float = 0.2,
+                 mmap_size: int = 64 * 1024 * 1024, seed: Optional[int] = None):
+        self.path = path
+        self.min_match = min_match
+        self.novelty = novelty
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                "id INTEGER PRIMARY KEY, kind TEXT NOT NULL, fingerprint TEXT NOT NULL UNIQUE, "
+                "question TEXT NOT NULL, answer TEXT, purpose TEXT, type TEXT, "
+                "tag_count INTEGER NOT NULL DEFAULT 0, served INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS question_tags ("
+                "kind TEXT NOT NULL, tag TEXT NOT NULL, question_id INTEGER NOT NULL, "
+                "PRIMARY KEY (kind, tag, question_id)) WITHOUT ROWID"
+            )
+            self._conn.commit()
+
+    def add_pool(self, kind: str, pool: Any, tags: Iterable[Any]) -> int:
+        """
+        写入一个问题池，问题已存在时只补充标签。
+
+        Returns:
+            新增的问题数
+        """
+        tags = normalize_tags(tags)
+        questions = question_list(pool)
+        if not tags or not questions:
+            return 0
+        added = 0
+        now = time.time()
+        with self._lock:
+            for q in questions:
+                fingerprint = _fingerprint(kind, q["question"])
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO questions (kind, fingerprint, question, answer, purpose, type, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (kind, fingerprint, q["question"], q.get("answer"), q.get("purpose"), q.get("type"), now)
+                )
+                added += cursor.rowcount
+                question_id = self._conn.execute(
+                    "SELECT id FROM questions WHERE fingerprint = ?", (fingerprint,)
+                ).fetchone()[0]
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO question_tags (kind, tag, question_id) VALUES (?, ?, ?)",
+                    [(kind, tag, question_id) for tag in tags]
+                )
+                self._conn.execute(
+                    "UPDATE questions SET tag_count = (SELECT COUNT(*) FROM question_tags WHERE question_id = ?) "
+                    "WHERE id = ?",
+                    (question_id, question_id)
+                )
+            self._conn.commit()
+        return added
+
+    def lookup(self, kind: str, tags: Iterable[Any], limit: int = 3, require_answer: bool = True) -> List[Dict[str, Any]]:
+        """
+        按标签相似度返回最多 limit 个问题，相似度相同时优先返回被使用次数少的问题。
+        只返回相似度不低于 min_match 的问题。
+        """
+        tags = normalize_tags(tags)
+        if not tags:
+            return []
+        placeholders = ",".join("?" * len(tags))
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT q.id, q.question, q.answer, q.purpose, q.type, q.tag_count, q.served, COUNT(*) AS hits "
+                "FROM question_tags t JOIN questions q ON q.id = t.question_id "
+                f"WHERE t.kind = ? AND t.tag IN ({placeholders}) GROUP BY q.id",
+                (kind, *tags)
+            ).fetchall()
+
+        candidates = []
+        for question_id, question, answer, purpose, question_type, tag_count, served, hits in rows:
+            if require_answer and not answer:
+                continue
+            similarity = hits / (tag_count + len(tags) - hits)
+            if similarity >= self.min_match:
+                candidates.append((-similarity, served, question_id, {
+                    "id": question_id, "question": question, "answer": answer, "purpose": purpose, "type": question_type
+                }))
+        candidates.sort(key=lambda item: item[:3])
+        return [item[3] for item in candidates[:limit]]
+
+    def serve(self, kind: str, tags: Iterable[Any], pool_size: int = 3) -> Optional[List[Dict[str, Any]]]:
+        """
+        强匹配时返回问题池并记录使用次数；未命中或按 novelty 抽中时返回 None，由调用方调用模型生成。
+        """
+        questions = self.lookup(kind, tags, limit=pool_size)
+        if len(questions) < pool_size:
+            return None
+        with self._lock:
+            if self._random.random() < self.novelty:
+                return None
+            self._conn.executemany("UPDATE questions SET served = served + 1 WHERE id = ?", [(q["id"],) for q in questions])
+            self._conn.commit()
+        return [{key: value for key, value in q.items() if key != "id" and value is not None} for q in questions]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+
+def serve_pool(bank: Optional[QuestionBank], kind: str, tags: Iterable[Any], pool_size: int = 3) -> Optional[List[Dict[str, Any]]]:
+    """生成器使用的查询入口：未启用题库、未命中或题库读取失败时返回 None"""
+    if bank is None:
+        return None
+    try:
+        return bank.serve(kind, tags, pool_size=pool_size)
+    except Exception as e:
+        print(f"题库查询失败: {e}")
+        return None
+
+
+def ingest_pool(bank: Optional[QuestionBank], kind: str, pool: Any, tags: Iterable[Any]) -> None:
+    """生成器使用的写入入口：题库写入失败不影响本次生成结果"""
+    if bank is None:
+        return
+    try:
+        bank.add_pool(kind, pool, tags)
+    except Exception as e:
+        print(f"题库写入失败: {e}")
+
+
+_default_bank = None
+_default_bank_lock = threading.Lock()
+
+
+def question_bank_enabled() -> bool:
+    return os.getenv("QUESTION_BANK_ENABLED", "0").lower() in ("1", "true", "yes")
+
+
+def default_question_bank() -> Optional[QuestionBank]:
+    """返回进程内共享的 QuestionBank，配置读取自环境变量；未启用时返回 None"""
+    global _default_bank
+    if not question_bank_enabled():
+        return None
+    with _default_bank_lock:
+        if _default_bank is None:
+            _default_bank = QuestionBank(
+                os.getenv("QUESTION_BANK_PATH", os.path.join(".cache", "question_bank.sqlite3")),
+                min_match=float(os.getenv("QUESTION_BANK_MIN_MATCH", 0.6)),
+                novelty=float(os.getenv("QUESTION_BANK_NOVELTY", 0.2)),
+                mmap_size=int(os.getenv("QUESTION_BANK_MMAP_BYTES", 64 * 1024 * 1024))
+            )
+        return _default_bank
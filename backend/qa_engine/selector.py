@@ -0,0 +1,162 @@
+"""
+本地问题选择。
+
+项目问答、个人优势题和编程题都是先由模型生成约 3 个候选问题，再从中选 1 个。
+LocalSelector 在本地完成这一步，不再调用模型：
+    技能覆盖：候选问题（含提问目的和参考答案）提到了多少候选人简历中的技能
+    技术重合：与当前项目使用技术的重合程度
+    多样性：选择多个问题时按 MMR（最大边际相关）惩罚与已选问题相似的候选
+得分相同时保持问题池原有顺序（快速模式下模型已按适合程度排序），结果确定、可复现。
+
+各生成器通过 selector 参数或环境变量 QUESTION_SELECTOR 选择策略：
+    local（默认）: 使用 LocalSelector
+    llm: 沿用模型选择，模型输出无法解析时回退到 LocalSelector
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+LOCAL = "local"
+LLM = "llm"
+
+# 英文/数字技术词（如 redis、k8s、c++、node.js）和连续的中文片段
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_CJK_RE = re.compile(r"[一-鿿]+")
+
+
+def resolve_selector(selector: Optional[str] = None) -> str:
+    """返回选择策略，未指定时读取环境变量 QUESTION_SELECTOR（默认 local）"""
+    if selector is None:
+        selector = os.getenv("QUESTION_SELECTOR", LOCAL)
+    selector = selector.strip().lower()
+    if selector not in (LOCAL, LLM):
+        print(f"未知的问题选择策略 {selector}，使用 {LOCAL}")
+        return LOCAL
+    return selector
+
+
+def _terms(text: str) -> set:
+    """分词：英文按单词，中文按二元组，用于计算候选问题之间的相似度"""
+    text = text.lower()
+    terms = {word.rstrip(".") for word in _WORD_RE.findall(text)}
+    for run in _CJK_RE.findall(text):
+        terms.update(run[i:i + 2] for i in range(max(1, len(run) - 1)))
+    return terms
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _clean(values: Optional[Iterable[Any]]) -> List[str]:
+    """去掉空值和重复项，保持顺序"""
+    seen = {}
+    for value in values or []:
+        if isinstance(value, str) and value.strip():
+            seen.setdefault(value.strip().lower(), value.strip())
+    return list(seen.values())
+
+
+def candidate_text(candidate: Dict[str, Any]) -> str:
+    """候选问题中参与打分的文本：问题、提问目的和参考答案"""
+    return " ".join(str(candidate.get(key) or "") for key in ("question", "purpose", "answer"))
+
+
+def question_list(pool: Any) -> List[Dict[str, Any]]:
+    """
+    兼容模型返回的几种问题池结构：问题列表、{"questions": [...]}，
+    或 json_object 模式下以任意键包裹的列表。只保留包含 question 字段的条目。
+    """
+    if isinstance(pool, dict):
+        if isinstance(pool.get("questions"), list):
+            pool = pool["questions"]
+        else:
+            pool = next((value for value in pool.values() if isinstance(value, list)), [])
+    if not isinstance(pool, list):
+        return []
+    return [q for q in pool if isinstance(q, dict) and q.get("question")]
+
+
+class LocalSelector:
+    """
+    按技能覆盖、技术重合和多样性为候选问题打分。
+
+    Args:
+        skill_weight: 技能覆盖率的权重
+        technology_weight: 项目技术重合率的权重
+        diversity: MMR 中与已选问题相似度的惩罚系数
+    """
+
+    def __init__(self, skill_weight: float = 0.6, technology_weight: float = 0.4, diversity: float = 0.5):
+        self.skill_weight = skill_weight
+        self.technology_weight = technology_weight
+        self.diversity = diversity
+
+    @staticmethod
+    def _coverage(text: str, keywords: List[str]) -> List[str]:
+        """返回在文本中出现的关键词"""
+        return [keyword for keyword in keywords if keyword.lower() in text]
+
+    def score(self, candidate: Dict[str, Any], skills: Sequence[str] = (), technologies: Sequence[str] = ()) -> float:
+        """候选问题与候选人背景的相关度，取值 0~1"""
+        text = candidate_text(candidate).lower()
+        skills, technologies = _clean(skills), _clean(technologies)
+        score = 0.0
+        if skills:
+            score += self.skill_weight * len(self._coverage(text, skills)) / len(skills)
+        if technologies:
+            score += self.technology_weight * len(self._coverage(text, technologies)) / len(technologies)
+        return score
+
+    def rank(self, candidates: List[Dict[str, Any]], skills: Sequence[str] = (), technologies: Sequence[str] = (),
+             k: int = 1, selected: Sequence[Dict[str, Any]] = ()) -> List[Dict[str, Any]]:
+        """
+        按 MMR 依次选出 k 个问题。
+
+        Args:
+            candidates: 候选问题
+            skills: 候选人技能
+            technologies: 当前项目使用的技术
+            k: 选择的问题数
+            selected: 已经选过的问题（例如同一场面试中其他部分的问题），用于多样性惩罚
+        """
+        relevance = [self.score(c, skills, technologies) for c in candidates]
+        terms = [_terms(candidate_text(c)) for c in candidates]
+        chosen_terms = [_terms(candidate_text(c)) for c in selected]
+        remaining = list(range(len(candidates)))
+        ranked = []
+        while remaining and len(ranked) < k:
+            def mmr(i):
+                redundancy = max((_jaccard(terms[i], other) for other in chosen_terms), default=0.0)
+                return relevance[i] - self.diversity * redundancy
+
+            # max 在得分相同时返回第一个，即保持问题池原有顺序
+            best = max(remaining, key=mmr)
+            ranked.append(candidates[best])
+            chosen_terms.append(terms[best])
+            remaining.remove(best)
+        return ranked
+
+    def select(self, candidates: List[Dict[str, Any]], skills: Sequence[str] = (), technologies: Sequence[str] = (),
+               selected: Sequence[Dict[str, Any]] = ()) -> Optional[Dict[str, Any]]:
+        """选出最合适的 1 个问题，候选为空时返回 None"""
+        ranked = self.rank(candidates, skills, technologies, k=1, selected=selected)
+        return ranked[0] if ranked else None
+
+    def reason(self, candidate: Dict[str, Any], skills: Sequence[str] = (), technologies: Sequence[str] = ()) -> str:
+        """生成选择理由，与模型选择时返回的 reason 字段对应"""
+        text = candidate_text(candidate).lower()
+        parts = []
+        covered = self._coverage(text, _clean(skills))
+        if covered:
+            parts.append(f"覆盖候选人技能：{'、'.join(covered)}")
+        overlap = self._coverage(text, _clean(technologies))
+        if overlap:
+            parts.append(f"涉及项目技术：{'、'.join(overlap)}")
+        return "；".join(parts) or "问题池中排序最靠前的问题"
+
+
+default_selector = LocalSelector()
@@ -1,4 +1,3 @@
-import io
 import json
 import logging
 import sys
@@ -32,24 +31,20 @@ def direct_test():
     """直接测试Flask应用是否正常工作"""
     return jsonify({"message": "Flask应用正常工作", "status": "success"}), 200
 
+def _upload_stream(upload):
+    """上传文件的底层流（werkzeug 已缓存在内存或临时文件中），解析器直接读取，不再复制一份"""
+    stream = getattr(upload, "stream", upload)
+    stream.seek(0)
+    return stream
+
 def extract_text_from_pdf(pdf_file):
     try:
         logger.info("Starting PDF text extraction")
-        file_content = pdf_file.read()
-        pdf_file_obj = io.BytesIO(file_content)
-
-        try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file_obj)
-            text = ""
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
-            if not text.strip():
-                raise ValueError("No text could be extracted from the PDF")
-            return text
-        finally:
-            pdf_file_obj.close()
+        pdf_reader = PyPDF2.PdfReader(_upload_stream(pdf_file))
+        text = "".join(page.extract_text() or "" for page in pdf_reader.pages)
+        if not text.strip():
+            raise ValueError("No text could be extracted from the PDF")
+        return text
     except Exception as e:
         logger.error(f"PDF extraction error: {str(e)}", exc_info=True)
         raise
@@ -57,17 +52,11 @@ def extract_text_from_pdf(pdf_file):
 def extract_text_from_docx(docx_file):
     try:
         logger.info("Starting DOCX text extraction")
-        file_content = docx_file.read()
-        docx_file_obj = io.BytesIO(file_content)
-
-        try:
-            doc = docx.Document(docx_file_obj)
-            text = "\n".join([p.text for p in doc.paragraphs])
-            if not text.strip():
-                raise ValueError("No text could be extracted from the DOCX file")
-            return text
-        finally:
-            docx_file_obj.close()
+        doc = docx.Document(_upload_stream(docx_file))
+        text = "\n".join([p.text for p in doc.paragraphs])
+        if not text.strip():
+            raise ValueError("No text could be extracted from the DOCX file")
+        return text
     except Exception as e:
         logger.error(f"DOCX extraction error: {str(e)}", exc_info=True)
         raise
@@ -0,0 +1,19 @@
+import json
+
+from benchmarks.common import percentiles, synthetic_resume_text
+from llm.fake import FakeConfig, FakeLLM, FakeOpenAI
+from parser.extractor import _extraction_messages
+
+
+def test_percentiles_use_nearest_rank():
+    stats = percentiles([float(i) for i in range(1, 101)])
+    assert (stats["p50"], stats["p95"], stats["p99"], stats["max"]) == (50.0, 95.0, 99.0, 100.0)
+    assert percentiles([])["p50"] is None
+
+
+def test_synthetic_resume_project_count_survives_fake_extraction():
+    client = FakeOpenAI(FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0)))
+    for num_projects in (1, 10):
+        text = synthetic_resume_text(num_projects, seed=num_projects)
+        response = client.chat.completions.create(model="deepseek-chat", messages=_extraction_messages(text))
+        assert len(json.loads(response.choices[0].message.content)["projects"]) == num_projects
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from llm.fake import FakeConfig, FakeLLM, FakeOpenAI
+from qa_engine.advantages import AdvantageQAGenerator
+from qa_engine.dedup import NearDuplicateIndex, interview_index, replace_duplicate
+from qa_engine.projects import ProjectQAGenerator
+
+RESUME = {
+    "skills": ["Python", "Redis"],
+    "advantages": ["沟通能力强"],
+    "projects": [
+        {"name": "订单系统", "description": "电商订单服务", "technologies": ["Kafka"]},
+        {"name": "推荐系统", "description": "商品推荐服务", "technologies": ["Kafka"]},
+    ],
+}
+
+
+def test_project_names_are_masked_before_comparison():
+    index = NearDuplicateIndex(threshold=0.6, mask_terms=["订单系统", "推荐系统"])
+    index.add("请介绍一下订单系统的技术架构。")
+    assert index.duplicate_of("请介绍一下推荐系统的技术架构？") == "请介绍一下订单系统的技术架构。"
+    assert index.duplicate_of("推荐系统中遇到的最大难点是什么？") is None
+
+    # 不做屏蔽时项目名称本身拉低了相似度
+    assert NearDuplicateIndex(threshold=0.9).duplicate_of("请介绍一下推荐系统的技术架构？") is None
+
+
+def test_choose_skips_duplicates_and_falls_back_when_all_are_duplicates():
+    index = NearDuplicateIndex(threshold=0.6)
+    index.add("说说 Redis 的持久化机制")
+    candidates = [{"question": "说说Redis的持久化机制。"}, {"question": "如何设计一个限流器"}]
+    assert index.choose(candidates)["question"] == "如何设计一个限流器"
+    assert index.duplicates_skipped == 1
+
+    # 全部重复时仍返回一个问题
+    assert index.choose(candidates[:1])["question"] == "说说Redis的持久化机制。"
+    # 模型选中的问题重复时按问题池顺序替换
+    chosen = replace_duplicate(index, {"question": "如何设计一个限流器？"}, [{"question": "讲讲 Kafka 的消费者组"}])
+    assert chosen["question"] == "讲讲 Kafka 的消费者组"
+    assert len(index) == 4
+
+
+def test_projects_share_the_interview_index(monkeypatch):
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    dedup = interview_index(RESUME)
+    results = ProjectQAGenerator(FakeOpenAI(llm), dedup=dedup).generate_for_resume(RESUME)
+    questions = [results[name]["answers"][0]["question"] for name in ("订单系统", "推荐系统")]
+    assert questions[0].replace("订单系统", "") != questions[1].replace("推荐系统", "")
+    assert dedup.duplicates_skipped >= 1
+
+    AdvantageQAGenerator(FakeOpenAI(llm), dedup=dedup).generate(RESUME)
+    assert len(dedup) == 3
+
+    monkeypatch.setenv("QUESTION_DEDUP_ENABLED", "0")
+    assert interview_index(RESUME) is None
+
+
+SHARED = "项目中 Redis 缓存是如何设计的？"
+
+
+class OverlappingPoolClient:
+    """两个项目的问题池都以同一个问题开头；slow 中的项目生成问题池较慢，先完成的是排在后面的项目"""
+
+    def __init__(self, slow, is_async=False):
+        self.slow = slow
+        create = self.create_async if is_async else self.create
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    def _content(self, messages):
+        user = messages[-1]["content"]
+        if "项目名称：" not in user or "面试问题" in user:
+            return 0, "参考答案"
+        name = user.split("项目名称：", 1)[1].split("\n", 1)[0]
+        pool = {"project_name": name, "questions": [{"question": SHARED}, {"question": f"{name}的业务难点是什么？"}]}
+        return (0.1 if name in self.slow else 0), json.dumps(pool, ensure_ascii=False)
+
+    @staticmethod
+    def _response(content):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def create(self, model, messages, **kwargs):
+        delay, content = self._content(messages)
+        time.sleep(delay)
+        return self._response(content)
+
+    async def create_async(self, model, messages, **kwargs):
+        delay, content = self._content(messages)
+        await asyncio.sleep(delay)
+        return self._response(content)
+
+
+def _selected(results):
+    return {name: result["answers"][0]["question"] for name, result in results.items()}
+
+
+def test_concurrent_projects_dedup_in_resume_order():
+    expected = {"订单系统": SHARED, "推荐系统": "推荐系统的业务难点是什么？"}
+    for slow in (["订单系统"], ["推荐系统"]):
+        generator = ProjectQAGenerator(OverlappingPoolClient(slow), max_workers=2, dedup=interview_index(RESUME))
+        assert _selected(generator.generate_for_resume(RESUME)) == expected
+
+        generator = ProjectQAGenerator(OverlappingPoolClient(slow, is_async=True), max_workers=2, dedup=interview_index(RESUME))
+        assert _selected(asyncio.run(generator.generate_for_resume_async(RESUME))) == expected
+
+        async def stream():
+            return {name: result async for name, result in generator.iter_for_resume_async(RESUME)}
+
+        generator = ProjectQAGenerator(OverlappingPoolClient(slow, is_async=True), max_workers=2, dedup=interview_index(RESUME))
+        assert _selected(asyncio.run(stream())) == expected
@@ -0,0 +1,45 @@
+import io
+import zipfile
+
+from benchmarks.common import synthetic_resume_docx
+from parser.docx_text import extract_docx_text
+
+W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+MC = 'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+
+
+def _docx(body: str) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document {W} {MC}><w:body>{body}</w:body></w:document>')
+    return buffer.getvalue()
+
+
+def test_matches_python_docx_on_paragraph_resumes():
+    for path in ("test/data/test.docx", "test/data/test_problematic_resume.docx"):
+        with open(path, "rb") as f:
+            raw = f.read()
+        assert extract_docx_text(raw, streaming=True) == extract_docx_text(raw, streaming=False)
+
+
+def test_table_layout_is_kept_in_document_order():
+    raw = synthetic_resume_docx(2, seed=1, table_layout=True)
+    assert extract_docx_text(raw, streaming=False) == ""
+    lines = extract_docx_text(raw, streaming=True).splitlines()
+    assert lines[2].startswith("技能\t")
+    assert [line.split("\t")[0] for line in lines if line.endswith("系统1") or line.endswith("系统2")] == ["项目", "项目"]
+
+
+def test_text_boxes_tabs_and_fallback_content():
+    raw = _docx(
+        '<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/></w:tabs></w:pPr>'
+        '<w:r><w:t>姓名</w:t><w:tab/><w:t>张三</w:t></w:r>'
+        '<w:r><mc:AlternateContent><mc:Choice><w:drawing><w:txbxContent>'
+        '<w:p><w:r><w:t>求职意向：后端</w:t></w:r></w:p>'
+        '</w:txbxContent></w:drawing></mc:Choice>'
+        '<mc:Fallback><w:pict><w:txbxContent><w:p><w:r><w:t>求职意向：后端</w:t></w:r></w:p></w:txbxContent></w:pict></mc:Fallback>'
+        '</mc:AlternateContent></w:r></w:p>'
+        '<w:tbl><w:tr><w:tc><w:p><w:r><w:t>技能</w:t></w:r></w:p></w:tc>'
+        '<w:tc><w:p><w:r><w:t>Python</w:t></w:r></w:p><w:p><w:r><w:t>Redis</w:t></w:r></w:p></w:tc></w:tr></w:tbl>'
+    )
+    assert extract_docx_text(raw, streaming=True) == "求职意向：后端\n姓名\t张三\n技能\tPython Redis"
@@ -0,0 +1,116 @@
+import asyncio
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from evaluate.report import evaluation, evaluation_async
+
+GRADES = {
+    key: {"评分": "C", "理由": "缺乏技术细节"}
+    for key in ["技术深度", "表达能力", "项目理解", "问题解决能力", "总评"]
+}
+
+
+def _reply(messages):
+    if "评分" in messages[0]["content"]:
+        return json.dumps(GRADES, ensure_ascii=False)
+    return "参考答案：" + messages[-1]["content"].split("\n", 1)[0]
+
+
+class GradingStubClient:
+    """随机延迟的评分桩客户端，模拟并发时乱序返回"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(random.uniform(0, 0.03))
+        with self._lock:
+            self.active -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=_reply(messages)))])
+
+
+class AsyncGradingStubClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        await asyncio.sleep(random.uniform(0, 0.03))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=_reply(messages)))])
+
+
+PROJECTS = {
+    "项目A": [{"question": f"A{i}", "answer": "回答"} for i in range(3)],
+    "项目B": [{"question": f"B{i}", "answer": "回答"} for i in range(3)],
+}
+ADVANTAGES = {"question": "优势", "answer": "回答"}
+CODE = ("编程", "回答")
+
+
+def test_parallel_report_matches_sequential_report():
+    sequential = evaluation(GradingStubClient(), PROJECTS, ADVANTAGES, CODE, {}, max_workers=1)
+    client = GradingStubClient()
+    parallel = evaluation(client, PROJECTS, ADVANTAGES, CODE, {}, max_workers=4)
+    assert parallel == sequential
+    assert client.peak > 1
+    assert [qa["question"] for qa in parallel["project_qa"]] == ["A0", "A1", "A2", "B0", "B1", "B2"]
+    # 相同的改进建议只在第一道题保留理由
+    assert parallel["project_qa"][0]["evaluation"]["总评"]["理由"] == "缺乏技术细节"
+    assert all(qa["evaluation"]["总评"]["理由"] == "" for qa in parallel["project_qa"][1:])
+    assert parallel["advantages"]["evaluation"]["总评"]["理由"] == ""
+    assert parallel["code"]["evaluation"]["总评"]["理由"] == "缺乏技术细节"
+
+
+def test_async_report_matches_sequential_report():
+    sequential = evaluation(GradingStubClient(), PROJECTS, ADVANTAGES, CODE, {}, max_workers=1)
+    parallel = asyncio.run(evaluation_async(AsyncGradingStubClient(), PROJECTS, ADVANTAGES, CODE, {}, max_workers=4))
+    assert parallel == sequential
+
+
+def test_single_pass_grades_each_answer_in_one_call():
+    from llm.fake import FakeConfig, FakeLLM, FakeOpenAI
+
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    report = evaluation(FakeOpenAI(llm), PROJECTS, ADVANTAGES, CODE, {}, single_pass=True)
+    assert [qa["question"] for qa in report["project_qa"]] == ["A0", "A1", "A2", "B0", "B1", "B2"]
+    assert report["code"]["reference_answer"]
+    assert report["code"]["evaluation"]["总评"]["评分"] == "B"
+    assert {family: counts["calls"] for family, counts in llm.stats()["by_family"].items()} == {"eval.combined": 8}
+
+
+class ScriptedClient:
+    """单次评估返回给定内容，其余请求按 _reply 返回"""
+
+    def __init__(self, combined_content):
+        self.combined_content = combined_content
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        content = self.combined_content if "参考答案为基准" in messages[0]["content"] else _reply(messages)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_single_pass_keeps_validation_and_fallbacks():
+    # 评分不合法：保留参考答案，评分使用默认结果
+    invalid = json.dumps({"参考答案": "标准答案", "评估": {"总评": {"评分": "E", "理由": "x"}}}, ensure_ascii=False)
+    client = ScriptedClient(invalid)
+    report = evaluation(client, {}, None, CODE, {}, single_pass=True)
+    assert report["code"]["reference_answer"] == "标准答案"
+    assert report["code"]["evaluation"]["总评"]["理由"] == "评估解析失败，返回默认评分"
+    assert client.calls == 1
+
+    # 整体无法解析：回退到参考答案、评分两次调用
+    client = ScriptedClient("不是JSON")
+    report = evaluation(client, {}, None, CODE, {}, single_pass=True)
+    assert report == evaluation(GradingStubClient(), {}, None, CODE, {})
+    assert client.calls == 3
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+import openai
+import pytest
+
+from evaluate.report import InterviewManager, evaluation_async
+from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM, FakeOpenAI
+from llm.stage import llm_stage
+from parser.extractor import _extraction_messages
+from qa_engine.projects import projects_main
+
+
+def _instant(**overrides):
+    return FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0, seed=0, **overrides))
+
+
+def test_extraction_returns_one_project_per_project_line():
+    client = FakeOpenAI(_instant())
+    text = "技能：Python, Redis\n项目：订单系统\n项目：推荐引擎\n"
+    response = client.chat.completions.create(model="deepseek-chat", messages=_extraction_messages(text))
+    resume = json.loads(response.choices[0].message.content)
+    assert [p["name"] for p in resume["projects"]] == ["订单系统", "推荐引擎"]
+    assert resume["skills"] == ["Python", "Redis"]
+    assert response.usage.total_tokens > 0
+
+
+def test_pipeline_outputs_parse_with_the_real_generators():
+    llm = _instant()
+    resume = {"projects": [{"name": "订单系统"}, {"name": "推荐引擎"}], "skills": ["Python"]}
+    answers = projects_main(resume, FakeOpenAI(llm))
+    assert set(answers) == {"订单系统", "推荐引擎"}
+    assert all(qa[0]["question"] and qa[0]["answer"] for qa in answers.values())
+
+    report = asyncio.run(evaluation_async(
+        AsyncFakeOpenAI(llm), {"订单系统": [{"question": "q", "answer": "a"}]}, None, None, {}
+    ))
+    assert report["project_qa"][0]["evaluation"]["总评"]["理由"] != "评估解析失败，返回默认评分"
+    assert llm.stats()["by_family"]["project.generate"]["calls"] == 2
+
+
+def test_grading_output_passes_validation():
+    client = FakeOpenAI(_instant())
+    manager = InterviewManager(client)
+    with llm_stage("eval.grade"):
+        response = client.chat.completions.create(model="deepseek-chat", messages=manager._grading_messages("a", "b"))
+    manager._parse_evaluation(response.choices[0].message.content)
+
+
+def test_injected_errors_raise_sdk_exceptions():
+    client = FakeOpenAI(_instant(rate_limit_rate=1.0))
+    with pytest.raises(openai.RateLimitError):
+        client.chat.completions.create(model="deepseek-chat", messages=[{"role": "user", "content": "你好"}])
+
+    client = FakeOpenAI(_instant(error_rate=1.0))
+    with pytest.raises(openai.InternalServerError):
+        client.chat.completions.create(model="deepseek-chat", messages=[{"role": "user", "content": "你好"}])
+
+
+def test_streaming_chunks_reassemble_the_content():
+    client = FakeOpenAI(_instant())
+    with llm_stage("session.turn"):
+        stream = client.chat.completions.create(
+            model="deepseek-chat", messages=[{"role": "user", "content": "你好"}], stream=True
+        )
+    content = "".join(chunk.choices[0].delta.content or "" for chunk in stream)
+    assert content.endswith("？")
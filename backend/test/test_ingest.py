@@ -0,0 +1,50 @@
+import asyncio
+import io
+
+import pytest
+
+from parser.extractor import parse_file_bytes, read_source_bytes, resume_digest, source_digest
+from parser.ingest import UploadTooLarge, read_upload, save_upload_in_background
+
+
+class ChunkedUpload:
+    """模拟 FastAPI UploadFile：异步按块读取"""
+
+    def __init__(self, filename, content):
+        self.filename = filename
+        self._stream = io.BytesIO(content)
+
+    async def read(self, size=-1):
+        return self._stream.read(size)
+
+
+CONTENT = "张三\n技能：Python、Redis\n".encode("utf-8") * 100
+
+
+def test_upload_is_hashed_while_reading_and_parsed_without_copies():
+    upload = asyncio.run(read_upload(ChunkedUpload("resume.TXT", CONTENT), chunk_size=64))
+    assert upload.size == len(CONTENT) and upload.ext == ".txt"
+    assert upload.digest == resume_digest(CONTENT, ".txt")
+
+    raw, ext = read_source_bytes(upload)
+    assert raw is upload.content and ext == ".txt"
+    assert source_digest(upload, raw, ext) == upload.digest
+    assert parse_file_bytes(raw, ext).startswith("张三")
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(read_upload(ChunkedUpload("resume.txt", CONTENT), chunk_size=64, max_bytes=100))
+
+
+def test_disk_copy_is_optional_and_stays_in_directory(tmp_path, monkeypatch):
+    async def run(directory):
+        upload = await read_upload(ChunkedUpload("../../resume.txt", CONTENT))
+        task = save_upload_in_background(upload, directory)
+        if task:
+            await task
+        return task
+
+    monkeypatch.delenv("UPLOAD_SAVE_DIR", raising=False)
+    assert asyncio.run(run(None)) is None
+
+    asyncio.run(run(str(tmp_path / "uploads")))
+    assert (tmp_path / "uploads" / "resume.txt").read_bytes() == CONTENT
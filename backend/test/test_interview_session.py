@@ -0,0 +1,22 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from qa_engine.item import InterviewSession
+
+
+def test_pending_answer_is_recorded_once_under_concurrent_requests():
+    session = InterviewSession({"name": "订单系统"})
+    future = Future()
+    session._pending_answer = future
+
+    threads = [threading.Thread(target=session._collect_pending_answer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    future.set_result("参考答案")
+    for thread in threads:
+        thread.join()
+
+    assert session.candidate_answers == ["参考答案"]
+    assert session.get_candidate_answer() == "参考答案"
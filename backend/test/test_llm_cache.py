@@ -0,0 +1,137 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from openai.types.chat import ChatCompletion
+
+from llm.cache import DEFAULT_SKIP_STAGES, AsyncCachedClient, CachedClient, LLMCache, SQLiteStore
+from llm.metrics import note_failure
+from llm.stage import llm_stage
+
+
+def _completion(content, finish_reason="stop"):
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "deepseek-chat",
+        "choices": [{"index": 0, "finish_reason": finish_reason, "message": {"role": "assistant", "content": content}}],
+    })
+
+
+class CountingClient:
+    def __init__(self, replies=None):
+        self.calls = 0
+        self.replies = replies
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.replies:
+            return self.replies.pop(0)
+        return _completion(f"回答{self.calls}")
+
+
+def _request(**overrides):
+    request = {"model": "deepseek-chat", "messages": [{"role": "user", "content": "你好"}]}
+    request.update(overrides)
+    return request
+
+
+def test_identical_requests_hit_the_cache(tmp_path):
+    raw = CountingClient()
+    client = CachedClient(raw, LLMCache(SQLiteStore(str(tmp_path / "cache.sqlite3"))))
+    first = client.chat.completions.create(**_request())
+    second = client.chat.completions.create(**_request())
+    client.chat.completions.create(**_request(temperature=0.3))
+    assert raw.calls == 2
+    assert second.choices[0].message.content == first.choices[0].message.content
+    stats = client.cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    CachedClient(CountingClient(), LLMCache(SQLiteStore(path))).chat.completions.create(**_request())
+    raw = CountingClient()
+    CachedClient(raw, LLMCache(SQLiteStore(path))).chat.completions.create(**_request())
+    assert raw.calls == 0
+
+
+def test_skipped_stage_and_streaming_bypass_cache(tmp_path):
+    raw = CountingClient()
+    client = CachedClient(raw, LLMCache(SQLiteStore(str(tmp_path / "cache.sqlite3")), skip_stages=["code.generate"]))
+    for _ in range(2):
+        with llm_stage("code.generate"):
+            client.chat.completions.create(**_request())
+        client.chat.completions.create(**_request(stream=True))
+    assert raw.calls == 4
+    assert client.cache.stats()["by_stage"]["code.generate"]["skipped"] == 2
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    store = SQLiteStore(str(tmp_path / "cache.sqlite3"), ttl=0.05, max_entries=2)
+    store.set("a", "1")
+    store.set("b", "2")
+    store.get("a")
+    store.set("c", "3")
+    assert store.get("b") is None
+    assert store.get("a") == "1"
+    time.sleep(0.06)
+    assert store.get("a") is None
+
+
+def test_async_client_shares_cache(tmp_path):
+    cache = LLMCache(SQLiteStore(str(tmp_path / "cache.sqlite3")))
+    CachedClient(CountingClient(), cache).chat.completions.create(**_request())
+
+    async def never_called(**kwargs):
+        raise AssertionError("应当命中缓存")
+
+    client = AsyncCachedClient(SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=never_called))), cache)
+    response = asyncio.run(client.chat.completions.create(**_request()))
+    assert response.choices[0].message.content == "回答1"
+
+
+def test_randomized_stages_are_skipped_by_default(tmp_path):
+    raw = CountingClient()
+    cache = LLMCache(SQLiteStore(str(tmp_path / "cache.sqlite3")), skip_stages=DEFAULT_SKIP_STAGES.split(","))
+    client = CachedClient(raw, cache)
+    for stage in ("code.generate", "session.turn", "session.evaluate", "extract", "extract"):
+        with llm_stage(stage):
+            client.chat.completions.create(**_request())
+    assert raw.calls == 4
+    assert cache.stats()["skipped"] == 3
+
+
+def test_truncated_and_empty_responses_are_not_cached(tmp_path):
+    raw = CountingClient([_completion("{\"a\": ", finish_reason="length"), _completion("")])
+    client = CachedClient(raw, LLMCache(SQLiteStore(str(tmp_path / "cache.sqlite3"))))
+    for _ in range(3):
+        client.chat.completions.create(**_request())
+    assert raw.calls == 3
+    assert client.cache.stats()["size"] == 1
+
+
+def _extract(client):
+    with llm_stage("extract"):
+        response = client.chat.completions.create(**_request())
+    try:
+        return json.loads(response.choices[0].message.content)
+    except ValueError as e:
+        note_failure("extract", e)
+        return None
+
+
+def test_parse_failure_is_not_replayed(tmp_path):
+    raw = CountingClient([_completion("不是 JSON"), _completion('{"name": "张三"}')])
+    client = CachedClient(raw, LLMCache(SQLiteStore(str(tmp_path / "cache.sqlite3"))))
+    assert _extract(client) is None
+    assert _extract(client) == {"name": "张三"}
+    assert _extract(client) == {"name": "张三"}
+    assert raw.calls == 2
+
+    # 其他阶段的解析失败不影响本次请求的缓存条目
+    note_failure("project.answer", ValueError("bad"))
+    assert client.cache.stats()["size"] == 1
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM, FakeOpenAI
+from llm.metrics import AsyncMetricsClient, Metrics, MetricsClient
+from llm.stage import llm_stage
+
+
+def _fake_llm(**overrides):
+    return FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0, seed=0, **overrides))
+
+
+def test_calls_are_recorded_by_stage_with_token_usage():
+    registry = Metrics()
+    client = MetricsClient(FakeOpenAI(_fake_llm()), registry)
+    with llm_stage("eval.grade"):
+        response = client.chat.completions.create(model="deepseek-chat", messages=[{"role": "user", "content": "你好"}])
+
+    assert registry.value("llm_requests_total", stage="eval.grade", outcome="ok") == 1
+    assert registry.value("llm_tokens_total", stage="eval.grade", type="completion") == response.usage.completion_tokens
+
+    text = registry.render()
+    assert 'llm_request_duration_seconds_bucket{stage="eval.grade",le="+Inf"} 1' in text
+    assert 'llm_request_duration_seconds_count{stage="eval.grade"} 1' in text
+    assert "# TYPE llm_tokens_total counter" in text
+
+
+def test_failed_async_calls_are_counted_as_errors():
+    registry = Metrics()
+    client = AsyncMetricsClient(AsyncFakeOpenAI(_fake_llm(error_rate=1.0)), registry)
+
+    async def call():
+        with llm_stage("project.select"):
+            await client.chat.completions.create(model="deepseek-chat", messages=[{"role": "user", "content": "你好"}])
+
+    with pytest.raises(Exception):
+        asyncio.run(call())
+    assert registry.value("llm_requests_total", stage="project.select", outcome="error") == 1
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Metrics(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 5.0):
+        registry.observe("llm_request_duration_seconds", seconds, stage="extract")
+    text = registry.render()
+    assert 'llm_request_duration_seconds_bucket{stage="extract",le="0.1"} 1' in text
+    assert 'llm_request_duration_seconds_bucket{stage="extract",le="1"} 2' in text
+    assert 'llm_request_duration_seconds_bucket{stage="extract",le="+Inf"} 3' in text
+
+
+def test_unparseable_output_counts_as_parse_failure():
+    from llm.metrics import metrics
+    from qa_engine.projects import ProjectQAGenerator
+
+    class BrokenJsonClient(FakeOpenAI):
+        def __init__(self):
+            super().__init__(_fake_llm())
+            create = self.chat.completions.create
+
+            def broken(**kwargs):
+                response = create(**kwargs)
+                response.choices[0].message.content = "不是JSON"
+                return response
+
+            self.chat.completions.create = broken
+
+    before = metrics.value("llm_parse_failures_total", stage="project.generate")
+    assert ProjectQAGenerator(BrokenJsonClient()).generate_questions({"name": "订单系统"}) == 0
+    assert metrics.value("llm_parse_failures_total", stage="project.generate") == before + 1
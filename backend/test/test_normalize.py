@@ -0,0 +1,43 @@
+from benchmarks.common import synthetic_resume_pdf
+from parser.extractor import parse_file_bytes, prepare_resume_text
+from parser.normalize import MAX_DROPPED_SECTION_LINES, normalize_resume_text
+
+
+def test_page_furniture_contacts_and_unused_sections_are_removed():
+    text = parse_file_bytes(synthetic_resume_pdf(3, seed=1, boilerplate=True), ".pdf")
+    result = normalize_resume_text(text)
+
+    assert result.dropped_sections == ["basic_info", "job_intention", "hobbies", "references"]
+    assert result.saved_tokens > 0 and result.tokens < result.original_tokens
+    for removed in ("个人简历", "第 2 页", "@example.com", "性别", "薪资面议", "篮球"):
+        assert removed in text and removed not in result.text
+    # 正文（包括只有数字不同、位于页尾的行）全部保留
+    for kept in ("项目：", "成就：", "技能："):
+        assert result.text.count(kept) == text.count(kept)
+
+
+def test_whitespace_is_compacted_and_table_cells_kept():
+    result = normalize_resume_text("\u200b张三\u3000\u3000后端\n\n\n技能 \t  Python\t\tRedis\n- 2 -\n")
+    assert result.text == "张三 后端\n技能\tPython\tRedis"
+    assert result.sections == [] and result.removed_lines == 1
+
+
+def test_unterminated_dropped_section_is_kept():
+    body = [f"负责模块{i}的设计与开发" for i in range(MAX_DROPPED_SECTION_LINES + 1)]
+    result = normalize_resume_text("\n".join(["求职意向", "后端开发"] + ["项目：订单系统"] + body))
+    assert "项目：订单系统" in result.text and result.dropped_sections == []
+    assert normalize_resume_text("兴趣爱好\n篮球").text == "兴趣爱好\n篮球"
+
+
+def test_normalization_can_be_disabled(monkeypatch):
+    raw = "电话：13800000000\n技能：Python\n".encode("utf-8")
+    assert prepare_resume_text(raw, ".txt") == "技能：Python"
+    monkeypatch.setenv("RESUME_NORMALIZE", "0")
+    assert prepare_resume_text(raw, ".txt") == raw.decode("utf-8")
+
+
+def test_education_in_basic_info_is_kept():
+    text = "张三\n基本信息\n毕业院校：北京大学\n学历：本科\n专业：计算机\n性别：男\n项目经历\n项目：订单系统"
+    result = normalize_resume_text(text)
+    assert result.dropped_sections == ["basic_info"]
+    assert result.text == "张三\n教育背景\n毕业院校：北京大学\n学历：本科\n专业：计算机\n项目经历\n项目：订单系统"
@@ -0,0 +1,38 @@
+from benchmarks.common import synthetic_resume_pdf
+from benchmarks.pdf_bench import legacy_pdf_text
+from parser import pdf_text
+from parser.pdf_text import _chunks, extract_pdf_text, needs_layout
+
+
+def _squash(text):
+    return "".join(text.split())
+
+
+def test_fast_path_matches_pdfplumber_and_falls_back_per_page(monkeypatch):
+    raw = synthetic_resume_pdf(3, seed=1, shapes_per_page=20, blank_pages=1)
+    plumber_pages = []
+    original = pdf_text._plumber_pages
+    monkeypatch.setattr(pdf_text, "_plumber_pages", lambda raw, indices: plumber_pages.extend(indices) or original(raw, indices))
+
+    text = extract_pdf_text(raw, workers=1, page_limit=None, fast=True)
+    assert _squash(text) == _squash(legacy_pdf_text(raw))
+    # 只有没有文本层的扫描页交给 pdfplumber
+    assert plumber_pages == [3]
+
+
+def test_garbled_or_empty_pages_need_layout_analysis():
+    assert needs_layout("")
+    assert needs_layout("  \n ")
+    assert needs_layout("\ue000\ue001\ue002简历")
+    assert needs_layout("\ufffd\ufffd 简历")
+    assert needs_layout("简历", min_chars=20)
+    assert not needs_layout("张三 Python 后端工程师")
+
+
+def test_page_limit_and_parallel_chunks_keep_page_order():
+    raw = synthetic_resume_pdf(6, seed=2)
+    sequential = extract_pdf_text(raw, workers=1, page_limit=None)
+    assert extract_pdf_text(raw, workers=2, page_limit=None) == sequential
+    assert len(extract_pdf_text(raw, workers=1, page_limit=2)) < len(sequential)
+    assert _chunks(5, 2) == [(0, 3), (3, 5)]
+    assert _chunks(1, 4) == [(0, 1)]
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+from qa_engine.projects import ProjectQAGenerator, projects_main, projects_main_async
+
+
+class SlowStubClient:
+    """按提示词返回固定结构的桩客户端，每次调用固定耗时，用于验证并发与顺序"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            system, user = messages[0]["content"], messages[-1]["content"]
+            if "问题池" in system:
+                pool = json.loads(user.split("\n", 1)[1])["questions_pool"]
+                content = json.dumps({"selected_questions": pool["questions"][:1]}, ensure_ascii=False)
+            elif "项目名称" in user and "面试问题" not in user:
+                name = user.split("项目名称：", 1)[1].split("\n", 1)[0]
+                content = json.dumps({"project_name": name, "questions": [{"question": f"{name}的架构?"}]}, ensure_ascii=False)
+            else:
+                content = "参考答案"
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _resume(n):
+    return {"projects": [{"name": f"项目{i}", "technologies": [], "responsibilities": [], "achievements": []} for i in range(n)]}
+
+
+def test_concurrent_mode_keeps_order_and_shape():
+    client = SlowStubClient()
+    result = projects_main(_resume(5), client, max_workers=5)
+    assert list(result) == [f"项目{i}" for i in range(5)]
+    assert result["项目3"] == [{"question": "项目3的架构?", "answer": "参考答案"}]
+    assert client.peak > 1
+
+
+def test_concurrency_limit_is_respected():
+    client = SlowStubClient(delay=0.02)
+    ProjectQAGenerator(client, max_workers=2).generate_for_resume(_resume(6))
+    assert client.peak <= 2
+
+
+def test_sequential_mode_matches_concurrent_mode():
+    sequential = projects_main(_resume(3), SlowStubClient(delay=0), max_workers=1)
+    concurrent = projects_main(_resume(3), SlowStubClient(delay=0), max_workers=3)
+    assert sequential == concurrent
+
+
+class AsyncStubClient:
+    """SlowStubClient 的异步版本"""
+
+    def __init__(self, delay=0.05):
+        self._sync = SlowStubClient(delay=0)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, model, messages, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            return self._sync.create(model, messages, **kwargs)
+        finally:
+            self.active -= 1
+
+
+def test_async_variant_matches_sync_shape():
+    client = AsyncStubClient()
+    result = asyncio.run(projects_main_async(_resume(4), client, max_workers=2))
+    assert result == projects_main(_resume(4), SlowStubClient(delay=0), max_workers=1)
+    assert 1 < client.peak <= 2
+
+
+def test_fast_mode_uses_one_call_per_project():
+    from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM
+
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    result = asyncio.run(projects_main_async(_resume(3), AsyncFakeOpenAI(llm), fast_mode=True))
+    assert list(result) == [f"项目{i}" for i in range(3)]
+    assert all(len(qa) == 1 and qa[0]["answer"] for qa in result.values())
+    assert llm.stats()["by_family"] == {"project.fast": llm.stats()["by_family"]["project.fast"]}
+    assert llm.stats()["calls"] == 3
+
+
+def test_fast_mode_falls_back_to_step_by_step_generation():
+    # 桩客户端不理解快速模式的提示词，返回的内容无法解析，应回退到三步生成
+    result = projects_main(_resume(2), SlowStubClient(delay=0), max_workers=1, fast_mode=True)
+    assert result == projects_main(_resume(2), SlowStubClient(delay=0), max_workers=1, fast_mode=False)
+
+
+def test_batch_mode_handles_the_whole_resume_in_one_call():
+    from llm.fake import FakeConfig, FakeLLM, FakeOpenAI
+
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    result = projects_main(_resume(4), FakeOpenAI(llm), fast_mode=True, batch_mode=True)
+    assert list(result) == [f"项目{i}" for i in range(4)]
+    assert all(name in qa[0]["question"] and qa[0]["answer"] for name, qa in result.items())
+    assert llm.stats()["calls"] == 1
+
+
+def test_batch_mode_fills_missing_projects_and_respects_the_budget():
+    from llm.fake import FakeConfig, FakeLLM, FakeOpenAI
+
+    class DropLastProjectClient(FakeOpenAI):
+        def __init__(self, llm):
+            super().__init__(llm)
+            create = self.chat.completions.create
+
+            def drop_last(**kwargs):
+                response = create(**kwargs)
+                data = json.loads(response.choices[0].message.content)
+                if "projects" in data:
+                    data["projects"].pop("项目2")
+                    response.choices[0].message.content = json.dumps(data, ensure_ascii=False)
+                return response
+
+            self.chat.completions.create = drop_last
+
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    generator = ProjectQAGenerator(DropLastProjectClient(llm), fast_mode=True, batch_mode=True)
+    result = generator.generate_for_resume(_resume(3))
+    assert list(result) == ["项目0", "项目1", "项目2"]
+    assert result["项目2"]["answers"]
+    assert {family: counts["calls"] for family, counts in llm.stats()["by_family"].items()} == {
+        "project.batch": 1, "project.fast": 1
+    }
+
+    llm.reset()
+    ProjectQAGenerator(FakeOpenAI(llm), fast_mode=True, batch_mode=True, batch_token_budget=100).generate_for_resume(_resume(3))
+    assert "project.batch" not in llm.stats()["by_family"]
+    assert llm.stats()["calls"] == 3
@@ -0,0 +1,70 @@
+import asyncio
+
+from code.code_question_generotor import CodeQuestionGenerator
+from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM, FakeOpenAI
+from qa_engine.projects import ProjectQAGenerator
+from qa_engine.question_bank import QuestionBank, normalize_tags
+
+POOL = [{"question": f"问题{i}", "answer": f"答案{i}"} for i in range(3)]
+
+
+def _bank(tmp_path, **kwargs):
+    return QuestionBank(str(tmp_path / "bank.sqlite3"), **{"novelty": 0.0, "seed": 0, **kwargs})
+
+
+def test_tags_are_normalized():
+    assert normalize_tags(["Python 3.10", "python", "Golang", "K8s", " Spring  Boot ", "S3", None]) == [
+        "python", "go", "kubernetes", "spring boot", "s3"
+    ]
+
+
+def test_lookup_ranks_by_tag_similarity_and_dedupes(tmp_path):
+    bank = _bank(tmp_path, min_match=0.5)
+    assert bank.add_pool("code", POOL, ["Python", "Redis"]) == 3
+    assert bank.add_pool("code", {"questions": POOL[:1]}, ["python"]) == 0
+    bank.add_pool("code", [{"question": "Kafka 题", "answer": "答案"}], ["Kafka"])
+    assert len(bank) == 4
+
+    assert [q["question"] for q in bank.lookup("code", ["python", "redis"])] == ["问题0", "问题1", "问题2"]
+    assert bank.lookup("code", ["Java", "Go"]) == []
+    assert bank.lookup("advantage", ["Python", "Redis"]) == []
+
+
+def test_serve_respects_novelty_and_pool_size(tmp_path):
+    bank = _bank(tmp_path)
+    bank.add_pool("advantage", POOL, ["Python", "Redis"])
+    assert bank.serve("advantage", ["Python", "Redis"], pool_size=4) is None
+    assert [q["question"] for q in bank.serve("advantage", ["python", "redis"])] == ["问题0", "问题1", "问题2"]
+    bank.novelty = 1.0
+    assert bank.serve("advantage", ["Python", "Redis"]) is None
+
+
+def test_generators_ingest_pools_and_serve_code_questions_on_match(tmp_path):
+    bank = _bank(tmp_path)
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    resume = {"skills": ["Python", "Redis"], "projects": [{"name": "订单系统", "technologies": ["Kafka"]}]}
+
+    first = CodeQuestionGenerator(FakeOpenAI(llm), question_bank=bank).get_question(resume)
+    second = CodeQuestionGenerator(FakeOpenAI(llm), question_bank=bank).get_question(resume)
+    assert first == second
+    assert llm.stats()["by_family"]["code.generate"]["calls"] == 1
+
+    # 项目问题只入库不复用
+    ProjectQAGenerator(FakeOpenAI(llm), question_bank=bank).generate_for_resume(resume)
+    projects = bank.lookup("project", ["kafka"], require_answer=False)
+    assert projects and any(q["answer"] for q in projects)
+
+
+def test_sync_and_async_batch_mode_ingest_the_same_pools(tmp_path):
+    resume = {"skills": ["Python"], "projects": [{"name": f"系统{i}", "technologies": ["Kafka"]} for i in range(3)]}
+    config = FakeConfig(latency_ms=0, tokens_per_sec=0)
+    pools = []
+    for name, run in (
+        ("sync", lambda generator: generator.generate_for_resume(resume)),
+        ("async", lambda generator: asyncio.run(generator.generate_for_resume_async(resume))),
+    ):
+        bank = QuestionBank(str(tmp_path / f"{name}.sqlite3"), novelty=0.0, seed=0)
+        client = FakeOpenAI(FakeLLM(config)) if name == "sync" else AsyncFakeOpenAI(FakeLLM(config))
+        run(ProjectQAGenerator(client, fast_mode=True, batch_mode=True, question_bank=bank))
+        pools.append(sorted((q["question"], q["answer"]) for q in bank.lookup("project", ["kafka"], require_answer=False)))
+    assert pools[0] and pools[0] == pools[1]
@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from evaluate.question_registry import (
+    QuestionRegistry,
+    advantage_entries,
+    code_entries,
+    evaluation_inputs,
+    project_entries,
+)
+from evaluate.report import evaluation
+from llm.fake import FakeConfig, FakeLLM, FakeOpenAI
+from qa_engine.projects import ProjectQAGenerator
+
+PROJECTS = [
+    {"projectName": "订单系统", "question": "如何保证幂等？", "answer": "参考答案一"},
+    {"projectName": "订单系统", "question": "如何分库分表？", "answer": "参考答案二"},
+    {"projectName": "推荐系统", "question": "如何做召回？", "answer": "参考答案三"},
+]
+
+
+def _registry(tmp_path):
+    registry = QuestionRegistry(str(tmp_path / "registry.sqlite3"))
+    interview_id = registry.new_interview_id()
+    registry.register(interview_id, project_entries(PROJECTS))
+    # 流式上传时各分支分别登记，结果合并
+    registry.register(interview_id, advantage_entries({"question": "你的优势？", "answer": "优势参考"}))
+    registry.register(interview_id, code_entries(("实现LRU缓存", "代码参考")))
+    return registry, interview_id
+
+
+def test_registered_questions_keep_text_and_reference_answers(tmp_path):
+    registry, interview_id = _registry(tmp_path)
+    assert sorted(registry.get(interview_id)) == ["advantage_1", "code_1", "project_0", "project_1", "project_2"]
+    assert registry.lookup(interview_id, "project_2")["project_name"] == "推荐系统"
+    assert registry.get("unknown") == {}
+
+    projects, advantages, code = evaluation_inputs(
+        [("project_0", "回答"), ("project_2", "回答"), ("advantage_1", "回答"), ("code_1", "回答")],
+        registry.get(interview_id)
+    )
+    assert projects == {
+        "订单系统": [{"question": "如何保证幂等？", "answer": "回答", "reference_answer": "参考答案一"}],
+        "推荐系统": [{"question": "如何做召回？", "answer": "回答", "reference_answer": "参考答案三"}],
+    }
+    assert advantages["reference_answer"] == "优势参考"
+    assert code == ("实现LRU缓存", "回答", "代码参考")
+
+
+def test_registered_answers_skip_reference_generation(tmp_path):
+    registry, interview_id = _registry(tmp_path)
+    answers = [("project_0", "回答"), ("project_1", "回答"), ("advantage_1", "回答"), ("code_1", "回答")]
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+
+    report = evaluation(FakeOpenAI(llm), *evaluation_inputs(answers, registry.get(interview_id)), {})
+    assert [qa["reference_answer"] for qa in report["project_qa"]] == ["参考答案一", "参考答案二"]
+    assert report["code"]["question"] == "实现LRU缓存"
+    assert {family: counts["calls"] for family, counts in llm.stats()["by_family"].items()} == {"eval.grade": 4}
+
+    # 未登记的面试回退到按 questionId 前缀归类并重新生成参考答案
+    llm.reset()
+    projects, _, _ = evaluation_inputs(answers, {})
+    assert projects == {"项目0": [{"question": "project_0", "answer": "回答", "reference_answer": None}],
+                        "项目1": [{"question": "project_1", "answer": "回答", "reference_answer": None}]}
+    evaluation(FakeOpenAI(llm), *evaluation_inputs(answers, {}), {})
+    assert llm.stats()["by_family"]["eval.reference"]["calls"] == 4
+
+
+class _FailingAnswerClient:
+    """参考答案调用总是失败的桩客户端"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        raise RuntimeError("rate limited")
+
+
+def test_failed_reference_answer_is_regenerated_at_evaluation(tmp_path):
+    answers = ProjectQAGenerator(_FailingAnswerClient()).generate_ans({"name": "订单系统"}, [{"question": "如何保证幂等？"}])
+    assert answers == [{"question": "如何保证幂等？", "answer": None, "error": "生成答案失败: rate limited"}]
+
+    registry = QuestionRegistry(str(tmp_path / "registry.sqlite3"))
+    registry.register("interview", project_entries([{"projectName": "订单系统", **answers[0]}]))
+    assert registry.lookup("interview", "project_0")["reference_answer"] is None
+
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    report = evaluation(FakeOpenAI(llm), *evaluation_inputs([("project_0", "回答")], registry.get("interview")), {})
+    assert report["project_qa"][0]["question"] == "如何保证幂等？"
+    assert llm.stats()["by_family"]["eval.reference"]["calls"] == 1
@@ -0,0 +1,25 @@
+from parser.resume_store import ResumeStore
+
+RESUME = {"education": [], "projects": [{"name": "简历分析"}], "work_experience": [], "skills": ["Python"], "advantages": []}
+
+
+def test_cached_resume_survives_restart_with_same_prompt_version(tmp_path):
+    path = str(tmp_path / "resume.sqlite3")
+    ResumeStore(path, "1-abc").put("digest", RESUME)
+    assert ResumeStore(path, "1-abc").get("digest") == RESUME
+
+
+def test_prompt_version_change_invalidates_cache(tmp_path):
+    path = str(tmp_path / "resume.sqlite3")
+    ResumeStore(path, "1-abc").put("digest", RESUME)
+    assert ResumeStore(path, "2-def").get("digest") is None
+
+
+def test_explicit_invalidation(tmp_path):
+    store = ResumeStore(str(tmp_path / "resume.sqlite3"), "1-abc")
+    store.put("a", RESUME)
+    store.put("b", RESUME)
+    store.invalidate("a")
+    assert store.get("a") is None and store.get("b") == RESUME
+    store.invalidate()
+    assert store.get("b") is None
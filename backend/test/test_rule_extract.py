@@ -0,0 +1,101 @@
+import asyncio
+import os
+
+import parser.extractor as extractor
+from benchmarks.common import synthetic_resume_text
+from llm.fake import AsyncFakeOpenAI, FakeConfig, FakeLLM
+from parser.extractor import prepare_resume_text
+from parser.ingest import UploadedResume
+from parser.rule_extract import extract_by_rules
+
+TEMPLATE = """张三
+教育经历
+2016.09 - 2020.06  浙江大学  软件工程  本科
+工作经历
+杭州某某科技有限公司 | 高级后端工程师 | 2020.07 - 至今
+- 负责与银行系统对接，设计对账服务
+- 订单接口 QPS 提升 3 倍
+项目经历
+电商订单系统  2021.03 - 2021.12
+项目描述：为商城提供下单、支付和履约能力
+技术栈：Java、Spring Boot、MySQL
+- 负责订单状态机设计
+- 下单接口 P99 从 800ms 降到 200ms
+专业技能
+- 熟练掌握 Java、Go，熟悉 MySQL、Redis
+- 了解 Kubernetes 和 Docker
+自我评价
+热爱技术，有较强的学习能力。能独立负责模块设计。
+"""
+
+
+def test_template_resume_is_filled_by_rules():
+    result = extract_by_rules(TEMPLATE)
+    assert result.gaps() == []
+    data = result.data
+    assert data["education"] == [{"school": "浙江大学", "degree": "本科", "major": "软件工程", "graduation_year": "2020"}]
+    assert data["work_experience"] == [{
+        "company": "杭州某某科技有限公司",
+        "position": "高级后端工程师",
+        "duration": "2020.07 - 至今",
+        "responsibilities": ["负责与银行系统对接，设计对账服务"],
+        "achievements": ["订单接口 QPS 提升 3 倍"]
+    }]
+    assert data["projects"] == [{
+        "name": "电商订单系统",
+        "description": "为商城提供下单、支付和履约能力",
+        "technologies": ["Java", "Spring Boot", "MySQL"],
+        "responsibilities": ["负责订单状态机设计"],
+        "achievements": ["下单接口 P99 从 800ms 降到 200ms"]
+    }]
+    assert data["skills"] == ["Java", "Go", "MySQL", "Redis", "Kubernetes", "Docker"]
+    assert data["advantages"] == ["热爱技术，有较强的学习能力。", "能独立负责模块设计。"]
+
+
+def test_missing_required_project_fields_lower_confidence():
+    result = extract_by_rules(TEMPLATE.replace("- 下单接口 P99 从 800ms 降到 200ms\n", ""))
+    assert result.gaps() == ["projects"]
+    assert "advantages" in extract_by_rules(TEMPLATE.split("自我评价")[0]).gaps()
+
+
+def test_award_lines_are_not_education_entries():
+    with open(os.path.join(os.path.dirname(__file__), "data", "test.docx"), "rb") as f:
+        text = prepare_resume_text(f.read(), ".docx")
+    result = extract_by_rules(text)
+    assert [e["school"] for e in result.data["education"]] == ["北京大学", "清华大学"]
+    assert result.confidence["education"] == 1.0
+
+    # 缺少毕业年份或专业像形容词的条目交给模型确认
+    assert "education" in extract_by_rules("教育背景\n清华大学 优秀 研究生").gaps()
+    assert "education" in extract_by_rules("教育背景\n清华大学 计算机 本科").gaps()
+
+
+def _extract(text, monkeypatch):
+    monkeypatch.setattr(extractor, "resume_store", None)
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    upload = UploadedResume("resume.txt", text.encode("utf-8"), "digest")
+    resume = asyncio.run(extractor.extract_resume_async(upload, AsyncFakeOpenAI(llm)))
+    return resume, llm.stats()["by_family"].get("extract", {}).get("calls", 0)
+
+
+def test_model_is_called_only_for_gaps(monkeypatch):
+    resume, calls = _extract(synthetic_resume_text(3, seed=1, boilerplate=True), monkeypatch)
+    assert calls == 0 and resume["extraction"]["path"] == "rules"
+    assert [p["name"] for p in resume["projects"]] == ["订单系统1", "推荐系统2", "日志系统3"]
+
+    # 没有个人优势分节：只让模型补全 advantages，其余字段仍取规则提取的结果
+    resume, calls = _extract(synthetic_resume_text(3, seed=1), monkeypatch)
+    assert calls == 1 and resume["extraction"]["path"] == "hybrid"
+    assert resume["extraction"]["llm_fields"] == ["advantages"]
+    assert resume["advantages"] == ["分布式系统", "性能优化"]
+    assert resume["projects"][0]["description"].startswith("基于")
+
+    resume, calls = _extract("我叫张三，做过一些后端开发。", monkeypatch)
+    assert calls == 1 and resume["extraction"]["path"] == "llm"
+
+
+def test_rule_extraction_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("RESUME_RULE_EXTRACTION", "0")
+    resume, calls = _extract(synthetic_resume_text(3, seed=1, boilerplate=True), monkeypatch)
+    assert calls == 1 and resume["extraction"]["path"] == "llm"
+    assert resume["projects"][0]["description"] == "订单系统1的项目描述"
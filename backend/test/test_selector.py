@@ -0,0 +1,51 @@
+from llm.fake import FakeConfig, FakeLLM, FakeOpenAI
+from qa_engine.advantages import AdvantageQAGenerator
+from qa_engine.projects import ProjectQAGenerator
+from qa_engine.selector import LocalSelector, question_list, resolve_selector
+
+POOL = [
+    {"question": "介绍一下项目背景。"},
+    {"question": "Redis 缓存如何保证一致性？"},
+    {"question": "Redis 和 Kafka 在系统中如何配合？"},
+]
+
+
+def test_prefers_skill_and_technology_coverage_and_keeps_pool_order_on_ties():
+    selector = LocalSelector()
+    assert selector.select(POOL, ["redis", "Kafka"])["question"] == POOL[2]["question"]
+    assert selector.select(POOL, ["Python"]) == POOL[0]
+    assert selector.select([], ["Python"]) is None
+    assert "Kafka" in selector.reason(POOL[2], ["Kafka"], ["Redis"])
+
+
+def test_mmr_penalises_questions_similar_to_already_selected():
+    candidates = [
+        {"question": "Redis 缓存如何保证一致性？"},
+        {"question": "Redis 缓存如何保证数据一致性？"},
+        {"question": "Kafka 如何保证消息不丢失？"},
+    ]
+    ranked = LocalSelector(diversity=1.0).rank(candidates, ["Redis", "Kafka"], k=2)
+    assert [q["question"] for q in ranked] == [candidates[0]["question"], candidates[2]["question"]]
+
+
+def test_question_list_accepts_wrapped_pools():
+    assert question_list({"questions": POOL}) == POOL
+    assert question_list({"items": POOL[:1]}) == POOL[:1]
+    assert question_list(0) == []
+    assert resolve_selector("LLM") == "llm"
+    assert resolve_selector("unknown") == "local"
+
+
+def test_local_selection_skips_select_calls():
+    llm = FakeLLM(FakeConfig(latency_ms=0, tokens_per_sec=0))
+    resume = {"skills": ["Python"], "advantages": [], "projects": [{"name": "订单系统", "technologies": ["Redis"]}]}
+
+    result = ProjectQAGenerator(FakeOpenAI(llm), selector="local").generate_for_resume(resume)
+    assert result["订单系统"]["answers"]
+    assert AdvantageQAGenerator(FakeOpenAI(llm), selector="local").generate(resume)["selected_question"]["question"]
+    families = llm.stats()["by_family"]
+    assert "project.select" not in families and "advantage.select" not in families
+
+    llm.reset()
+    ProjectQAGenerator(FakeOpenAI(llm), selector="llm").generate_for_resume(resume)
+    assert llm.stats()["by_family"]["project.select"]["calls"] == 1
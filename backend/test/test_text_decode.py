@@ -0,0 +1,42 @@
+import chardet
+
+from parser.extractor import parse_file_bytes
+from parser.text_decode import CROSS_CHECK_BYTES, decode_text
+
+RESUME = "张三，后端工程师。技能：Python、Redis、Kafka。负责订单系统的架构设计。\n" * 5
+
+
+def test_common_encodings_are_decoded_without_statistical_detection(monkeypatch):
+    monkeypatch.setattr(chardet, "detect", lambda raw: (_ for _ in ()).throw(AssertionError("不应调用 chardet")))
+    assert decode_text(RESUME.encode("utf-8")) == (RESUME, "utf-8")
+    assert decode_text(RESUME.encode("utf-8-sig")) == (RESUME, "utf-8-sig")
+    assert decode_text(RESUME.encode("utf-16")) == (RESUME, "utf-16")
+    # 结尾被截断的 UTF-8 多字节字符
+    assert decode_text("简历".encode("utf-8")[:-1]) == ("简", "utf-8")
+
+
+def test_gb18030_is_cross_checked_on_a_short_prefix(monkeypatch):
+    assert decode_text(RESUME.encode("gb18030")) == (RESUME, "gb18030")
+
+    # Big5 / EUC-KR 文本也能按 GB18030 解码，但得到的是乱码
+    traditional = "項目經歷：負責訂單系統的設計與開發，熟悉分散式架構。\n" * 5
+    assert decode_text(traditional.encode("big5")) == (traditional, "big5")
+    korean = "프로젝트 경험: 주문 시스템 설계 및 개발을 담당했습니다.\n" * 5
+    assert decode_text(korean.encode("euc-kr"))[0] == korean
+
+    seen = []
+    monkeypatch.setattr(chardet, "detect", lambda raw: seen.append(len(raw)) or {"encoding": "GB18030"})
+    assert decode_text((RESUME * 100).encode("gb18030"))[1] == "gb18030"
+    assert seen == [CROSS_CHECK_BYTES]
+
+
+def test_detection_reads_a_bounded_prefix_and_never_raises(monkeypatch):
+    seen = []
+    monkeypatch.setattr(chardet, "detect", lambda raw: seen.append(len(raw)) or {"encoding": "windows-1252"})
+    raw = "Résumé – naïve café\n".encode("windows-1252") + b"\x81" * 10 + b"x" * 100000
+    text, encoding = decode_text(raw, prefix_bytes=1024)
+    assert seen == [1024]
+    assert encoding == "utf-8" and text.startswith("R")
+
+    monkeypatch.setattr(chardet, "detect", lambda raw: {"encoding": None})
+    assert parse_file_bytes(b"\xffabc", ".txt") == "\ufffdabc"
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.common import use_fake_backend
+
+use_fake_backend()
+os.environ.setdefault("QUESTION_REGISTRY_ENABLED", "0")
+
+import app as api  # noqa: E402
+from evaluate.question_registry import QuestionRegistry  # noqa: E402
+
+RESUME = {"name": "张三", "skills": ["Go", "Redis"], "projects": [{"name": "订单系统"}, {"name": "推荐系统"}]}
+PROJECTS = {
+    "订单系统": [{"question": "如何保证幂等？", "answer": "参考答案一"}],
+    "推荐系统": [{"question": "如何做召回？", "answer": "参考答案二"}],
+}
+ADVANTAGES = {"question": "你的优势？", "answer": "优势参考"}
+CODE = ("实现LRU缓存", "代码参考")
+
+
+async def fake_extract(upload, client):
+    return RESUME
+
+
+async def fake_projects(resume, client, dedup=None):
+    return PROJECTS
+
+
+async def fake_iter_projects(resume, client, dedup=None):
+    for name, qa_list in PROJECTS.items():
+        await asyncio.sleep(0.01)
+        yield name, qa_list
+
+
+async def fake_advantages(resume, client, dedup=None):
+    await asyncio.sleep(0.05)
+    return ADVANTAGES
+
+
+async def fake_code(resume, client, dedup=None):
+    await asyncio.sleep(0.05)
+    return CODE
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    registry = QuestionRegistry(str(tmp_path / "registry.sqlite3"))
+    monkeypatch.setattr(api, "question_registry", registry)
+    monkeypatch.setattr(api, "extract_resume_async", fake_extract)
+    monkeypatch.setattr(api, "projects_main_async", fake_projects)
+    monkeypatch.setattr(api, "iter_projects_async", fake_iter_projects)
+    monkeypatch.setattr(api, "advantages_main_async", fake_advantages)
+    monkeypatch.setattr(api, "generate_interview_code_question_async", fake_code)
+    return registry
+
+
+def _upload(path="/api/resume/upload", **kwargs):
+    files = {"file": ("resume.txt", "张三 简历".encode("utf-8"), "text/plain")}
+    return TestClient(api.app).post(path, files=files, **kwargs)
+
+
+def _stream_events():
+    response = _upload("/api/resume/upload/stream")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for message in response.text.strip().split("\n\n"):
+        event, data = message.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_upload_returns_all_branches_and_registers_questions(registry):
+    body = _upload().json()
+    assert "errors" not in body
+    assert body["resume"] == RESUME
+    assert [(q["id"], q["projectName"]) for q in body["questions"]["projects"]] == [
+        ("project_0", "订单系统"), ("project_1", "推荐系统")
+    ]
+    assert body["questions"]["advantages"] == ADVANTAGES
+    assert body["questions"]["code"] == list(CODE)
+
+    questions = registry.get(body["interviewId"])
+    assert sorted(questions) == ["advantage_1", "code_1", "project_0", "project_1"]
+    assert questions["project_1"]["reference_answer"] == "参考答案二"
+
+
+def test_one_branch_timing_out_does_not_drop_the_others(registry, monkeypatch):
+    cancelled = asyncio.Event()
+
+    async def slow_code(resume, client, dedup=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def broken_advantages(resume, client, dedup=None):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(api, "generate_interview_code_question_async", slow_code)
+    monkeypatch.setattr(api, "advantages_main_async", broken_advantages)
+    monkeypatch.setitem(api.BRANCH_TIMEOUTS, "code", 0.05)
+
+    body = _upload().json()
+    assert body["errors"] == {"advantages": "advantages 生成失败: boom", "code": "code 生成超时"}
+    assert cancelled.is_set()
+    assert [q["question"] for q in body["questions"]["projects"]] == ["如何保证幂等？", "如何做召回？"]
+    assert body["questions"]["advantages"] == {}
+    assert body["questions"]["code"] is None
+    # 只登记成功分支的问题
+    assert sorted(registry.get(body["interviewId"])) == ["project_0", "project_1"]
+
+
+def test_run_generator_reports_timeout_and_error(monkeypatch):
+    monkeypatch.setitem(api.BRANCH_TIMEOUTS, "projects", 0.01)
+
+    async def fail():
+        raise ValueError("bad json")
+
+    async def run():
+        return (
+            await api.run_generator("projects", asyncio.sleep(1, result="late")),
+            await api.run_generator("advantages", fail()),
+            await api.run_generator("code", asyncio.sleep(0, result="ok")),
+        )
+
+    assert asyncio.run(run()) == (
+        (None, "projects 生成超时"),
+        (None, "advantages 生成失败: bad json"),
+        ("ok", None),
+    )
+
+
+def test_stream_events_arrive_in_order_and_register_projects(registry):
+    events = _stream_events()
+    names = [event for event, _ in events]
+    assert names[:4] == ["resume", "interview", "project", "project"]
+    assert sorted(names[4:6]) == ["advantages", "code"]
+    assert names[6:] == ["done"]
+
+    data = dict(events[:2])
+    assert data["resume"] == RESUME
+    projects = [data for event, data in events if event == "project"]
+    assert [(p["projectName"], [q["id"] for q in p["questions"]]) for p in projects] == [
+        ("订单系统", ["project_0"]), ("推荐系统", ["project_1"])
+    ]
+    questions = registry.get(data["interview"]["interviewId"])
+    assert sorted(questions) == ["advantage_1", "code_1", "project_0", "project_1"]
+    assert questions["project_1"]["question"] == "如何做召回？"
+
+
+def test_stream_project_timeout_sends_error_and_closes_generator(registry, monkeypatch):
+    log = []
+
+    generators = []
+
+    async def hanging(resume):
+        try:
+            yield "订单系统", PROJECTS["订单系统"]
+            await asyncio.sleep(10)
+        finally:
+            log.append("closed")
+
+    def hanging_projects(resume, client, dedup=None):
+        # 保留引用，生成器不会被垃圾回收提前关闭
+        generators.append(hanging(resume))
+        return generators[-1]
+
+    async def slow_register(interview_id, entries):
+        # 项目分支在生成器挂起于 yield 时被取消
+        if "project_0" in entries:
+            await asyncio.sleep(10)
+        registry.register(interview_id, entries)
+
+    sse_event = api.sse_event
+
+    def logged_sse_event(event, data):
+        log.append(event)
+        return sse_event(event, data)
+
+    monkeypatch.setattr(api, "iter_projects_async", hanging_projects)
+    monkeypatch.setattr(api, "register_questions", slow_register)
+    monkeypatch.setattr(api, "sse_event", logged_sse_event)
+    monkeypatch.setitem(api.BRANCH_TIMEOUTS, "projects", 0.1)
+
+    events = _stream_events()
+    assert [event for event, _ in events] == ["resume", "interview", "advantages", "code", "error", "done"]
+    assert events[4][1] == {"stage": "projects", "error": "projects 生成超时"}
+    # 生成器在发送 error 事件之前已被关闭
+    assert log.index("closed") < log.index("error")
+    assert "project_0" not in registry.get(events[1][1]["interviewId"])
@@ -55,12 +55,10 @@ def after_request(response):
 # 存储面试数据
 interviews = {}
 
-def extract_text_from_pdf(pdf_file):
-    """从PDF文件中提取文本"""
+def extract_text_from_pdf(file_content):
+    """从PDF文件内容（bytes）中提取文本"""
     try:
         logger.info("Starting PDF text extraction")
-        # 保存文件内容到内存中
-        file_content = pdf_file.read()
         logger.debug(f"Read {len(file_content)} bytes from file")
         
         # 创建内存文件对象
@@ -101,12 +99,10 @@ def extract_text_from_pdf(pdf_file):
         logger.error(f"PDF extraction error: {str(e)}", exc_info=True)
         raise
 
-def extract_text_from_docx(docx_file):
-    """从DOCX文件中提取文本"""
+def extract_text_from_docx(file_content):
+    """从DOCX文件内容（bytes）中提取文本"""
     try:
         logger.info("Starting DOCX text extraction")
-        # 保存文件内容到内存中
-        file_content = docx_file.read()
         logger.debug(f"Read {len(file_content)} bytes from file")
         
         # 创建内存文件对象
@@ -163,20 +159,19 @@ def upload_resume():
             logger.error(f"Unsupported file type: {file_ext}")
             return jsonify({'error': '仅支持 PDF 和 Word 文档格式'}), 400
         
-        # 检查文件大小（10MB 限制）
-        if len(file.read()) > 10 * 1024 * 1024:
+        # 只读取一次文件内容，最多读到限制大小多一个字节，用于检查文件大小（10MB 限制）
+        max_size = 10 * 1024 * 1024
+        file_content = file.read(max_size + 1)
+        if len(file_content) > max_size:
             logger.error("File too large")
             return jsonify({'error': '文件大小不能超过 10MB'}), 400
-        
-        # 重置文件指针
-        file.seek(0)
             
         # 根据文件类型提取文本
         try:
             if file_ext == '.pdf':
-                text = extract_text_from_pdf(file)
+                text = extract_text_from_pdf(file_content)
             elif file_ext in ['.doc', '.docx']:
-                text = extract_text_from_docx(file)
+                text = extract_text_from_docx(file_content)
                 
             # 创建ResumeParser实例并解析文本
             resume_parser = ResumeParser()
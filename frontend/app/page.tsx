@@ -170,7 +170,7 @@ export default function Home() {
   const handleInterviewComplete = async (answers: AnswerData[]) => {
     try {
       setStep('evaluating'); // 立即切换到评估状态
-      const result = await evaluateInterview(answers);
+      const result = await evaluateInterview(answers, resumeData?.interviewId);
       setAssessmentResult(result);
       setStep('result');
     } catch (err) {
@@ -208,7 +208,7 @@ export default function Home() {
         {step === 'interview' && resumeData && resumeData.questions && Array.isArray(resumeData.questions.projects) && (
           <InterviewQuestions
             questions={resumeData.questions.projects.map((q: any, index: number) => ({
-              id: `project_${index}`,
+              id: q.id ?? `project_${index}`,
               category: '项目经历',
               question: q.question,
               hasFollowUp: false
@@ -1,6 +1,8 @@
 const API_BASE_URL = 'http://localhost:8000/api';
 
 export interface ResumeData {
+  // 面试 ID，评估时回传，后端据此复用上传时生成的问题和参考答案
+  interviewId?: string | null;
   resume: any;
   questions: {
     projects: any[];
@@ -32,8 +34,64 @@ export async function uploadResume(file: File): Promise<ResumeData> {
   return response.json();
 }
 
-export async function evaluateInterview(answers: AnswerData[]): Promise<any> {
-  const response = await fetch(`${API_BASE_URL}/interview/evaluate`, {
+export type UploadStreamEvent =
+  | { event: 'resume'; data: any }
+  | { event: 'interview'; data: { interviewId: string } }
+  | { event: 'project'; data: { projectName: string; questions: any[] } }
+  | { event: 'advantages'; data: any }
+  | { event: 'code'; data: any }
+  | { event: 'error'; data: { stage: string; error: string } }
+  | { event: 'done'; data: {} };
+
+// 流式上传简历：解析结果和各部分问题生成后通过 onEvent 逐条回调，便于页面渐进渲染
+export async function uploadResumeStream(
+  file: File,
+  onEvent: (event: UploadStreamEvent) => void,
+): Promise<void> {
+  const formData = new FormData();
+  formData.append('file', file);
+
+  const response = await fetch(`${API_BASE_URL}/resume/upload/stream`, {
+    method: 'POST',
+    body: formData,
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error('简历上传失败');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // SSE 消息之间以空行分隔
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let event = 'message';
+      let data = '';
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (data) {
+        onEvent({ event, data: JSON.parse(data) } as UploadStreamEvent);
+      }
+    }
+  }
+}
+
+export async function evaluateInterview(answers: AnswerData[], interviewId?: string | null): Promise<any> {
+  const query = interviewId ? `?interviewId=${encodeURIComponent(interviewId)}` : '';
+  const response = await fetch(`${API_BASE_URL}/interview/evaluate${query}`, {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',